@@ -0,0 +1,38 @@
+-- db/migrations/001_project_scoped_indexes.sql
+-- Moves an existing database onto the project-leading indexes from schema.sql.
+-- Safe to re-run. Uses CONCURRENTLY so a live database keeps serving queries,
+-- which means psql must run it outside a transaction (the default for -f).
+
+-- db-init replays every migration on each start. After db/partitioning.sql
+-- symbols and calls are partitioned parents, which refuse CONCURRENTLY, so
+-- their indexes are created plainly there (IF NOT EXISTS: a no-op by then).
+SELECT EXISTS (SELECT 1 FROM pg_class WHERE relname = 'symbols' AND relkind = 'p') AS partitioned \gset
+
+-- 1. New project-leading indexes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_repo_url ON projects(repo_url);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_imports_project_name ON imports(project_id, name);
+\if :partitioned
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name ON symbols(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_file ON symbols(project_id, file_path);
+CREATE INDEX IF NOT EXISTS idx_calls_project_resolved ON calls(project_id, resolved_symbol_id);
+CREATE INDEX IF NOT EXISTS idx_calls_project_name ON calls(project_id, call_name);
+CREATE INDEX IF NOT EXISTS idx_calls_project_unresolved ON calls(project_id) WHERE resolved_symbol_id IS NULL;
+\else
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_symbols_project_name ON symbols(project_id, name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_symbols_project_file ON symbols(project_id, file_path);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_project_resolved ON calls(project_id, resolved_symbol_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_project_name ON calls(project_id, call_name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_project_unresolved ON calls(project_id) WHERE resolved_symbol_id IS NULL;
+
+-- 2. Superseded single-column indexes (the composites above cover them;
+--    partitioning.sql never creates them)
+DROP INDEX CONCURRENTLY IF EXISTS idx_symbols_name;
+DROP INDEX CONCURRENTLY IF EXISTS idx_symbols_file;
+DROP INDEX CONCURRENTLY IF EXISTS idx_calls_resolved;
+\endif
+
+-- 3. Refresh planner statistics
+ANALYZE projects;
+ANALYZE symbols;
+ANALYZE calls;
+ANALYZE imports;
@@ -0,0 +1,5 @@
+-- db/migrations/002_project_indexed_at.sql
+-- Adds projects.indexed_at, bumped at the end of every index run so the
+-- query daemon (n3mo serve) knows when its in-memory call graph is stale.
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS indexed_at TIMESTAMP;
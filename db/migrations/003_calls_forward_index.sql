@@ -0,0 +1,16 @@
+-- db/migrations/003_calls_forward_index.sql
+-- Forward edges for `n3mo deps`: each step of the traversal looks up one
+-- caller's resolved callees. The old idx_calls_source (source_symbol_id)
+-- is a prefix of the new index, so FK cascades keep using it.
+-- Like 001, psql must run it outside a transaction (CONCURRENTLY).
+
+-- Partitioned calls (db/partitioning.sql) already has its own
+-- idx_calls_source_resolved and refuses CONCURRENTLY: skip it there.
+
+SELECT EXISTS (SELECT 1 FROM pg_class WHERE relname = 'calls' AND relkind = 'p') AS partitioned \gset
+\if :partitioned
+\echo 'N3MO: calls is partitioned, idx_calls_source_resolved is already in place.'
+\else
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calls_source_resolved ON calls(source_symbol_id, resolved_symbol_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_calls_source;
+\endif
@@ -0,0 +1,24 @@
+-- db/migrations/004_module_graph.sql
+-- File- and package-level dependency tables (n3mo modgraph,
+-- n3mo impact --granularity). They fill on the next `n3mo index`.
+
+CREATE TABLE IF NOT EXISTS file_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_file TEXT NOT NULL,
+    target_file TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,
+    import_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, source_file, target_file)
+);
+
+CREATE TABLE IF NOT EXISTS package_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_package TEXT NOT NULL,
+    target_package TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,
+    import_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, source_package, target_package)
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_edges_target ON file_edges(project_id, target_file);
+CREATE INDEX IF NOT EXISTS idx_package_edges_target ON package_edges(project_id, target_package);
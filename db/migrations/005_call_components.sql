@@ -0,0 +1,21 @@
+-- db/migrations/005_call_components.sql
+-- Strongly connected components of the resolved call graph. impact and
+-- deps walk this DAG, and fall back to the symbol-level walk until the
+-- next `n3mo index` fills it.
+
+CREATE TABLE IF NOT EXISTS symbol_components (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    symbol_id UUID NOT NULL,
+    component_id INT NOT NULL,             -- topological position, callers first
+    PRIMARY KEY (project_id, symbol_id)
+);
+
+CREATE TABLE IF NOT EXISTS component_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_component INT NOT NULL,         -- caller side; always < target_component
+    target_component INT NOT NULL,
+    PRIMARY KEY (project_id, source_component, target_component)
+);
+
+CREATE INDEX IF NOT EXISTS idx_symbol_components_component ON symbol_components(project_id, component_id);
+CREATE INDEX IF NOT EXISTS idx_component_edges_target ON component_edges(project_id, target_component);  -- reverse walks
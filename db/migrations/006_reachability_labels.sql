@@ -0,0 +1,11 @@
+-- db/migrations/006_reachability_labels.sql
+-- 2-hop reachability labels on the condensed call graph, for
+-- `n3mo reaches`. Filled by the next `n3mo index`.
+
+CREATE TABLE IF NOT EXISTS component_labels (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    component_id INT NOT NULL,
+    out_hubs INT[] NOT NULL,               -- hub components this one reaches
+    in_hubs INT[] NOT NULL,                -- hub components that reach this one
+    PRIMARY KEY (project_id, component_id)
+);
@@ -0,0 +1,8 @@
+-- db/migrations/007_symbol_entry_points.sql
+-- Decorators and entry-point tags (route | cli | job | test) for
+-- `n3mo impact --entry-points`. Re-run `n3mo index` to fill them.
+
+ALTER TABLE symbols ADD COLUMN IF NOT EXISTS decorators TEXT[];
+ALTER TABLE symbols ADD COLUMN IF NOT EXISTS entry_kind TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_symbols_entry_points ON symbols(project_id, entry_kind) WHERE entry_kind IS NOT NULL;
@@ -0,0 +1,18 @@
+-- db/migrations/008_class_hierarchy.sql
+-- Base classes, resolved inheritance edges and override dispatch rows
+-- for self./super() call linking (src/hierarchy.py). Re-run `n3mo index`
+-- to fill them.
+
+ALTER TABLE symbols ADD COLUMN IF NOT EXISTS bases TEXT[];
+ALTER TABLE calls ADD COLUMN IF NOT EXISTS dispatch_of UUID;
+
+CREATE TABLE IF NOT EXISTS inherits (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    class_id UUID NOT NULL,
+    position INT NOT NULL,                 -- order in the class statement (MRO input)
+    base_name TEXT NOT NULL,
+    base_id UUID,                          -- NULL for bases outside the project
+    PRIMARY KEY (project_id, class_id, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_inherits_base ON inherits(project_id, base_id);
@@ -0,0 +1,9 @@
+-- db/migrations/009_import_resolution.sql
+-- Imports resolved through the module map (src/resolve_imports.py):
+-- the file an import loads, next to the symbol it names. Filled by the
+-- next `n3mo index`.
+
+ALTER TABLE imports ADD COLUMN IF NOT EXISTS resolved_file TEXT;
+
+-- imports is never partitioned (db/partitioning.sql), so CONCURRENTLY is safe on reruns
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_imports_project_file ON imports(project_id, file_path);
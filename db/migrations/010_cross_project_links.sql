@@ -0,0 +1,23 @@
+-- db/migrations/010_cross_project_links.sql
+-- Package registry and cross-project call edges for
+-- `n3mo impact --cross-projects`. Filled as projects are re-indexed.
+
+CREATE TABLE IF NOT EXISTS project_packages (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    package TEXT NOT NULL,                 -- top-level import name, e.g. acme_sdk
+    path TEXT NOT NULL,                    -- where it lives in the repo, e.g. src/acme_sdk
+    source TEXT NOT NULL DEFAULT 'index',  -- index (detected) | manual (n3mo packages --add)
+    PRIMARY KEY (project_id, package)
+);
+
+CREATE TABLE IF NOT EXISTS cross_calls (
+    source_project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    call_id UUID NOT NULL,
+    source_symbol_id UUID NOT NULL,
+    target_project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    target_symbol_id UUID NOT NULL,
+    PRIMARY KEY (source_project_id, call_id, target_symbol_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_packages_package ON project_packages(package);
+CREATE INDEX IF NOT EXISTS idx_cross_calls_target ON cross_calls(target_project_id, target_symbol_id);  -- reverse walks
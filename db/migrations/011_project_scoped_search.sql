@@ -0,0 +1,15 @@
+-- db/migrations/011_project_scoped_search.sql
+-- n3mo search now filters on project_id and can match owner.member names:
+-- replace the name-only search indexes with project-leading ones.
+-- Safe to re-run. Plain CREATE INDEX (not CONCURRENTLY) so it also works on
+-- the partitioned parents left by db/partitioning.sql.
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name_trgm ON symbols USING GIN (project_id, name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name_prefix ON symbols (project_id, lower(name) text_pattern_ops);
+
+DROP INDEX IF EXISTS idx_symbols_name_trgm;
+DROP INDEX IF EXISTS idx_symbols_name_prefix;
+
+ANALYZE symbols;
@@ -0,0 +1,104 @@
+-- db/partitioning.sql
+-- OPTIONAL: hash-partition symbols and calls by project_id.
+--
+-- Worth it once a database holds hundreds of projects: every linking and
+-- impact query filters by project_id, so the planner prunes to the single
+-- partition holding that project and per-project indexes stay small.
+--
+-- Run AFTER schema.sql (and migrations) against an existing database:
+--   psql -h postgres -U n3mo -d n3mo -v partitions=32 -f db/partitioning.sql
+-- Data is copied across inside one transaction; readers wait on the lock
+-- instead of seeing a half-migrated schema. Re-running is a no-op.
+
+\set ON_ERROR_STOP on
+
+\if :{?partitions}
+\else
+\set partitions 16
+\endif
+
+SELECT relkind = 'p' AS already_partitioned FROM pg_class WHERE relname = 'symbols' \gset
+\if :already_partitioned
+\echo 'N3MO: symbols is already partitioned, nothing to do.'
+\quit
+\endif
+
+BEGIN;
+
+LOCK TABLE symbols, calls IN ACCESS EXCLUSIVE MODE;
+
+-- 1. Partitioned parents
+-- The partition key must be part of every unique constraint, so the
+-- primary keys become (project_id, id) and calls references that pair.
+CREATE TABLE symbols_partitioned (
+    id UUID NOT NULL,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    kind TEXT,
+    signature TEXT,
+    start_line INT,
+    end_line INT,
+    parent_id UUID,
+    decorators TEXT[],
+    entry_kind TEXT,
+    bases TEXT[],
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (project_id, id),
+    CONSTRAINT unq_symbols_partitioned UNIQUE NULLS NOT DISTINCT (project_id, file_path, parent_id, name)
+) PARTITION BY HASH (project_id);
+
+CREATE TABLE calls_partitioned (
+    id UUID NOT NULL,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    source_symbol_id UUID,
+    call_name TEXT NOT NULL,
+    line_number INT,
+    resolved_symbol_id UUID,
+    dispatch_of UUID,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (project_id, id),
+    FOREIGN KEY (project_id, source_symbol_id)
+        REFERENCES symbols_partitioned(project_id, id) ON DELETE CASCADE
+) PARTITION BY HASH (project_id);
+
+-- 2. Hash partitions
+SELECT format('CREATE TABLE symbols_p%s PARTITION OF symbols_partitioned FOR VALUES WITH (MODULUS %s, REMAINDER %s)', r, :partitions, r)
+FROM generate_series(0, :partitions - 1) r \gexec
+
+SELECT format('CREATE TABLE calls_p%s PARTITION OF calls_partitioned FOR VALUES WITH (MODULUS %s, REMAINDER %s)', r, :partitions, r)
+FROM generate_series(0, :partitions - 1) r \gexec
+
+-- 3. Copy data (indexes are built afterwards, which is much faster)
+INSERT INTO symbols_partitioned
+    (id, project_id, name, file_path, kind, signature, start_line, end_line, parent_id, decorators, entry_kind, bases, created_at)
+SELECT id, project_id, name, file_path, kind, signature, start_line, end_line, parent_id, decorators, entry_kind, bases, created_at
+FROM symbols WHERE project_id IS NOT NULL;
+
+INSERT INTO calls_partitioned
+    (id, project_id, source_symbol_id, call_name, line_number, resolved_symbol_id, dispatch_of, created_at)
+SELECT id, project_id, source_symbol_id, call_name, line_number, resolved_symbol_id, dispatch_of, created_at
+FROM calls WHERE project_id IS NOT NULL;
+
+-- 4. Swap
+DROP TABLE calls;
+DROP TABLE symbols;
+ALTER TABLE symbols_partitioned RENAME TO symbols;
+ALTER TABLE calls_partitioned RENAME TO calls;
+ALTER TABLE symbols RENAME CONSTRAINT unq_symbols_partitioned TO unq_symbols;
+
+-- 5. Indexes (created on the parent, propagated to every partition)
+CREATE INDEX idx_symbols_project_name ON symbols(project_id, name);
+CREATE INDEX idx_symbols_project_file ON symbols(project_id, file_path);
+CREATE INDEX idx_symbols_entry_points ON symbols(project_id, entry_kind) WHERE entry_kind IS NOT NULL;
+CREATE INDEX idx_symbols_project_name_trgm ON symbols USING GIN (project_id, name gin_trgm_ops);
+CREATE INDEX idx_symbols_project_name_prefix ON symbols (project_id, lower(name) text_pattern_ops);
+CREATE INDEX idx_calls_source_resolved ON calls(project_id, source_symbol_id, resolved_symbol_id);
+CREATE INDEX idx_calls_project_resolved ON calls(project_id, resolved_symbol_id);
+CREATE INDEX idx_calls_project_name ON calls(project_id, call_name);
+CREATE INDEX idx_calls_project_unresolved ON calls(project_id) WHERE resolved_symbol_id IS NULL;
+
+COMMIT;
+
+ANALYZE symbols;
+ANALYZE calls;
@@ -3,16 +3,20 @@
 
 -- 1. Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;       -- Fuzzy symbol search
+CREATE EXTENSION IF NOT EXISTS btree_gin;     -- project_id inside the trigram index
 
 -- 2. Projects Table
 CREATE TABLE IF NOT EXISTS projects (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name TEXT,
     repo_url TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    indexed_at TIMESTAMP     -- Bumped after every index run (cache invalidation)
 );
 
 -- 3. Symbols Table (The Code Definitions)
+-- (For hash partitioning by project_id see db/partitioning.sql)
 CREATE TABLE IF NOT EXISTS symbols (
     id UUID PRIMARY KEY,
     project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
@@ -23,6 +27,9 @@ CREATE TABLE IF NOT EXISTS symbols (
     start_line INT,
     end_line INT,
     parent_id UUID,
+    decorators TEXT[],       -- e.g. {'app.get("/users")'}
+    entry_kind TEXT,         -- route | cli | job | test (src/entry_points.py)
+    bases TEXT[],            -- base class expressions, e.g. {'Base','mixins.Json'}
     created_at TIMESTAMP DEFAULT NOW(),
     
     -- ✅ Fixed: Matches Python's upsert logic (project + file + parent + name)
@@ -37,6 +44,7 @@ CREATE TABLE IF NOT EXISTS calls (
     call_name TEXT NOT NULL,
     line_number INT,
     resolved_symbol_id UUID,
+    dispatch_of UUID,        -- set on override rows: the self./super() call they fan out from (src/hierarchy.py)
     created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -49,14 +57,112 @@ CREATE TABLE IF NOT EXISTS imports (
     name TEXT,
     alias TEXT,
     resolved_symbol_id UUID,
+    resolved_file TEXT,      -- project file the import loads (src/resolve_imports.py); NULL if external
     created_at TIMESTAMP DEFAULT NOW(),
 
     -- ✅ Fixed: Matches Python's upsert logic (project + file + module + name)
     CONSTRAINT unq_imports UNIQUE NULLS NOT DISTINCT (project_id, file_path, module, name)
 );
 
+-- 6. Module Graph (file -> file and package -> package rollups of calls + imports)
+-- Refreshed by the indexer after linking (src/modgraph.py).
+CREATE TABLE IF NOT EXISTS file_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_file TEXT NOT NULL,
+    target_file TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,     -- call sites
+    import_count INT NOT NULL DEFAULT 0,   -- resolved imports
+    PRIMARY KEY (project_id, source_file, target_file)
+);
+
+CREATE TABLE IF NOT EXISTS package_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_package TEXT NOT NULL,
+    target_package TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,
+    import_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, source_package, target_package)
+);
+
+-- 7. Condensed Call Graph (strongly connected components, src/scc.py)
+-- Cycles collapse into one component, so impact/deps walk a DAG.
+CREATE TABLE IF NOT EXISTS symbol_components (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    symbol_id UUID NOT NULL,
+    component_id INT NOT NULL,             -- topological position, callers first
+    PRIMARY KEY (project_id, symbol_id)
+);
+
+CREATE TABLE IF NOT EXISTS component_edges (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    source_component INT NOT NULL,         -- caller side; always < target_component
+    target_component INT NOT NULL,
+    PRIMARY KEY (project_id, source_component, target_component)
+);
+
+-- 8. Reachability Labels (2-hop labels on the component DAG, src/reachability.py)
+-- a reaches b  <=>  out_hubs(a) && in_hubs(b)
+CREATE TABLE IF NOT EXISTS component_labels (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    component_id INT NOT NULL,
+    out_hubs INT[] NOT NULL,               -- hub components this one reaches
+    in_hubs INT[] NOT NULL,                -- hub components that reach this one
+    PRIMARY KEY (project_id, component_id)
+);
+
+-- 9. Class Hierarchy (symbols.bases resolved to classes, src/hierarchy.py)
+CREATE TABLE IF NOT EXISTS inherits (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    class_id UUID NOT NULL,
+    position INT NOT NULL,                 -- order in the class statement (MRO input)
+    base_name TEXT NOT NULL,
+    base_id UUID,                          -- NULL for bases outside the project
+    PRIMARY KEY (project_id, class_id, position)
+);
+
+-- 10. Cross-Project Links (src/cross_project.py)
+-- Which project provides which packages, and calls that resolve into
+-- another project through them. Kept out of calls so per-project
+-- queries never see foreign ids.
+CREATE TABLE IF NOT EXISTS project_packages (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    package TEXT NOT NULL,                 -- top-level import name, e.g. acme_sdk
+    path TEXT NOT NULL,                    -- where it lives in the repo, e.g. src/acme_sdk
+    source TEXT NOT NULL DEFAULT 'index',  -- index (detected) | manual (n3mo packages --add)
+    PRIMARY KEY (project_id, package)
+);
+
+CREATE TABLE IF NOT EXISTS cross_calls (
+    source_project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    call_id UUID NOT NULL,
+    source_symbol_id UUID NOT NULL,
+    target_project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    target_symbol_id UUID NOT NULL,
+    PRIMARY KEY (source_project_id, call_id, target_symbol_id)
+);
+
 -- Indexes for Speed ⚡
-CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
-CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);
-CREATE INDEX IF NOT EXISTS idx_calls_source ON calls(source_symbol_id);
-CREATE INDEX IF NOT EXISTS idx_calls_resolved ON calls(resolved_symbol_id);
\ No newline at end of file
+-- Every linking and impact query filters by project, so project_id leads.
+-- Existing databases: apply db/migrations/001_project_scoped_indexes.sql
+CREATE INDEX IF NOT EXISTS idx_projects_repo_url ON projects(repo_url);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name ON symbols(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_file ON symbols(project_id, file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_entry_points ON symbols(project_id, entry_kind) WHERE entry_kind IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_calls_source_resolved ON calls(source_symbol_id, resolved_symbol_id);  -- FK cascades + n3mo deps
+CREATE INDEX IF NOT EXISTS idx_calls_project_resolved ON calls(project_id, resolved_symbol_id);
+CREATE INDEX IF NOT EXISTS idx_calls_project_name ON calls(project_id, call_name);
+CREATE INDEX IF NOT EXISTS idx_calls_project_unresolved ON calls(project_id) WHERE resolved_symbol_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_imports_project_name ON imports(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_imports_project_file ON imports(project_id, file_path);          -- scoped call linking
+CREATE INDEX IF NOT EXISTS idx_file_edges_target ON file_edges(project_id, target_file);          -- reverse walks
+CREATE INDEX IF NOT EXISTS idx_package_edges_target ON package_edges(project_id, target_package);
+CREATE INDEX IF NOT EXISTS idx_symbol_components_component ON symbol_components(project_id, component_id);
+CREATE INDEX IF NOT EXISTS idx_component_edges_target ON component_edges(project_id, target_component);  -- reverse walks
+CREATE INDEX IF NOT EXISTS idx_inherits_base ON inherits(project_id, base_id);                       -- subclasses of X
+CREATE INDEX IF NOT EXISTS idx_project_packages_package ON project_packages(package);
+CREATE INDEX IF NOT EXISTS idx_cross_calls_target ON cross_calls(target_project_id, target_symbol_id);  -- reverse walks
+
+-- Symbol Search 🔎 (n3mo search, always scoped to one project)
+-- Existing databases: apply db/migrations/011_project_scoped_search.sql
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name_trgm ON symbols USING GIN (project_id, name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name_prefix ON symbols (project_id, lower(name) text_pattern_ops);
@@ -0,0 +1,155 @@
+-- db/schema_sqlite.sql
+-- Embedded backend (N3MO_DB=sqlite, src/sqlite_backend.py).
+-- Same tables and columns as db/schema.sql; applied on every connect, so
+-- it only ever uses IF NOT EXISTS. Keep the two files in step.
+--
+-- Type mapping: UUID -> TEXT, TEXT[]/INT[] -> TEXT_ARRAY/INT_ARRAY
+-- (JSON arrays, decoded back to lists by the backend), and
+-- UNIQUE NULLS NOT DISTINCT -> a unique index over COALESCE(col, '').
+
+-- 2. Projects Table
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    repo_url TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    indexed_at TIMESTAMP
+);
+
+-- 3. Symbols Table
+CREATE TABLE IF NOT EXISTS symbols (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    kind TEXT,
+    signature TEXT,
+    start_line INT,
+    end_line INT,
+    parent_id TEXT,
+    decorators TEXT_ARRAY,
+    entry_kind TEXT,
+    bases TEXT_ARRAY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unq_symbols ON symbols(project_id, file_path, COALESCE(parent_id, ''), name);
+
+-- 4. Calls Table
+CREATE TABLE IF NOT EXISTS calls (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    source_symbol_id TEXT REFERENCES symbols(id) ON DELETE CASCADE,
+    call_name TEXT NOT NULL,
+    line_number INT,
+    resolved_symbol_id TEXT,
+    dispatch_of TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 5. Imports Table
+CREATE TABLE IF NOT EXISTS imports (
+    id TEXT PRIMARY KEY,
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    file_path TEXT NOT NULL,
+    module TEXT NOT NULL,
+    name TEXT,
+    alias TEXT,
+    resolved_symbol_id TEXT,
+    resolved_file TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unq_imports ON imports(project_id, file_path, module, COALESCE(name, ''));
+
+-- 6. Module Graph
+CREATE TABLE IF NOT EXISTS file_edges (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    source_file TEXT NOT NULL,
+    target_file TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,
+    import_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, source_file, target_file)
+);
+
+CREATE TABLE IF NOT EXISTS package_edges (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    source_package TEXT NOT NULL,
+    target_package TEXT NOT NULL,
+    call_count INT NOT NULL DEFAULT 0,
+    import_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, source_package, target_package)
+);
+
+-- 7. Condensed Call Graph
+CREATE TABLE IF NOT EXISTS symbol_components (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    symbol_id TEXT NOT NULL,
+    component_id INT NOT NULL,
+    PRIMARY KEY (project_id, symbol_id)
+);
+
+CREATE TABLE IF NOT EXISTS component_edges (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    source_component INT NOT NULL,
+    target_component INT NOT NULL,
+    PRIMARY KEY (project_id, source_component, target_component)
+);
+
+-- 8. Reachability Labels
+CREATE TABLE IF NOT EXISTS component_labels (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    component_id INT NOT NULL,
+    out_hubs INT_ARRAY NOT NULL,
+    in_hubs INT_ARRAY NOT NULL,
+    PRIMARY KEY (project_id, component_id)
+);
+
+-- 9. Class Hierarchy
+CREATE TABLE IF NOT EXISTS inherits (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    class_id TEXT NOT NULL,
+    position INT NOT NULL,
+    base_name TEXT NOT NULL,
+    base_id TEXT,
+    PRIMARY KEY (project_id, class_id, position)
+);
+
+-- 10. Cross-Project Links
+CREATE TABLE IF NOT EXISTS project_packages (
+    project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    package TEXT NOT NULL,
+    path TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT 'index',
+    PRIMARY KEY (project_id, package)
+);
+
+CREATE TABLE IF NOT EXISTS cross_calls (
+    source_project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    call_id TEXT NOT NULL,
+    source_symbol_id TEXT NOT NULL,
+    target_project_id TEXT REFERENCES projects(id) ON DELETE CASCADE,
+    target_symbol_id TEXT NOT NULL,
+    PRIMARY KEY (source_project_id, call_id, target_symbol_id)
+);
+
+-- Indexes for Speed ⚡ (same set as db/schema.sql)
+CREATE INDEX IF NOT EXISTS idx_projects_repo_url ON projects(repo_url);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name ON symbols(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_symbols_project_file ON symbols(project_id, file_path);
+CREATE INDEX IF NOT EXISTS idx_symbols_entry_points ON symbols(project_id, entry_kind) WHERE entry_kind IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_calls_source_resolved ON calls(source_symbol_id, resolved_symbol_id);
+CREATE INDEX IF NOT EXISTS idx_calls_project_resolved ON calls(project_id, resolved_symbol_id);
+CREATE INDEX IF NOT EXISTS idx_calls_project_name ON calls(project_id, call_name);
+CREATE INDEX IF NOT EXISTS idx_calls_project_unresolved ON calls(project_id) WHERE resolved_symbol_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_imports_project_name ON imports(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_imports_project_file ON imports(project_id, file_path);
+CREATE INDEX IF NOT EXISTS idx_file_edges_target ON file_edges(project_id, target_file);
+CREATE INDEX IF NOT EXISTS idx_package_edges_target ON package_edges(project_id, target_package);
+CREATE INDEX IF NOT EXISTS idx_symbol_components_component ON symbol_components(project_id, component_id);
+CREATE INDEX IF NOT EXISTS idx_component_edges_target ON component_edges(project_id, target_component);
+CREATE INDEX IF NOT EXISTS idx_inherits_base ON inherits(project_id, base_id);
+CREATE INDEX IF NOT EXISTS idx_project_packages_package ON project_packages(package);
+CREATE INDEX IF NOT EXISTS idx_cross_calls_target ON cross_calls(target_project_id, target_symbol_id);
+
+-- Symbol Search 🔎 (no trigram index here: fuzzy search scans names)
+DROP INDEX IF EXISTS idx_symbols_name_prefix;
+CREATE INDEX IF NOT EXISTS idx_symbols_project_name_prefix ON symbols(project_id, lower(name));
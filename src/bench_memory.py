@@ -0,0 +1,139 @@
+"""
+Peak memory of a full rebuild's extraction, per 100k symbols.
+
+    python bench_memory.py                      # 100k synthetic symbols
+    python bench_memory.py --symbols 300000
+    python bench_memory.py --dir /path/to/repo  # a real tree instead
+    N3MO_DB=sqlite python bench_memory.py --load
+
+Each mode runs in a fresh interpreter: "dicts" is the per-row dict path
+(extract_file + ProjectRows) rebuilds used to hold, "columns" is
+ExtractionBatch. The figure is peak RSS above the interpreter's
+footprint once the parser is warm. --load also streams the rows through
+the bulk writer into staging tables of the configured database (dropped
+afterwards; the live tables are never touched).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("dicts", "columns")
+BENCH_PROJECT_ID = "00000000-0000-0000-0000-000000000000"    # staging tables have no foreign keys
+FUNCTIONS_PER_FILE = 40
+
+SYNTHETIC_FILE = '''import os
+from pkg.mod_{prev} import helper_{prev}_0, Service_{prev}
+
+
+class Service_{n}(Service_{prev}):
+{methods}
+
+{functions}
+'''
+METHOD = '''    def method_{i}(self, value):
+        self.method_{j}(value)
+        return helper_{n}_{i}(os.path.join(str(value), "x"))
+'''
+FUNCTION = '''@app.get("/items/{i}")
+def helper_{n}_{i}(value):
+    result = helper_{prev}_0(value)
+    return Service_{n}().method_{i}(len(result))
+'''
+
+
+def _status_kb(field):
+    """Current (VmRSS) or peak (VmHWM) resident set from /proc; ru_maxrss elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def generate(target_dir, symbols):
+    """Writes Python files with ~`symbols` definitions (classes, methods, decorated functions)."""
+    per_file = 1 + 2 * FUNCTIONS_PER_FILE
+    for n in range(max(1, symbols // per_file)):
+        methods = "\n".join(METHOD.format(i=i, j=(i + 1) % FUNCTIONS_PER_FILE, n=n) for i in range(FUNCTIONS_PER_FILE))
+        functions = "\n\n".join(FUNCTION.format(i=i, n=n, prev=max(n - 1, 0)) for i in range(FUNCTIONS_PER_FILE))
+        with open(os.path.join(target_dir, f"mod_{n}.py"), "w") as f:
+            f.write(SYNTHETIC_FILE.format(n=n, prev=max(n - 1, 0), methods=methods, functions=functions))
+
+
+def measure(mode, target_dir, load):
+    """Child process: extract (and optionally load) every file, report counts and memory."""
+    from bulk_loader import ExtractionBatch, ProjectRows, drop_shard_tables, load_shard, shard_stage_names
+    from crawler import crawl_directory
+    from extractors import extract_file
+
+    files = crawl_directory(target_dir, True)
+    extract_file(files[0])      # grammar and parser allocated before the baseline
+    baseline = _status_kb("VmRSS")
+
+    rows = ExtractionBatch(BENCH_PROJECT_ID) if mode == "columns" else ProjectRows(BENCH_PROJECT_ID)
+    for file_path in files:
+        rel_path = os.path.relpath(file_path, target_dir)
+        if mode == "columns":
+            rows.extract_file(rel_path, file_path)
+        else:
+            rows.add_file(rel_path, *extract_file(file_path))
+    held = _status_kb("VmRSS")
+
+    if load:
+        stage = shard_stage_names("bench", os.getpid())
+        try:
+            load_shard(rows, stage)
+        finally:
+            drop_shard_tables([stage])
+
+    peak = _status_kb("VmHWM")
+    print(json.dumps({"symbols": len(rows.symbols), "calls": len(rows.calls), "imports": len(rows.imports),
+                      "held_kb": held - baseline, "peak_kb": peak - baseline}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark extraction memory per 100k symbols")
+    ap.add_argument("--symbols", type=int, default=100000, help="synthetic symbols to generate")
+    ap.add_argument("--dir", default=None, help="index this tree instead of a synthetic one")
+    ap.add_argument("--load", action="store_true", help="also bulk-load into the configured database")
+    ap.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        return measure(args.child, args.dir, args.load)
+
+    with tempfile.TemporaryDirectory(prefix="n3mo-bench-") as scratch:
+        target_dir = args.dir
+        if target_dir is None:
+            target_dir = scratch
+            generate(target_dir, args.symbols)
+
+        print(f"🧪 {target_dir}{' (with --load)' if args.load else ''}\n")
+        print(f"{'mode':<9} {'symbols':>9} {'calls':>9} {'held':>10} {'peak':>10} {'peak / 100k sym':>16}")
+        print("-" * 68)
+        results = {}
+        for mode in MODES:
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, "--dir", target_dir]
+            proc = subprocess.run(cmd + (["--load"] if args.load else []), capture_output=True, text=True, cwd=SRC_DIR)
+            if proc.returncode != 0:
+                print(f"{mode:<9} ❌ {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}")
+                continue
+            result = results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+            per_100k = result["peak_kb"] / max(result["symbols"], 1) * 100000 / 1024
+            print(f"{mode:<9} {result['symbols']:>9} {result['calls']:>9} {result['held_kb'] / 1024:>8.1f}MB "
+                  f"{result['peak_kb'] / 1024:>8.1f}MB {per_100k:>14.1f}MB")
+
+        if len(results) == len(MODES) and results["columns"]["peak_kb"] > 0:
+            print(f"\n📉 columns use {results['dicts']['peak_kb'] / results['columns']['peak_kb']:.1f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmarks the linking and impact queries on a multi-project database.
+
+    python bench_queries.py --seed 200 --symbols 5000   # synthetic projects
+    python bench_queries.py                             # time the queries
+    python bench_queries.py --drop                      # remove bench data
+
+Run it before and after db/migrations/001_project_scoped_indexes.sql (or
+db/partitioning.sql) to compare plans. Linking runs inside a transaction
+that is rolled back, so the benchmark never changes real data.
+"""
+import argparse
+import time
+
+from psycopg2 import sql
+
+from database import get_connection
+from impact import IMPACT_QUERY, MAX_DEPTH
+from resolve_calls import QUERY_EXACT, QUERY_SMART
+
+BENCH_PREFIX = "bench://"
+
+SEED_PROJECTS = """
+INSERT INTO projects (id, name, repo_url)
+SELECT uuid_generate_v4(), 'bench-' || p, 'bench://' || p
+FROM generate_series(1, %(projects)s) p;
+"""
+
+SEED_SYMBOLS = """
+INSERT INTO symbols (id, project_id, name, file_path, kind, signature, start_line, end_line)
+SELECT uuid_generate_v4(), pr.id, 'fn_' || i, 'pkg/mod_' || (i / 50) || '.py', 'FUNCTION',
+       'function fn_' || i || '...', (i %% 50) * 10 + 1, (i %% 50) * 10 + 9
+FROM projects pr, generate_series(1, %(symbols)s) i
+WHERE pr.repo_url LIKE 'bench://%%';
+"""
+
+# Three calls per symbol: one bare, one self., one module-qualified
+SEED_CALLS = """
+INSERT INTO calls (id, project_id, source_symbol_id, call_name, line_number)
+SELECT uuid_generate_v4(), s.project_id, s.id,
+       (ARRAY['', 'self.', 'mod.'])[k] || 'fn_' || (1 + abs(hashtext(s.id::text || k)::bigint) %% %(symbols)s),
+       s.start_line + k
+FROM symbols s
+JOIN projects pr ON pr.id = s.project_id AND pr.repo_url LIKE 'bench://%%',
+     generate_series(1, 3) k;
+"""
+
+def seed(projects, symbols):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            print(f"🌱 Seeding {projects} projects x {symbols} symbols...")
+            cur.execute(SEED_PROJECTS, {"projects": projects})
+            cur.execute(SEED_SYMBOLS, {"symbols": symbols})
+            cur.execute(SEED_CALLS, {"symbols": symbols})
+            conn.commit()
+            cur.execute("ANALYZE symbols; ANALYZE calls;")
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def drop():
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM projects WHERE repo_url LIKE %s", (BENCH_PREFIX + "%",))
+            print(f"🧹 Removed {cur.rowcount} bench projects.")
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def _explain(cur, label, query, params):
+    start = time.perf_counter()
+    cur.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") + query, params)
+    wall = (time.perf_counter() - start) * 1000
+    plan = cur.fetchone()[0][0]
+    print(f"   {label:<10} {plan['Execution Time']:>10.1f} ms  (wall {wall:.1f} ms)  "
+          f"root: {plan['Plan']['Node Type']}")
+
+
+def run(runs):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM projects")
+            total_projects = cur.fetchone()[0]
+            cur.execute(
+                "SELECT id FROM projects WHERE repo_url LIKE %s ORDER BY repo_url LIMIT %s",
+                (BENCH_PREFIX + "%", runs)
+            )
+            project_ids = [row[0] for row in cur.fetchall()]
+        if not project_ids:
+            print("❌ No bench projects found. Seed first with --seed N.")
+            return
+
+        print(f"📊 {total_projects} projects in database, timing {len(project_ids)} of them\n")
+        for project_id in project_ids:
+            print(f"🔹 Project {project_id}")
+            with conn.cursor() as cur:
+                tables = {"calls": sql.Identifier("calls"), "symbols": sql.Identifier("symbols")}
+                _explain(cur, "link/exact", sql.SQL(QUERY_EXACT).format(**tables), (project_id,))
+                _explain(cur, "link/smart", sql.SQL(QUERY_SMART).format(**tables), (project_id,))
+
+                # Impact from the most-called symbol (worst case fan-in)
+                cur.execute("""
+                    SELECT resolved_symbol_id FROM calls
+                    WHERE project_id = %s AND resolved_symbol_id IS NOT NULL
+                    GROUP BY resolved_symbol_id ORDER BY count(*) DESC LIMIT 1
+                """, (project_id,))
+                row = cur.fetchone()
+                if row:
+                    _explain(cur, "impact", sql.SQL(IMPACT_QUERY),
+                             {"project_id": project_id, "target_id": row[0], "max_depth": MAX_DEPTH})
+            conn.rollback()
+            print()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark N3MO linking and impact queries")
+    ap.add_argument("--seed", type=int, metavar="PROJECTS", help="create N synthetic projects")
+    ap.add_argument("--symbols", type=int, default=5000, help="symbols per seeded project")
+    ap.add_argument("--runs", type=int, default=3, help="projects to time")
+    ap.add_argument("--drop", action="store_true", help="delete synthetic projects")
+    args = ap.parse_args()
+
+    if args.drop:
+        drop()
+    elif args.seed:
+        seed(args.seed, args.symbols)
+    else:
+        run(args.runs)
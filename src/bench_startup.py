@@ -0,0 +1,90 @@
+"""
+Measures CLI startup overhead with `python -X importtime`.
+
+    python bench_startup.py            # --help paths + daemon client
+    python bench_startup.py --runs 20
+
+For each scenario it reports the median wall time, the import time the
+scenario adds on top of a bare interpreter, and the heaviest imports.
+The daemon scenario (a cached `n3mo impact` answered by `n3mo serve`)
+is skipped when no daemon socket is reachable.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+BUDGET_MS = 100.0
+
+
+def _parse_importtime(stderr):
+    """
+    Returns {module: cumulative_us} for top-level imports only.
+    Lines look like: 'import time:   self [us] |  cumulative | imported package'
+    """
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        # Nested imports are indented past the single separating space
+        if parts[2].startswith("  "):
+            continue
+        top_level[parts[2].strip()] = int(parts[1])
+    return top_level
+
+
+def _run(cmd, runs):
+    walls, imports = [], None
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + cmd,
+                              capture_output=True, text=True, env=env, cwd=SRC_DIR)
+        walls.append((time.perf_counter() - start) * 1000)
+        imports = _parse_importtime(proc.stderr)
+    return statistics.median(walls), imports
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark n3mo CLI startup")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--symbol", default="main", help="symbol for the daemon impact query")
+    args = ap.parse_args()
+
+    socket_path = os.path.join(os.getenv("N3MO_SOCKET_DIR", "/tmp/n3mo"), "n3mo.sock")
+    scenarios = [
+        ("n3mo impact --help", ["cli.py", "impact", "--help"]),
+        ("n3mo search --help", ["cli.py", "search", "--help"]),
+    ]
+    if os.path.exists(socket_path):
+        scenarios.append((f"n3mo impact {args.symbol} (daemon)",
+                          [os.path.join(ROOT_DIR, "wrapper.py"), "impact", args.symbol]))
+
+    base_wall, base_imports = _run(["-c", "pass"], args.runs)
+    base_us = sum(base_imports.values())
+    print(f"🐍 Bare interpreter: {base_wall:.1f} ms wall\n")
+
+    print(f"{'scenario':<36} {'wall':>9} {'overhead':>10} {'imports':>9}  heaviest")
+    print("-" * 100)
+    for label, cmd in scenarios:
+        wall, imports = _run(cmd, args.runs)
+        import_ms = (sum(imports.values()) - base_us) / 1000
+        overhead = wall - base_wall
+        heaviest = sorted(((us, mod) for mod, us in imports.items() if mod not in base_imports), reverse=True)[:3]
+        heavy_text = ", ".join(f"{mod} {us / 1000:.1f}ms" for us, mod in heaviest)
+        flag = "✅" if overhead < BUDGET_MS else "❌"
+        print(f"{label:<36} {wall:>7.1f}ms {overhead:>8.1f}ms {import_ms:>7.1f}ms  {heavy_text} {flag}")
+
+    if not os.path.exists(socket_path):
+        print(f"\nℹ️  No daemon at {socket_path}; start `n3mo serve` to time a cached query.")
+
+
+if __name__ == "__main__":
+    main()
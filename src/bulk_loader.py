@@ -0,0 +1,491 @@
+import io
+import itertools
+import re
+import time
+import uuid
+from array import array
+
+from psycopg2 import sql
+
+from database import execute_values, get_connection, use_sqlite
+from extractors import extract_file_into
+from resolve_calls import link_calls
+from resolve_imports import link_imports
+from modgraph import refresh_module_edges
+from scc import refresh_components
+from hierarchy import refresh_inherits
+from reachability import refresh_reachability
+
+# ==========================================
+# 🚚 FULL REBUILD (Staging Tables + Atomic Swap)
+# ==========================================
+# 1. COPY every row into UNLOGGED staging tables (no WAL, no indexes)
+# 2. Build indexes on staging *after* the load, then link there
+# 3. Replace the project's live rows in ONE transaction
+#
+# Readers running `n3mo impact` keep seeing the old snapshot until the
+# swap commits, and stale rows from deleted files disappear with it.
+#
+# Sharded rebuilds (shard_index.py) split step 1: each worker loads its
+# shard with load_shard(), and rebuild_from_shards() merges the shard
+# tables into one staging set before linking and swapping as usual.
+#
+# Staging tables are committed before linking, so a crashed run leaves
+# them behind. Their names start with the creation time (hex seconds) and
+# every rebuild first drops the ones older than STALE_STAGE_SECONDS.
+
+SYMBOL_COLUMNS = ("id", "project_id", "parent_id", "file_path", "name", "kind", "signature", "start_line", "end_line",
+                  "decorators", "entry_kind", "bases")
+IMPORT_COLUMNS = ("id", "project_id", "file_path", "module", "name", "alias")
+IMPORT_LINK_COLUMNS = IMPORT_COLUMNS + ("resolved_symbol_id", "resolved_file")   # filled on staging
+CALL_COLUMNS = ("id", "project_id", "source_symbol_id", "call_name", "line_number", "resolved_symbol_id", "dispatch_of")
+
+COPY_CHUNK = 50000     # rows rendered per COPY, so the text buffer stays bounded
+STALE_STAGE_SECONDS = 24 * 3600    # no live rebuild is older; anything older was abandoned
+_STAGE_TABLE = re.compile(r"^(?:stage|shard)_(?:symbols|imports|calls)_([0-9a-f]{8})_")
+
+STAGE_INDEXES = {
+    "symbols": ["(id)", "(name)", "(file_path)"],
+    "imports": ["(name)", "(file_path)"],
+    "calls": ["(call_name)", "(source_symbol_id)"],
+}
+
+
+class ProjectRows:
+    """
+    Collects extractor output for a whole project, applying the same
+    de-duplication the live upserts do (project + file + parent + name).
+    """
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.files = []       # every crawled file, for the module map
+        self.symbols = []
+        self.imports = []
+        self.calls = []
+        self._symbol_keys = {}
+        self._import_keys = set()
+        self._id_remap = {}
+
+    def add_file(self, rel_path, symbols, imports, calls):
+        self.files.append(rel_path)
+        for sym in symbols:
+            parent_id = self._id_remap.get(sym["parent_id"], sym["parent_id"])
+            key = (rel_path, parent_id, sym["name"])
+            if key in self._symbol_keys:
+                # Same as ON CONFLICT DO UPDATE: first id wins, latest position wins
+                kept = self._symbol_keys[key]
+                kept[6], kept[7], kept[8] = sym["signature"], sym["start_line"], sym["end_line"]
+                kept[9], kept[10], kept[11] = sym.get("decorators") or [], sym.get("entry_kind"), sym.get("bases") or []
+                self._id_remap[sym["id"]] = kept[0]
+                continue
+            row = [sym["id"], self.project_id, parent_id, rel_path, sym["name"],
+                   sym["kind"], sym["signature"], sym["start_line"], sym["end_line"],
+                   sym.get("decorators") or [], sym.get("entry_kind"), sym.get("bases") or []]
+            self._symbol_keys[key] = row
+            self.symbols.append(row)
+
+        for imp in imports:
+            key = (rel_path, imp["module"], imp["name"])
+            if key in self._import_keys:
+                continue
+            self._import_keys.add(key)
+            self.imports.append((imp["id"], self.project_id, rel_path, imp["module"], imp["name"], imp["alias"]))
+
+        for call in calls:
+            source_id = self._id_remap.get(call["source_symbol_id"], call["source_symbol_id"])
+            self.calls.append((call["id"], self.project_id, source_id, call["call_name"], call["line_number"], None, None))
+
+
+class _RowView:
+    """len() and iteration over one table of an ExtractionBatch, rows built on the fly."""
+    __slots__ = ("_length", "_rows")
+
+    def __init__(self, length, rows):
+        self._length = length
+        self._rows = rows
+
+    def __len__(self):
+        return self._length()
+
+    def __iter__(self):
+        return self._rows()
+
+
+class ExtractionBatch:
+    """
+    ProjectRows for full rebuilds, stored as columns instead of a dict and
+    a row per symbol, call and import. Strings are interned once per
+    batch, ids are integers, and the UUIDs, signatures and row tuples are
+    only built while streaming into COPY. Same de-duplication as
+    ProjectRows, and the same .files / .symbols / .imports / .calls
+    interface for rebuild_project() and load_shard().
+    """
+    __slots__ = ("project_id", "files", "strings", "_string_ids", "_ids",
+                 "sym_file", "sym_parent", "sym_name", "sym_kind", "sym_signature", "sym_start", "sym_end",
+                 "sym_entry", "sym_decorators", "sym_bases",
+                 "call_source", "call_name", "call_line",
+                 "imp_file", "imp_module", "imp_name", "imp_alias",
+                 "_file", "_symbol_keys", "_import_keys")
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.files = []            # every crawled file, for the module map
+        self.strings = []          # string id -> text
+        self._string_ids = {}
+        # UUIDs are one random prefix per table plus the row's integer id,
+        # unique across batches (and shards) without storing them
+        self._ids = [uuid.uuid4().int & ~0xFFFFFFFF for _ in range(3)]
+        self.sym_file, self.sym_parent, self.sym_name = array("i"), array("i"), array("i")
+        self.sym_kind, self.sym_signature = array("i"), array("i")
+        self.sym_start, self.sym_end, self.sym_entry = array("i"), array("i"), array("i")
+        self.sym_decorators, self.sym_bases = [], []
+        self.call_source, self.call_name, self.call_line = array("i"), array("i"), array("i")
+        self.imp_file, self.imp_module, self.imp_name, self.imp_alias = array("i"), array("i"), array("i"), array("i")
+        self._file = -1
+        self._symbol_keys = {}     # this file's (parent, name) -> symbol id; keys never span files
+        self._import_keys = set()
+
+    def _intern(self, text):
+        if text is None:
+            return -1
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def _interned_tuple(self, values):
+        return tuple(self.strings[self._intern(v)] for v in values) if values else ()
+
+    def extract_file(self, rel_path, file_path):
+        """Extracts one file straight into the columns; nothing is kept from a file that fails."""
+        self.files.append(rel_path)
+        self._file = self._intern(rel_path)
+        self._symbol_keys.clear()
+        self._import_keys.clear()
+        marks = [len(column) for column in (self.sym_file, self.call_source, self.imp_file)]
+        if not extract_file_into(file_path, self):
+            for columns, mark in zip(((self.sym_file, self.sym_parent, self.sym_name, self.sym_kind,
+                                       self.sym_signature, self.sym_start, self.sym_end, self.sym_entry,
+                                       self.sym_decorators, self.sym_bases),
+                                      (self.call_source, self.call_name, self.call_line),
+                                      (self.imp_file, self.imp_module, self.imp_name, self.imp_alias)), marks):
+                for column in columns:
+                    del column[mark:]
+
+    # --- Sink (see extractors.FileRows) ---
+
+    def add_symbol(self, parent_id, name, kind, start_line, end_line, decorators, entry_kind, bases):
+        parent = -1 if parent_id is None else parent_id
+        name_id, kind_id = self._intern(name), self._intern(kind)
+        key = (parent, name_id)
+        symbol_id = self._symbol_keys.get(key)
+        if symbol_id is not None:
+            # Same as ON CONFLICT DO UPDATE: first id wins, latest position wins
+            self.sym_signature[symbol_id] = kind_id
+            self.sym_start[symbol_id], self.sym_end[symbol_id] = start_line, end_line
+            self.sym_entry[symbol_id] = self._intern(entry_kind)
+            self.sym_decorators[symbol_id] = self._interned_tuple(decorators)
+            self.sym_bases[symbol_id] = self._interned_tuple(bases)
+            return symbol_id
+        symbol_id = self._symbol_keys[key] = len(self.sym_file)
+        self.sym_file.append(self._file)
+        self.sym_parent.append(parent)
+        self.sym_name.append(name_id)
+        self.sym_kind.append(kind_id)
+        self.sym_signature.append(kind_id)
+        self.sym_start.append(start_line)
+        self.sym_end.append(end_line)
+        self.sym_entry.append(self._intern(entry_kind))
+        self.sym_decorators.append(self._interned_tuple(decorators))
+        self.sym_bases.append(self._interned_tuple(bases))
+        return symbol_id
+
+    def add_call(self, source_id, call_name, line_number):
+        self.call_source.append(source_id)
+        self.call_name.append(self._intern(call_name))
+        self.call_line.append(line_number)
+
+    def add_import(self, module, name=None, alias=None):
+        key = (self._intern(module), self._intern(name))
+        if key in self._import_keys:
+            return
+        self._import_keys.add(key)
+        self.imp_file.append(self._file)
+        self.imp_module.append(key[0])
+        self.imp_name.append(key[1])
+        self.imp_alias.append(self._intern(alias))
+
+    # --- Rows for the bulk writer ---
+
+    def _uuid(self, table, row_id):
+        return str(uuid.UUID(int=self._ids[table] | row_id))
+
+    def _symbol_rows(self):
+        strings = self.strings
+        for i in range(len(self.sym_file)):
+            parent, entry = self.sym_parent[i], self.sym_entry[i]
+            name = strings[self.sym_name[i]]
+            yield (self._uuid(0, i), self.project_id, self._uuid(0, parent) if parent >= 0 else None,
+                   strings[self.sym_file[i]], name, strings[self.sym_kind[i]],
+                   f"{strings[self.sym_signature[i]].lower()} {name}...", self.sym_start[i], self.sym_end[i],
+                   self.sym_decorators[i], strings[entry] if entry >= 0 else None, self.sym_bases[i])
+
+    def _import_rows(self):
+        strings = self.strings
+        for i in range(len(self.imp_file)):
+            module, name, alias = self.imp_module[i], self.imp_name[i], self.imp_alias[i]
+            yield (self._uuid(2, i), self.project_id, strings[self.imp_file[i]],
+                   strings[module] if module >= 0 else None, strings[name] if name >= 0 else None,
+                   strings[alias] if alias >= 0 else None)
+
+    def _call_rows(self):
+        strings = self.strings
+        for i in range(len(self.call_source)):
+            yield (self._uuid(1, i), self.project_id, self._uuid(0, self.call_source[i]),
+                   strings[self.call_name[i]], self.call_line[i], None, None)
+
+    @property
+    def symbols(self):
+        return _RowView(lambda: len(self.sym_file), self._symbol_rows)
+
+    @property
+    def imports(self):
+        return _RowView(lambda: len(self.imp_file), self._import_rows)
+
+    @property
+    def calls(self):
+        return _RowView(lambda: len(self.call_source), self._call_rows)
+
+
+def _copy_value(value):
+    # COPY text format: \N is NULL, backslash escapes tab/newline/CR
+    if value is None:
+        return "\\N"
+    if isinstance(value, (list, tuple)):
+        # Array literal: {"a","b"} with quotes and backslashes escaped
+        value = "{" + ",".join('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in value) + "}"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _copy_rows(cur, table, columns, rows):
+    rows = iter(rows)
+    if not hasattr(cur, "copy_expert"):
+        # Embedded backend (sqlite_backend.py): no COPY, batched inserts instead
+        query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns)))
+        while chunk := list(itertools.islice(rows, COPY_CHUNK)):
+            execute_values(cur, query, chunk)
+        return
+    query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+    ).as_string(cur)
+    while True:
+        buf = io.StringIO()
+        for row in itertools.islice(rows, COPY_CHUNK):
+            buf.write("\t".join(map(_copy_value, row)))
+            buf.write("\n")
+        if not buf.tell():
+            return
+        buf.seek(0)
+        cur.copy_expert(query, buf)
+
+
+def new_run_id():
+    """Unique staging suffix that starts with the creation time, so leftovers can be aged."""
+    return f"{int(time.time()):08x}_{uuid.uuid4().hex[:6]}"
+
+
+def _stage_names(prefix="stage", suffix=None):
+    suffix = suffix or new_run_id()
+    return {base: f"{prefix}_{base}_{suffix}" for base in ("symbols", "imports", "calls")}
+
+
+def shard_stage_names(run, shard):
+    """Staging tables for one shard of a sharded rebuild."""
+    return _stage_names("shard", f"{run}_{shard}")
+
+
+def _create_stage_tables(cur, stage, shared=False):
+    # Postgres UNLOGGED tables are visible to every session. SQLite keeps them
+    # in temp (one connection), so shards loaded by other processes need real ones.
+    kind = "TABLE" if shared and use_sqlite() else "UNLOGGED TABLE"
+    for base, table in stage.items():
+        cur.execute(sql.SQL("CREATE " + kind + " {} (LIKE {} INCLUDING DEFAULTS)").format(
+            sql.Identifier(table), sql.Identifier(base)))
+
+
+def _index_stage_tables(cur, stage):
+    for base, table in stage.items():
+        for i, cols in enumerate(STAGE_INDEXES[base]):
+            cur.execute(sql.SQL("CREATE INDEX {} ON {} " + cols).format(
+                sql.Identifier(f"{table}_i{i}"), sql.Identifier(table)))
+        cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+
+
+def _drop_stage_tables(cur, stage):
+    for table in stage.values():
+        cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+
+
+def _drop_quietly(conn, stages):
+    """Post-rebuild cleanup: logs instead of raising, so it never masks the rebuild's own error."""
+    try:
+        with conn.cursor() as cur:
+            for stage in stages:
+                _drop_stage_tables(cur, stage)
+        conn.commit()
+    except Exception as e:
+        tables = ", ".join(table for stage in stages for table in stage.values())
+        print(f"⚠️  Could not drop staging tables ({tables}): {e}")
+        print("   The next rebuild drops them once they are a day old (or DROP them by hand).")
+
+
+def drop_stale_stage_tables():
+    """Drops staging and shard tables left by rebuilds that crashed more than STALE_STAGE_SECONDS ago."""
+    conn = None
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            if use_sqlite():
+                cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            else:
+                cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = current_schema()")
+            cutoff = time.time() - STALE_STAGE_SECONDS
+            stale = []
+            for (table,) in cur.fetchall():
+                match = _STAGE_TABLE.match(table)
+                if match and int(match.group(1), 16) < cutoff:
+                    stale.append(table)
+            for table in stale:
+                cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+        conn.commit()
+        if stale:
+            print(f"🧹 Dropped {len(stale)} staging tables left by an earlier crashed rebuild")
+    except Exception as e:
+        print(f"⚠️  Could not sweep old staging tables: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def _swap_project(cur, project_id, stage):
+    # Serialise concurrent rebuilds of the same project
+    cur.execute("SELECT id FROM projects WHERE id = %s FOR UPDATE", (project_id,))
+
+    cur.execute("DELETE FROM calls WHERE project_id = %s", (project_id,))
+    cur.execute("DELETE FROM imports WHERE project_id = %s", (project_id,))
+    cur.execute("DELETE FROM symbols WHERE project_id = %s", (project_id,))
+
+    for base, columns in (("symbols", SYMBOL_COLUMNS), ("imports", IMPORT_LINK_COLUMNS), ("calls", CALL_COLUMNS)):
+        cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+        cur.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+            sql.Identifier(base), cols, cols, sql.Identifier(stage[base])))
+
+    refresh_inherits(cur, project_id)
+    refresh_module_edges(cur, project_id)
+    refresh_components(cur, project_id)
+    refresh_reachability(cur, project_id)
+    cur.execute("UPDATE projects SET indexed_at = NOW() WHERE id = %s", (project_id,))
+
+
+def _link_and_swap(conn, cur, project_id, stage, files):
+    """Indexes and links a loaded staging set, then swaps it in. Returns linked call count."""
+    _index_stage_tables(cur, stage)
+    conn.commit()
+
+    # --- Link (on staging, invisible to readers) ---
+    link_imports(cur, project_id, imports_table=stage["imports"], symbols_table=stage["symbols"], files=files)
+    matches = link_calls(cur, project_id, calls_table=stage["calls"], symbols_table=stage["symbols"],
+                         imports_table=stage["imports"])
+    conn.commit()
+
+    # --- Swap ---
+    _swap_project(cur, project_id, stage)
+    conn.commit()
+    return sum(matches)
+
+
+def rebuild_project(rows):
+    """
+    Loads a ProjectRows snapshot and atomically replaces the project's data.
+    Returns (symbols, imports, calls, linked_calls).
+    """
+    project_id = rows.project_id
+    stage = _stage_names()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            # --- Load ---
+            _create_stage_tables(cur, stage)
+            _copy_rows(cur, stage["symbols"], SYMBOL_COLUMNS, rows.symbols)
+            _copy_rows(cur, stage["imports"], IMPORT_COLUMNS, rows.imports)
+            _copy_rows(cur, stage["calls"], CALL_COLUMNS, rows.calls)
+            linked = _link_and_swap(conn, cur, project_id, stage, rows.files)
+            return len(rows.symbols), len(rows.imports), len(rows.calls), linked
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _drop_quietly(conn, [stage])
+        conn.close()
+
+
+def load_shard(rows, stage):
+    """
+    Worker side of a sharded rebuild: COPYs one shard's rows into its own
+    staging tables (left in place for the coordinator). Returns row counts.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            _create_stage_tables(cur, stage, shared=True)
+            _copy_rows(cur, stage["symbols"], SYMBOL_COLUMNS, rows.symbols)
+            _copy_rows(cur, stage["imports"], IMPORT_COLUMNS, rows.imports)
+            _copy_rows(cur, stage["calls"], CALL_COLUMNS, rows.calls)
+        conn.commit()
+        return len(rows.symbols), len(rows.imports), len(rows.calls)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def rebuild_from_shards(project_id, files, shard_stages):
+    """
+    Coordinator side: merges the shards' staging tables, links across all
+    of them and swaps the project atomically. Shard tables are dropped
+    either way. Returns the linked call count.
+    """
+    stage = _stage_names()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            _create_stage_tables(cur, stage)
+            for base, columns in (("symbols", SYMBOL_COLUMNS), ("imports", IMPORT_COLUMNS), ("calls", CALL_COLUMNS)):
+                cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+                for shard in shard_stages:
+                    cur.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                        sql.Identifier(stage[base]), cols, cols, sql.Identifier(shard[base])))
+            return _link_and_swap(conn, cur, project_id, stage, files)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _drop_quietly(conn, [stage])
+        conn.close()
+        drop_shard_tables(shard_stages)
+
+
+def drop_shard_tables(shard_stages):
+    conn = None
+    try:
+        conn = get_connection()
+        _drop_quietly(conn, shard_stages)
+    except Exception as e:
+        print(f"⚠️  Could not drop shard tables: {e}")
+    finally:
+        if conn: conn.close()
@@ -0,0 +1,372 @@
+import threading
+from bisect import insort
+from collections import defaultdict
+
+from entry_points import reverse_bfs, sort_entry_points
+from reachability import build_labels, labels_reach, unwind_path
+from scc import condense
+
+# ==========================================
+# 🕸️ IN-MEMORY CALL GRAPH
+# ==========================================
+# A read-only snapshot of one project's resolved call edges, loaded once
+# and kept warm by long-running processes (the daemon, the graph server).
+# Traversals return the same rows as the SQL in impact.py / deps.py,
+# including the walk over strongly connected components (scc.py).
+#
+# The language server (lsp_server.py) also patches its own copy file by
+# file as buffers change (replace_file); components are recomputed
+# lazily, on the next traversal that needs them.
+
+SYMBOLS_QUERY = """
+SELECT id, name, file_path, start_line, end_line, kind, parent_id, entry_kind, decorators
+FROM symbols WHERE project_id = %s
+ORDER BY file_path, start_line, id;     -- by_name in impact.find_target's order
+"""
+
+EDGES_QUERY = """
+SELECT source_symbol_id, resolved_symbol_id, line_number
+FROM calls
+WHERE project_id = %s AND resolved_symbol_id IS NOT NULL;
+"""
+
+
+class CallGraph:
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.stamp = None                  # projects.indexed_at at load time
+        self.symbols = {}                  # id -> (name, file_path, start_line, end_line, kind)
+        self.by_name = defaultdict(list)   # name -> [id, ...]
+        self.by_file = defaultdict(list)   # file_path -> [id, ...]
+        self.parents = {}                  # id -> parent id (methods, nested defs)
+        self.entry_points = {}             # id -> (entry_kind, decorators) for tagged symbols
+        self.callers = defaultdict(list)   # callee id -> [(caller id, line), ...]
+        self.callees = defaultdict(list)   # caller id -> [(callee id, line), ...]
+        self.component_of = {}             # id -> component (topological, callers first)
+        self.members = []                  # component -> [id, ...]
+        self.component_callers = defaultdict(set)
+        self.component_callees = defaultdict(set)
+        self.labels = None                 # (out_labels, in_labels), built on first reaches()
+        self._labels_lock = threading.Lock()
+        self._stale = False                # components predate a replace_file()
+
+    @classmethod
+    def load(cls, cur, project_id):
+        graph = cls(project_id)
+        cur.execute(SYMBOLS_QUERY, (project_id,))
+        for symbol_id, name, file_path, start_line, end_line, kind, parent_id, entry_kind, decorators in cur:
+            symbol_id = str(symbol_id)
+            graph.symbols[symbol_id] = (name, file_path, start_line, end_line, kind)
+            graph.by_name[name].append(symbol_id)
+            graph.by_file[file_path].append(symbol_id)
+            if parent_id:
+                graph.parents[symbol_id] = str(parent_id)
+            if entry_kind:
+                graph.entry_points[symbol_id] = (entry_kind, decorators or [])
+
+        cur.execute(EDGES_QUERY, (project_id,))
+        for source_id, target_id, line in cur:
+            source_id, target_id = str(source_id), str(target_id)
+            graph.callers[target_id].append((source_id, line))
+            graph.callees[source_id].append((target_id, line))
+        graph._condense()
+        return graph
+
+    def _condense(self):
+        successors = {node: [t for t, _ in edges] for node, edges in self.callees.items()}
+        self.component_of, self.members, dag_edges = condense(list(self.symbols), successors)
+        # Cleared in place: walks pick the dict before component_levels re-condenses
+        self.component_callers.clear()
+        self.component_callees.clear()
+        for source, target in dag_edges:
+            self.component_callees[source].add(target)
+            self.component_callers[target].add(source)
+        self.labels = None
+        self._stale = False
+
+    def _ensure_condensed(self):
+        if self._stale:
+            self._condense()
+
+    def replace_file(self, file_path, symbols, imports, calls):
+        """
+        Swaps one file's definitions and outgoing calls for a fresh
+        extraction (symbols, imports, calls as the extractors return them).
+        Definitions that survive keep their ids, so edges from other files
+        stay. The file's calls are linked by name in memory, in the order
+        resolve_calls.py uses: same file, imports, the enclosing class,
+        then project-wide. Calls elsewhere that a new name could now
+        satisfy are picked up on the next load from the database.
+        """
+        old_ids = list(self.by_file.pop(file_path, ()))
+        old = qualified_keys((i, file_path, self.parents.get(i), self.symbols[i][0]) for i in old_ids)
+        new = qualified_keys((s["id"], file_path, s["parent_id"], s["name"]) for s in symbols)
+        kept = {new[key]: old[key] for key in new.keys() & old.keys()}
+        removed = {old[key] for key in old.keys() - new.keys()}
+
+        for symbol_id in old_ids:
+            name = self.symbols.pop(symbol_id)[0]
+            self.by_name[name].remove(symbol_id)
+            if not self.by_name[name]:
+                del self.by_name[name]
+            self.parents.pop(symbol_id, None)
+            self.entry_points.pop(symbol_id, None)
+            for callee, _ in self.callees.pop(symbol_id, ()):
+                self.callers[callee] = [edge for edge in self.callers[callee] if edge[0] != symbol_id]
+        for symbol_id in removed:
+            for caller, _ in self.callers.pop(symbol_id, ()):
+                self.callees[caller] = [edge for edge in self.callees[caller] if edge[0] != symbol_id]
+
+        ids = {s["id"]: kept.get(s["id"], s["id"]) for s in symbols}
+        for s in symbols:
+            symbol_id = ids[s["id"]]
+            self.symbols[symbol_id] = (s["name"], file_path, s["start_line"], s["end_line"], s["kind"])
+            insort(self.by_name[s["name"]], symbol_id, key=self._name_order)
+            self.by_file[file_path].append(symbol_id)
+            if s["parent_id"]:
+                self.parents[symbol_id] = ids.get(s["parent_id"], s["parent_id"])
+            if s.get("entry_kind"):
+                self.entry_points[symbol_id] = (s["entry_kind"], s.get("decorators") or [])
+        local = {self.symbols[i][0]: i for i in self.by_file[file_path] if i not in self.parents}
+        for call in calls:
+            source_id = ids.get(call["source_symbol_id"])
+            target_id = self._link(file_path, local, source_id, call["call_name"], imports) if source_id else None
+            if target_id:
+                self.callees[source_id].append((target_id, call["line_number"]))
+                self.callers[target_id].append((source_id, call["line_number"]))
+        self._stale = True
+
+    def _link(self, file_path, local, source_id, call_name, imports):
+        if call_name in local:
+            return local[call_name]
+        prefix, _, attr = call_name.rpartition(".")
+        for imp in imports:
+            bound = imp.get("alias") or imp.get("name") or imp["module"]
+            module = imp["module"].lstrip(".").replace(".", "/")
+            if imp.get("name") and imp["name"] != "*" and call_name == bound:
+                found = self._named(imp["name"], module)
+            elif prefix and prefix == bound:
+                found = self._named(attr, "/".join(filter(None, (module, imp.get("name")))))
+            else:
+                continue
+            if found:
+                return found
+        if prefix in ("self", "cls", "this", "super()"):
+            owner = self.parents.get(source_id)
+            while owner and self.symbols[owner][4] != "CLASS":
+                owner = self.parents.get(owner)
+            for member in self.by_file.get(file_path, ()):
+                if self.parents.get(member) == owner and self.symbols[member][0] == attr:
+                    return member
+        candidates = self.by_name.get(call_name) or self.by_name.get(attr)
+        return candidates[0] if candidates else None
+
+    def _named(self, name, module):
+        """A symbol called `name`, preferring one whose file path ends with the module path."""
+        candidates = self.by_name.get(name, ())
+        for symbol_id in candidates:
+            stem = self.symbols[symbol_id][1].rsplit(".", 1)[0]
+            if module and (stem == module or stem.endswith("/" + module) or stem.endswith(module + "/__init__")):
+                return symbol_id
+        return candidates[0] if candidates else None
+
+    def _name_order(self, symbol_id):
+        """Sort key of by_name lists: (file_path, start_line, id), as in SYMBOLS_QUERY."""
+        _, file_path, start_line, _, _ = self.symbols[symbol_id]
+        return file_path, start_line or 0, symbol_id
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def find_target(self, name):
+        """Mirrors impact.find_target: (id, name, file_path) or None."""
+        ids = self.by_name.get(name)
+        if not ids:
+            return None
+        symbol_id = ids[0]
+        return symbol_id, name, self.symbols[symbol_id][1]
+
+    def impact(self, target_id, max_depth=5):
+        """
+        Mirrors impact.fetch_impact: (source, file, line, depth, target) rows,
+        each caller at its shallowest depth on the condensed DAG.
+        """
+        rows = {(self.symbols[caller][0], self.symbols[caller][1], line, depth, self.symbols[callee][0])
+                for caller, _, _, line, depth, callee in self.walk_callers(target_id, max_depth)}
+        return sorted(rows, key=lambda r: (r[3], r[1], r[0], r[2] or 0))
+
+    def walk_callers(self, target_id, max_depth=5):
+        """
+        Mirrors impact.stream_impact: yields
+        (id, qualified_name, file_path, line, depth, via_id) by depth.
+        """
+        return self._walk_condensed(self.component_callers, self.callees, target_id, max_depth)
+
+    def walk_callees(self, source_id, max_depth=5, fanout=None):
+        """Mirrors deps.stream_deps (forward edges, first `fanout` call sites by line)."""
+        if fanout is None:
+            return self._walk_condensed(self.component_callees, self.callers, source_id, max_depth)
+        return self._walk(self.callees, source_id, max_depth, fanout)
+
+    def component_levels(self, start_id, component_edges, max_depth):
+        """BFS on the component DAG: {component: shallowest depth}."""
+        self._ensure_condensed()
+        start = self.component_of[str(start_id)]
+        levels = {start: 0}
+        frontier = [start]
+        for depth in range(1, max_depth + 1):
+            frontier = [nxt for comp in frontier for nxt in component_edges.get(comp, ()) if nxt not in levels]
+            if not frontier:
+                break
+            for comp in frontier:
+                levels.setdefault(comp, depth)
+        return levels
+
+    def _walk_condensed(self, component_edges, back_edges, start_id, max_depth):
+        """
+        Every reached symbol, plus the edges that lead back toward the start
+        along a shortest path (or within its recursive group).
+        """
+        start_id = str(start_id)
+        levels = self.component_levels(start_id, component_edges, max_depth)
+        for comp, depth in sorted(levels.items(), key=lambda item: item[1]):
+            for member in self.members[comp]:
+                if member == start_id:
+                    continue
+                for other, line in back_edges.get(member, ()):
+                    other_comp = self.component_of[other]
+                    if other_comp == comp or levels.get(other_comp) == depth - 1:
+                        yield member, self.qualified_name(member), self.symbols[member][1], line, max(depth, 1), other
+
+    def cycles(self, start_id, max_depth=5, forward=False):
+        """Mirrors impact.fetch_cycles: sorted name lists of recursive groups on the walk."""
+        component_edges = self.component_callees if forward else self.component_callers
+        levels = self.component_levels(start_id, component_edges, max_depth)
+        return [sorted(self.symbols[m][0] for m in self.members[comp])
+                for comp, _ in sorted(levels.items(), key=lambda item: (item[1], item[0]))
+                if len(self.members[comp]) > 1]
+
+    def affected_entry_points(self, names):
+        """Mirrors entry_points.fetch_entry_points: (seeds, rows)."""
+        seeds = {symbol_id: name for name in names for symbol_id in self.by_name.get(name, ())}
+
+        def entry_kind_of(symbol_id):
+            tagged = self.entry_points.get(symbol_id)
+            return tagged[0] if tagged else None
+
+        def callers_of(frontier):
+            for callee in frontier:
+                for caller, _ in self.callers.get(callee, ()):
+                    yield callee, caller, entry_kind_of(caller)
+
+        found = reverse_bfs(list(seeds), entry_kind_of, callers_of)
+        rows = [(symbol_id, self.qualified_name(symbol_id), self.symbols[symbol_id][1], self.symbols[symbol_id][2],
+                 kind, depth, seeds[origin], self.entry_points[symbol_id][1])
+                for symbol_id, (kind, depth, origin) in found.items()]
+        return seeds, sort_entry_points(rows)
+
+    def _reach_labels(self):
+        self._ensure_condensed()
+        if self.labels is None:
+            with self._labels_lock:
+                if self.labels is None:
+                    dag_edges = [(s, t) for s, targets in self.component_callees.items() for t in targets]
+                    self.labels = build_labels(len(self.members), dag_edges)
+        return self.labels
+
+    def reaches(self, source_id, target_id):
+        """Mirrors reachability.fetch_reaches: does source (transitively) call target?"""
+        out_labels, in_labels = self._reach_labels()
+        return labels_reach(out_labels, in_labels, self.component_of[str(source_id)], self.component_of[str(target_id)])
+
+    def path(self, source_id, target_id):
+        """Mirrors reachability.fetch_path: shortest [(id, qualified_name, file, line), ...] or None."""
+        out_labels, in_labels = self._reach_labels()
+        source_id, target_id = str(source_id), str(target_id)
+        goal = self.component_of[target_id]
+        goal_in = set(in_labels[goal])
+        parent = {source_id: None}
+        frontier = [source_id]
+        while frontier and target_id not in parent:
+            next_frontier = []
+            for node in frontier:
+                for callee, line in self.callees.get(node, ()):
+                    comp = self.component_of[callee]
+                    if callee not in parent and comp <= goal and not goal_in.isdisjoint(out_labels[comp]):
+                        parent[callee] = (node, line)
+                        next_frontier.append(callee)
+            frontier = next_frontier
+        path = unwind_path(parent, target_id)
+        if path is None:
+            return None
+        return [(node, self.qualified_name(node), self.symbols[node][1], line) for node, line in path]
+
+    def _walk(self, adjacency, start_id, max_depth, fanout=None):
+        frontier = {str(start_id)}
+        for depth in range(1, max_depth + 1):
+            next_frontier = set()
+            seen = set()
+            for node in frontier:
+                edges = adjacency.get(node, ())
+                if fanout is not None:
+                    edges = sorted(edges, key=lambda e: (e[1] is None, e[1] or 0))[:fanout]
+                for other, line in edges:
+                    if (other, line, node) in seen:
+                        continue
+                    seen.add((other, line, node))
+                    next_frontier.add(other)
+                    yield other, self.qualified_name(other), self.symbols[other][1], line, depth, node
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+    def qualified_name(self, symbol_id):
+        name = self.symbols[symbol_id][0]
+        parent = self.symbols.get(self.parents.get(symbol_id))
+        return f"{parent[0]}.{name}" if parent else name
+
+    def describe(self, symbol_id):
+        name, file_path, start_line, end_line, kind = self.symbols[symbol_id]
+        return {"id": symbol_id, "name": name, "file": file_path,
+                "start_line": start_line, "end_line": end_line, "kind": kind}
+
+
+def qualified_keys(rows):
+    """{(file_path, (outer, ..., name)): id} for rows (id, file_path, parent_id, name)."""
+    rows = list(rows)
+    by_id = {row[0]: row for row in rows}
+    found = {}
+    for row in rows:
+        parts, node = [], row
+        while node is not None and len(parts) <= len(rows):
+            parts.append(node[3])
+            node = by_id.get(node[2])
+        found[(row[1], tuple(reversed(parts)))] = row[0]
+    return found
+
+
+class GraphCache:
+    """
+    One CallGraph per project for long-running processes, reloaded when
+    projects.indexed_at moves (every index run bumps it).
+    """
+
+    def __init__(self):
+        self._graphs = {}
+        self._lock = threading.Lock()
+
+    def get(self, cur, project_id):
+        cur.execute("SELECT indexed_at FROM projects WHERE id = %s", (project_id,))
+        row = cur.fetchone()
+        stamp = row[0] if row else None
+        cached = self._graphs.get(project_id)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._graphs.get(project_id)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            graph = CallGraph.load(cur, project_id)
+            graph.stamp = stamp
+            self._graphs[project_id] = (stamp, graph)
+            return graph
@@ -0,0 +1,68 @@
+import pytest
+
+from call_graph import CallGraph
+from database import get_connection
+from impact import find_project_id, find_target
+from run_indexer import main as run_indexer
+
+SAMPLE = {
+    "pkg/b_child.py": """from pkg.a_base import Base
+
+
+class Child(Base):
+    def step(self):
+        return 2
+""",
+    "pkg/a_base.py": """class Base:
+    def run(self):
+        return self.step()
+
+    def step(self):
+        return 1
+""",
+    "pkg/z_util.py": """def step():
+    return 3
+""",
+}
+
+
+@pytest.fixture(scope="module")
+def indexed(tmp_path_factory):
+    """(cursor, project_id) over SAMPLE indexed into a throwaway SQLite file."""
+    work_dir = tmp_path_factory.mktemp("call_graph")
+    for path, code in SAMPLE.items():
+        full_path = work_dir / "repo" / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(code)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("N3MO_DB", "sqlite")
+        mp.setenv("N3MO_SQLITE_PATH", str(work_dir / "n3mo.db"))
+        mp.setenv("TARGET_CODE_DIR", str(work_dir / "repo"))
+        mp.delenv("N3MO_REPO_URL", raising=False)
+        run_indexer(rebuild=True)
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                yield cur, find_project_id(cur)
+        finally:
+            conn.close()
+
+
+def test_duplicate_names_resolve_to_the_same_symbol(indexed):
+    cur, project_id = indexed
+    graph = CallGraph.load(cur, project_id)
+    target = find_target(cur, project_id, "step")
+    assert target[2] == "pkg/a_base.py"
+    assert graph.find_target("step") == (str(target[0]), "step", "pkg/a_base.py")
+    assert [graph.symbols[i][1] for i in graph.by_name["step"]] == ["pkg/a_base.py", "pkg/b_child.py", "pkg/z_util.py"]
+
+
+def test_replace_file_keeps_by_name_order(indexed):
+    cur, project_id = indexed
+    graph = CallGraph.load(cur, project_id)
+    base_step = graph.find_target("step")[0]
+    graph.replace_file("pkg/0_first.py", [{"id": "new-step", "name": "step", "parent_id": None, "kind": "FUNCTION",
+                                           "start_line": 1, "end_line": 2}], [], [])
+    assert graph.by_name["step"][:2] == ["new-step", base_step]
+    assert graph.find_target("step")[0] == "new-step"
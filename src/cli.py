@@ -1,38 +1,16 @@
 import sys
 import os
 import argparse
-import json
-import http.server
-import socketserver
-from database import get_connection
+from contextlib import contextmanager
 
-# Try to import the indexer logic
-try:
-    from run_indexer import main as run_indexer_logic
-except ImportError:
-    run_indexer_logic = None
+# Heavy modules (psycopg2, tree-sitter, the graph server) are
+# imported inside the command that needs them, so `n3mo impact --help` or a
+# daemon-served query never pays for them. See bench_startup.py.
 
 # ==========================================
 # 🛠️ HELPER FUNCTIONS
 # ==========================================
 
-def get_code_context(file_path, line_number, context=2):
-    if not os.path.exists(file_path):
-        return []
-    start = max(1, line_number - context)
-    end = line_number + context
-    results = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for current_line_num, content in enumerate(f, 1):
-                if current_line_num >= start and current_line_num <= end:
-                    results.append((current_line_num, content.rstrip()))
-                if current_line_num > end:
-                    break
-    except Exception:
-        return []
-    return results
-
 # ANSI color codes
 R  = "\033[0m"
 BOLD = "\033[1m"
@@ -45,7 +23,16 @@ GRAY = "\033[38;2;110;118;129m"
 WHITE= "\033[38;2;230;237;243m"
 BG_DARK = "\033[48;2;13;17;23m"
 
-def print_ascii_tree(results, target_name):
+def print_cycles(cycles):
+    """Recursive groups are walked once; list each of them once here."""
+    if not cycles:
+        return
+    print(f"\n  {AMBER}{BOLD}↻ Recursive Groups{R}  {GRAY}({len(cycles)} cycles, counted once){R}\n")
+    for names in cycles:
+        shown = " ⇄ ".join(names[:6]) + (f" {GRAY}+{len(names) - 6} more{R}" if len(names) > 6 else "")
+        print(f"  {AMBER}↻{R} {WHITE}{shown}{R}")
+
+def print_ascii_tree(results, target_name, cycles=()):
     W = 64
     print()
     print(f"{BG_DARK}{CYAN}{BOLD}  ◈ IMPACT ANALYSIS  {R}")
@@ -79,716 +66,797 @@ def print_ascii_tree(results, target_name):
             indent = "    " * (depth - 1)
             print(f"  {BLUE}{indent}╰─▸{R} {CYAN}{source:<26}{R} {GRAY}{short_path}:{line}{R}")
 
+    print_cycles(cycles)
+
     total = len(set((r[0], r[1], r[2]) for r in sorted_results))
     print(f"\n{GRAY}  {'─' * W}{R}")
     print(f"  {DIM}Total impacted: {WHITE}{total} references{R}  {GRAY}│  depth ≤ {max(r[3] for r in sorted_results)}{R}\n")
 
 # ==========================================
-# 📊 GRAPH VISUALIZER (HTML Generator)
+# 🚀 COMMAND: IMPACT
 # ==========================================
 
-def generate_graph_html(nodes, edges, target_name):
-    nodes_list = [{"id": n, "label": n, "group": g} for n, g in nodes]
-    edges_list = [{"from": u, "to": v} for u, v in edges]
-    
-    nodes_json = json.dumps(nodes_list)
-    edges_json = json.dumps(edges_list)
-
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <title>N3MO Impact Tracker</title>
-  <script src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
-  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=JetBrains+Mono:wght@400;500;600&display=swap" rel="stylesheet">
-  <style>
-    :root {{
-      --bg: #0d1117;
-      --sidebar: #161b22;
-      --card-bg: #0d1117;
-      --border: #30363d;
-      --border-subtle: #21262d;
-      --text-main: #e6edf3;
-      --text-dim: #8b949e;
-      --text-muted: #6e7681;
-      --accent: #2f81f7;
-      --accent-hover: #58a6ff;
-      --danger: #f85149;
-      --warning: #d29922;
-      --success: #3fb950;
-    }}
-
-    * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-    body, html {{ 
-      width: 100%; height: 100%; 
-      background: var(--bg); 
-      color: var(--text-main);
-      font-family: 'Inter', sans-serif; 
-      overflow: hidden;
-      -webkit-font-smoothing: antialiased;
-    }}
-
-    /* Layout */
-    #app {{ display: flex; width: 100vw; height: 100vh; }}
-    
-    #graph-container {{ 
-      flex: 1; 
-      position: relative; 
-      background: var(--bg);
-    }}
-    
-    #sidebar {{ 
-      width: 360px; 
-      background: var(--sidebar); 
-      border-left: 1px solid var(--border); 
-      display: flex; 
-      flex-direction: column; 
-      overflow-y: auto;
-      box-shadow: -4px 0 24px rgba(0,0,0,0.3);
-    }}
-
-    /* Header */
-    .header {{ 
-      padding: 24px 20px 20px;
-      border-bottom: 1px solid var(--border-subtle);
-      background: linear-gradient(180deg, var(--sidebar) 0%, rgba(13,17,23,0.4) 100%);
-    }}
-    
-    .logo {{ 
-      font-family: 'JetBrains Mono'; 
-      font-weight: 600; 
-      font-size: 11px; 
-      color: var(--accent); 
-      letter-spacing: 2px; 
-      margin-bottom: 8px;
-      opacity: 0.9;
-    }}
-    
-    .target-box {{ 
-      font-size: 18px; 
-      font-weight: 600; 
-      color: #fff;
-      font-family: 'JetBrains Mono';
-      word-break: break-all;
-      line-height: 1.4;
-    }}
-
-    /* Stats */
-    .stats {{
-      display: grid;
-      grid-template-columns: 1fr 1fr;
-      gap: 12px;
-      padding: 20px;
-      border-bottom: 1px solid var(--border-subtle);
-    }}
-
-    .stat {{
-      background: var(--card-bg);
-      border: 1px solid var(--border);
-      border-radius: 8px;
-      padding: 12px;
-      transition: border-color 0.2s;
-    }}
-
-    .stat:hover {{
-      border-color: var(--border);
-    }}
-
-    .stat-label {{
-      font-size: 10px;
-      text-transform: uppercase;
-      color: var(--text-muted);
-      letter-spacing: 0.5px;
-      margin-bottom: 6px;
-      font-weight: 500;
-    }}
-
-    .stat-value {{
-      font-family: 'JetBrains Mono';
-      font-size: 24px;
-      font-weight: 600;
-      line-height: 1;
-    }}
-
-    .stat.direct .stat-value {{ color: var(--warning); }}
-    .stat.ripple .stat-value {{ color: var(--accent); }}
-
-    /* Inspector */
-    .inspector {{
-      padding: 20px;
-      flex: 1;
-    }}
-
-    .card {{ 
-      background: var(--card-bg); 
-      border: 1px solid var(--border); 
-      border-radius: 8px; 
-      padding: 16px; 
-      margin-bottom: 16px;
-      transition: all 0.2s;
-    }}
-
-    .card:hover {{
-      border-color: var(--border);
-    }}
-
-    .card-label {{ 
-      font-size: 10px; 
-      text-transform: uppercase; 
-      color: var(--text-muted); 
-      margin-bottom: 10px; 
-      letter-spacing: 0.5px;
-      font-weight: 500;
-    }}
-
-    .card-value {{ 
-      font-family: 'JetBrains Mono'; 
-      font-size: 13px; 
-      word-break: break-all;
-      line-height: 1.5;
-      color: var(--text-main);
-    }}
-
-    .badge {{
-      display: inline-block;
-      padding: 4px 10px;
-      border-radius: 6px;
-      font-size: 11px;
-      font-weight: 600;
-      text-transform: uppercase;
-      letter-spacing: 0.3px;
-    }}
-
-    .badge.target {{ background: rgba(248,81,73,0.15); color: var(--danger); border: 1px solid rgba(248,81,73,0.3); }}
-    .badge.direct {{ background: rgba(210,153,34,0.15); color: var(--warning); border: 1px solid rgba(210,153,34,0.3); }}
-    .badge.ripple {{ background: rgba(47,129,247,0.15); color: var(--accent); border: 1px solid rgba(47,129,247,0.3); }}
-
-    /* Code Preview */
-    .code-preview {{
-      background: var(--bg);
-      border: 1px solid var(--border-subtle);
-      border-radius: 6px;
-      overflow: hidden;
-      margin-top: 10px;
-    }}
-
-    .code-header {{
-      background: rgba(22,27,34,0.6);
-      padding: 8px 12px;
-      border-bottom: 1px solid var(--border-subtle);
-      display: flex;
-      justify-content: space-between;
-      align-items: center;
-    }}
-
-    .code-file {{
-      font-family: 'JetBrains Mono';
-      font-size: 11px;
-      color: var(--text-dim);
-    }}
-
-    .code-line-badge {{
-      font-family: 'JetBrains Mono';
-      font-size: 10px;
-      color: var(--text-muted);
-      background: var(--bg);
-      padding: 2px 6px;
-      border-radius: 3px;
-    }}
-
-    .code-content {{
-      padding: 12px;
-      font-family: 'JetBrains Mono';
-      font-size: 12px;
-      line-height: 1.6;
-      overflow-x: auto;
-    }}
-
-    .code-line {{
-      display: flex;
-      gap: 12px;
-      padding: 2px 0;
-    }}
-
-    .code-line.highlight {{
-      background: rgba(210,153,34,0.1);
-      margin: 0 -12px;
-      padding: 2px 12px;
-      border-left: 2px solid var(--warning);
-    }}
-
-    .line-num {{
-      color: var(--text-muted);
-      text-align: right;
-      min-width: 30px;
-      user-select: none;
-      opacity: 0.6;
-    }}
-
-    .line-code {{
-      color: var(--text-dim);
-      white-space: pre;
-    }}
-
-    /* Empty State */
-    .empty-state {{
-      text-align: center;
-      padding: 40px 20px;
-      color: var(--text-muted);
-    }}
-
-    .empty-state svg {{
-      width: 48px;
-      height: 48px;
-      opacity: 0.3;
-      margin-bottom: 12px;
-    }}
-
-    .empty-text {{
-      font-size: 13px;
-      line-height: 1.6;
-    }}
-
-    /* Button */
-    .btn {{
-      display: block;
-      width: 100%;
-      background: var(--accent); 
-      color: white;
-      border: none; 
-      border-radius: 8px; 
-      padding: 12px;
-      font-weight: 600; 
-      font-size: 14px;
-      cursor: pointer; 
-      text-align: center;
-      text-decoration: none;
-      transition: all 0.2s;
-      font-family: 'Inter', sans-serif;
-    }}
-
-    .btn:hover {{ 
-      background: var(--accent-hover);
-      transform: translateY(-1px);
-      box-shadow: 0 4px 12px rgba(47,129,247,0.3);
-    }}
-
-    .btn:active {{
-      transform: translateY(0);
-    }}
-
-    .btn-secondary {{
-      background: var(--card-bg);
-      color: var(--text-main);
-      border: 1px solid var(--border);
-    }}
-
-    .btn-secondary:hover {{
-      background: var(--sidebar);
-      border-color: var(--border);
-      box-shadow: none;
-    }}
-
-    /* Graph Controls */
-    .graph-controls {{
-      position: absolute;
-      bottom: 20px;
-      right: 20px;
-      display: flex;
-      gap: 8px;
-      background: var(--sidebar);
-      border: 1px solid var(--border);
-      border-radius: 8px;
-      padding: 8px;
-      box-shadow: 0 4px 24px rgba(0,0,0,0.4);
-    }}
-
-    .control-btn {{
-      background: var(--card-bg);
-      border: 1px solid var(--border);
-      border-radius: 6px;
-      color: var(--text-dim);
-      width: 36px;
-      height: 36px;
-      display: flex;
-      align-items: center;
-      justify-content: center;
-      cursor: pointer;
-      font-size: 16px;
-      transition: all 0.2s;
-      font-family: 'Inter', sans-serif;
-      font-weight: 500;
-    }}
-
-    .control-btn:hover {{
-      background: var(--sidebar);
-      color: var(--text-main);
-      border-color: var(--border);
-    }}
-
-    /* Legend */
-    .legend {{
-      position: absolute;
-      bottom: 20px;
-      left: 20px;
-      background: var(--sidebar);
-      border: 1px solid var(--border);
-      border-radius: 8px;
-      padding: 12px 16px;
-      box-shadow: 0 4px 24px rgba(0,0,0,0.4);
-    }}
-
-    .legend-title {{
-      font-size: 10px;
-      text-transform: uppercase;
-      color: var(--text-muted);
-      letter-spacing: 0.5px;
-      margin-bottom: 10px;
-      font-weight: 600;
-    }}
-
-    .legend-item {{
-      display: flex;
-      align-items: center;
-      gap: 8px;
-      margin-bottom: 8px;
-      font-size: 12px;
-    }}
-
-    .legend-item:last-child {{
-      margin-bottom: 0;
-    }}
-
-    .legend-dot {{
-      width: 8px;
-      height: 8px;
-      border-radius: 50%;
-      flex-shrink: 0;
-    }}
-
-    .legend-dot.target {{ background: var(--danger); }}
-    .legend-dot.direct {{ background: var(--warning); }}
-    .legend-dot.ripple {{ background: var(--accent); }}
-
-    /* Network Canvas */
-    #mynetwork {{ width: 100%; height: 100%; }}
-
-    /* Scrollbar */
-    ::-webkit-scrollbar {{ width: 8px; }}
-    ::-webkit-scrollbar-track {{ background: var(--sidebar); }}
-    ::-webkit-scrollbar-thumb {{ background: var(--border); border-radius: 4px; }}
-    ::-webkit-scrollbar-thumb:hover {{ background: var(--border); }}
-
-    /* Animations */
-    @keyframes fadeIn {{
-      from {{ opacity: 0; transform: translateY(10px); }}
-      to {{ opacity: 1; transform: translateY(0); }}
-    }}
-
-    .card, .stat {{ animation: fadeIn 0.3s ease; }}
-  </style>
-</head>
-<body>
-
-  <div id="app">
-    <div id="graph-container">
-      <div id="mynetwork"></div>
-      
-      <!-- Graph Controls -->
-      <div class="graph-controls">
-        <button class="control-btn" id="btn-fit" title="Fit to view">⊡</button>
-        <button class="control-btn" id="btn-zoom-in" title="Zoom in">+</button>
-        <button class="control-btn" id="btn-zoom-out" title="Zoom out">−</button>
-      </div>
-
-      <!-- Legend -->
-      <div class="legend">
-        <div class="legend-title">Legend</div>
-        <div class="legend-item">
-          <span class="legend-dot target"></span>
-          <span>Target</span>
-        </div>
-        <div class="legend-item">
-          <span class="legend-dot direct"></span>
-          <span>Direct</span>
-        </div>
-        <div class="legend-item">
-          <span class="legend-dot ripple"></span>
-          <span>Ripple</span>
-        </div>
-      </div>
-    </div>
-
-    <div id="sidebar">
-      <div class="header">
-        <div class="logo">N3MO IMPACT SYSTEM</div>
-        <div class="target-box">{target_name}</div>
-      </div>
-
-      <div class="stats">
-        <div class="stat direct">
-          <div class="stat-label">Direct</div>
-          <div class="stat-value" id="stat-direct">0</div>
-        </div>
-        <div class="stat ripple">
-          <div class="stat-label">Total</div>
-          <div class="stat-value" id="stat-total">0</div>
-        </div>
-      </div>
-
-      <div class="inspector" id="inspector-content">
-        <div class="empty-state">
-          <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-            <circle cx="11" cy="11" r="8"></circle>
-            <path d="m21 21-4.35-4.35"></path>
-          </svg>
-          <div class="empty-text">Click a node to inspect details</div>
-        </div>
-      </div>
-    </div>
-  </div>
-
-  <script>
-    const nodesData = {nodes_json};
-    const edgesData = {edges_json};
-
-    // Calculate stats
-    const directCount = nodesData.filter(n => n.group === 1).length;
-    const totalCount = nodesData.filter(n => n.group > 0).length;
-    document.getElementById('stat-direct').textContent = directCount;
-    document.getElementById('stat-total').textContent = totalCount;
-
-    // Setup network
-    const nodes = new vis.DataSet(nodesData.map(n => ({{
-      id: n.id,
-      label: n.label,
-      group: n.group,
-      font: {{ 
-        face: 'JetBrains Mono', 
-        color: '#e6edf3',
-        size: n.group === 0 ? 14 : 12
-      }},
-      shape: 'dot',
-      borderWidth: 2,
-      size: n.group === 0 ? 28 : n.group === 1 ? 18 : 12,
-      color: {{
-        background: n.group === 0 ? '#f85149' : '#161b22',
-        border: n.group === 0 ? '#f85149' : n.group === 1 ? '#d29922' : '#2f81f7',
-        highlight: {{ 
-          background: n.group === 0 ? '#f85149' : '#1f6feb', 
-          border: '#fff' 
-        }}
-      }}
-    }})));
-
-    const edges = new vis.DataSet(edgesData.map(e => ({{
-      from: e.from, 
-      to: e.to,
-      arrows: {{ to: {{ enabled: true, scaleFactor: 0.5 }} }},
-      color: {{ color: '#30363d', highlight: '#8b949e' }},
-      width: 1,
-      smooth: {{ type: 'curvedCW', roundness: 0.1 }}
-    }})));
-
-    const container = document.getElementById('mynetwork');
-    const network = new vis.Network(container, {{ nodes, edges }}, {{
-      physics: {{
-        forceAtlas2Based: {{ 
-          gravitationalConstant: -50, 
-          springLength: 120,
-          springConstant: 0.05,
-          damping: 0.4
-        }},
-        solver: 'forceAtlas2Based',
-        stabilization: {{ iterations: 150 }}
-      }},
-      interaction: {{
-        hover: true,
-        tooltipDelay: 100
-      }}
-    }});
-
-    // Inspector Logic
-    network.on("click", function (params) {{
-      if (params.nodes.length > 0) {{
-        const nodeId = params.nodes[0];
-        const node = nodesData.find(n => n.id === nodeId);
-        
-        const classification = 
-          node.group === 0 ? 'target' : 
-          node.group === 1 ? 'direct' : 'ripple';
-        
-        const classText = 
-          node.group === 0 ? 'TARGET · Root Change' : 
-          node.group === 1 ? 'DIRECT · High Risk' : 
-          `RIPPLE · Depth ${{node.group}}`;
-
-        const inspectorHTML = `
-          <div class="card">
-            <div class="card-label">Selected Symbol</div>
-            <div class="card-value">${{node.label}}</div>
-          </div>
-
-          <div class="card">
-            <div class="card-label">Classification</div>
-            <span class="badge ${{classification}}">${{classText}}</span>
-          </div>
-
-          <div class="card">
-            <div class="card-label">Call Site Preview</div>
-            <div class="code-preview">
-              <div class="code-header">
-                <span class="code-file">example.py</span>
-                <span class="code-line-badge">Line 42</span>
-              </div>
-              <div class="code-content">
-                <div class="code-line">
-                  <span class="line-num">40</span>
-                  <span class="line-code">def process_data(items):</span>
-                </div>
-                <div class="code-line">
-                  <span class="line-num">41</span>
-                  <span class="line-code">    results = []</span>
-                </div>
-                <div class="code-line highlight">
-                  <span class="line-num">42</span>
-                  <span class="line-code">    ${{node.label}}(item)</span>
-                </div>
-                <div class="code-line">
-                  <span class="line-num">43</span>
-                  <span class="line-code">    return results</span>
-                </div>
-              </div>
-            </div>
-          </div>
-
-          <a href="vscode://file/${{node.id}}" class="btn">Open in Editor</a>
-          <button class="btn btn-secondary" onclick="network.focus('${{node.id}}', {{ scale: 1.5, animation: true }})">Focus Node</button>
-        `;
-        
-        document.getElementById('inspector-content').innerHTML = inspectorHTML;
-      }}
-    }});
-
-    // Graph Controls
-    document.getElementById('btn-fit').addEventListener('click', () => {{
-      network.fit({{ animation: {{ duration: 300 }} }});
-    }});
-
-    document.getElementById('btn-zoom-in').addEventListener('click', () => {{
-      network.moveTo({{ scale: network.getScale() * 1.2 }});
-    }});
-
-    document.getElementById('btn-zoom-out').addEventListener('click', () => {{
-      network.moveTo({{ scale: network.getScale() * 0.8 }});
-    }});
-
-    // Auto-fit after stabilization
-    network.once('stabilizationIterationsDone', () => {{
-      setTimeout(() => network.fit({{ animation: {{ duration: 500 }} }}), 100);
-    }});
-  </script>
-</body>
-</html>"""
-    
-    filename = "impact_graph.html"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    return filename
+def load_impact(symbol_name, graph=None, max_depth=5):
+    """
+    Returns ((target_id, name, file_path), results, cycles), or None after
+    printing why there is nothing to show.
+    """
+    from database import get_connection
+    from impact import find_project_id, find_target, fetch_cycles, fetch_impact
+
+    if graph is not None:
+        target = graph.find_target(symbol_name)
+        if not target:
+            print(f"\n  {RED}✗{R} Symbol {WHITE}'{symbol_name}'{R} not found in index.\n")
+            return None
+        return target, graph.impact(target[0], max_depth), graph.cycles(target[0], max_depth)
 
-# ==========================================
-# 🚀 COMMAND: IMPACT
-# ==========================================
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            project_id = find_project_id(cur)
+            if not project_id:
+                print(f"\n  {RED}✗{R} This folder has not been indexed yet. Run {WHITE}n3mo index{R} first.\n")
+                return None
+            target = find_target(cur, project_id, symbol_name)
+            if not target:
+                print(f"\n  {RED}✗{R} Symbol {WHITE}'{symbol_name}'{R} not found in index.\n")
+                return None
+            results = fetch_impact(cur, project_id, target[0], max_depth)
+            return target, results, fetch_cycles(cur, project_id, target[0], max_depth)
+    finally:
+        if conn: conn.close()
+
+def cmd_impact(args, graph=None, repo_url=None):
+    """
+    `graph` is a warm CallGraph handed in by the daemon (n3mo serve);
+    without it the traversal runs as a recursive CTE in PostgreSQL.
+    `repo_url` is the client's folder when the daemon runs the query.
+    """
+    if args.entry_points:
+        return cmd_entry_points(args, graph)
+    if args.cross_projects:
+        return cmd_cross_impact(args, repo_url)
+    if args.granularity != "symbol":
+        return cmd_coarse_impact(args)
+    if args.format != "text":
+        return export_impact(args, graph)
 
-def cmd_impact(args):
     W = 64
     print()
     print(f"{BG_DARK}{CYAN}{BOLD}  N3MO  {R}{GRAY}  ◈  impact tracker{R}")
     print(f"{GRAY}  {'─' * W}{R}")
 
-    conn = get_connection()
     symbol_name = args.symbol
-    filename = None
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, name, file_path FROM symbols WHERE name = %s LIMIT 1", (symbol_name,))
-            target = cur.fetchone()
-            if not target:
-                print(f"\n  {RED}✗{R} Symbol {WHITE}'{symbol_name}'{R} not found in index.\n")
-                return
-            target_id, real_name, target_file = target
-            print(f"\n  {DIM}Analyzing{R}  {AMBER}{BOLD}{real_name}{R}")
-            print(f"  {GRAY}Location: {DIM}{target_file}{R}\n")
-
-            query = """
-            WITH RECURSIVE impact_chain AS (
-                SELECT s.name AS source, s.file_path, c.line_number, 1 AS depth, target_sym.name AS target
-                FROM calls c
-                JOIN symbols s ON c.source_symbol_id = s.id
-                JOIN symbols target_sym ON c.resolved_symbol_id = target_sym.id
-                WHERE c.resolved_symbol_id = %s
-                UNION ALL
-                SELECT s.name, s.file_path, c.line_number, ic.depth + 1, ic.source
-                FROM impact_chain ic
-                JOIN symbols current_target ON current_target.name = ic.source
-                JOIN calls c ON c.resolved_symbol_id = current_target.id
-                JOIN symbols s ON c.source_symbol_id = s.id
-                WHERE ic.depth < 5
-            )
-            SELECT DISTINCT source, file_path, line_number, depth, target
-            FROM impact_chain ORDER BY depth ASC, file_path;
-            """
-            cur.execute(query, (target_id,))
-            results = cur.fetchall()
-            if not results:
-                print(f"  {CYAN}✓{R}  Safe to change — no dependencies found.\n")
-                return
-            print_ascii_tree(results, real_name)
-
-            if args.graph:
-                nodes_map = {real_name: 0}
-                edges = set()
-                for source, path, line, depth, target in results:
-                    s_group = 1 if depth == 1 else 2
-                    t_group = 1 if depth == 2 else 2
-                    if target == real_name: t_group = 0
-                    if source not in nodes_map or s_group < nodes_map[source]: nodes_map[source] = s_group
-                    if target not in nodes_map or t_group < nodes_map[target]: nodes_map[target] = t_group
-                    edges.add((source, target))
-
-                nodes_set = set(nodes_map.items())
-                filename = generate_graph_html(nodes_set, edges, real_name)
-
-                PORT = 8000
-                Handler = http.server.SimpleHTTPRequestHandler
-                socketserver.TCPServer.allow_reuse_address = True
-                print(f"  {CYAN}◈{R}  Graph ready")
-                print(f"  {GRAY}{'─' * W}{R}")
-                with socketserver.TCPServer(("0.0.0.0", PORT), Handler) as httpd:
-                    print(f"  {BOLD}{WHITE}Server:{R}  {BLUE}\033[4mhttp://localhost:{PORT}/{filename}\033[0m{R}")
-                    print(f"  {GRAY}Press Ctrl+C to exit{R}\n")
-                    httpd.serve_forever()
+        loaded = load_impact(symbol_name, graph, args.depth)
+        if not loaded:
+            return
+        (target_id, real_name, target_file), results, cycles = loaded
+        print(f"\n  {DIM}Analyzing{R}  {AMBER}{BOLD}{real_name}{R}")
+        print(f"  {GRAY}Location: {DIM}{target_file}{R}\n")
+
+        if not results:
+            print(f"  {CYAN}✓{R}  Safe to change — no dependencies found.\n")
+            return
+        print_ascii_tree(results, real_name, cycles)
+
+        if args.graph:
+            from graph_server import serve_graph, DEFAULT_PORT
+            from urllib.parse import quote
+
+            print(f"  {CYAN}◈{R}  Graph ready")
+            print(f"  {GRAY}{'─' * W}{R}")
+            print(f"  {BOLD}{WHITE}Server:{R}  {BLUE}\033[4mhttp://localhost:{DEFAULT_PORT}/?symbol={quote(real_name)}\033[0m{R}")
+            print(f"  {GRAY}Press Ctrl+C to exit{R}\n")
+            serve_graph(DEFAULT_PORT)
 
     except KeyboardInterrupt:
         print(f"\n  {GRAY}Shutting down…{R}\n")
     except Exception as e:
         print(f"\n  {RED}✗  Error:{R} {e}\n")
+
+@contextmanager
+def open_traversal(symbol_name, graph, walk_graph, walk_db, repo_url=None):
+    """
+    Yields (target, rows) for `n3mo impact` / `n3mo deps`; target is
+    (id, name, file_path) and is passed on to the walker. Rows come from
+    the warm CallGraph when the daemon passes one, otherwise from a
+    server-side cursor that stays open while the caller iterates.
+    Raises LookupError with a user-facing reason when there is no target.
+    """
+    if graph is not None:
+        target = graph.find_target(symbol_name)
+        if not target:
+            raise LookupError(f"symbol '{symbol_name}' not found in index")
+        yield target, walk_graph(graph, target)
+        return
+
+    from database import get_connection
+    from impact import find_project_id, find_target
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            project_id = find_project_id(cur, repo_url)
+            target = find_target(cur, project_id, symbol_name) if project_id else None
+        if not project_id:
+            raise LookupError("this folder has not been indexed yet (run n3mo index)")
+        if not target:
+            raise LookupError(f"symbol '{symbol_name}' not found in index")
+        yield target, walk_db(conn, project_id, target)
     finally:
-        if conn: conn.close()
-        if filename and os.path.exists(filename):
-            os.remove(filename)
+        conn.close()
 
 
-def main():
+def export_rows(args, graph, walk_graph, walk_db, fields=None, repo_url=None):
+    """
+    --format json|ndjson|csv: rows go to stdout as the traversal yields
+    them (no banner, no colours); problems go to stderr with exit code 1.
+    """
+    from output_formats import TRAVERSAL_FIELDS, write_rows
+
+    try:
+        with open_traversal(args.symbol, graph, walk_graph, walk_db, repo_url) as (target, rows):
+            write_rows(rows, args.format, fields or TRAVERSAL_FIELDS)
+    except LookupError as e:
+        print(f"n3mo: {e}", file=sys.stderr)
+        sys.exit(1)
+    except BrokenPipeError:
+        # Downstream stopped reading (e.g. `| head`)
+        sys.stderr.close()
+
+
+def export_impact(args, graph=None):
+    from impact import stream_impact
+
+    if args.graph:
+        print("n3mo: --graph cannot be combined with --format", file=sys.stderr)
+        sys.exit(1)
+    export_rows(args, graph,
+                lambda g, target: g.walk_callers(target[0], args.depth),
+                lambda conn, project_id, target: stream_impact(conn, project_id, target[0], args.depth))
+
+def cmd_coarse_impact(args):
+    """
+    impact --granularity file|package: the same question answered from
+    the rolled-up file_edges / package_edges graph (see modgraph.py).
+    """
+    from modgraph import fetch_coarse_impact
+
+    def walk_db(conn, project_id, target):
+        with conn.cursor() as cur:
+            return fetch_coarse_impact(cur, project_id, target, args.granularity, args.depth)
+
+    if args.graph:
+        print("n3mo: --graph cannot be combined with --granularity file|package", file=sys.stderr)
+        sys.exit(1)
+    if args.format != "text":
+        from output_formats import COARSE_FIELDS
+        return export_rows(args, None, None, walk_db, fields=COARSE_FIELDS)
+
+    W = 64
+    print()
+    try:
+        with open_traversal(args.symbol, None, None, walk_db) as ((_, real_name, target_file), rows):
+            pass
+    except LookupError as e:
+        print(f"  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"  {RED}✗  Error:{R} {e}\n")
+        return
+
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ IMPACT BY {args.granularity.upper()}  {R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    print(f"  {WHITE}{BOLD}Target:{R}  {AMBER}{BOLD}{real_name}{R}  {GRAY}{target_file}{R}")
+    print(f"{GRAY}  {'─' * W}{R}\n")
+    if not rows:
+        print(f"  {CYAN}✓{R}  Nothing outside its own {args.granularity} depends on it.\n")
+        return
+
+    shown = {}
+    for unit, depth, via, weight in rows:
+        if unit in shown: continue
+        shown[unit] = depth
+        color = RED if depth == 1 else CYAN
+        indent = "    " * (depth - 1)
+        print(f"  {BLUE}{indent}╰─▸{R} {color}{unit:<40}{R} {GRAY}{weight} refs → {via}{R}")
+    print(f"\n{GRAY}  {'─' * W}{R}")
+    print(f"  {DIM}Impacted {args.granularity}s: {WHITE}{len(shown)}{R}  {GRAY}│  depth ≤ {max(shown.values())}{R}\n")
+
+def cmd_cross_impact(args, repo_url=None):
+    """
+    impact --cross-projects: callers in this project and in every indexed
+    project that reaches the symbol through cross_calls (cross_project.py).
+    """
+    from cross_project import fetch_cross_impact
+
+    def walk_db(conn, project_id, target):
+        with conn.cursor() as cur:
+            return fetch_cross_impact(cur, project_id, target[0], args.depth)
+
+    if args.graph or args.granularity != "symbol":
+        print("n3mo: --cross-projects cannot be combined with --graph or --granularity", file=sys.stderr)
+        sys.exit(1)
+    if args.format != "text":
+        from output_formats import CROSS_FIELDS
+        return export_rows(args, None, None, walk_db, fields=CROSS_FIELDS, repo_url=repo_url)
+
+    W = 64
+    print()
+    try:
+        with open_traversal(args.symbol, None, None, walk_db, repo_url) as ((_, real_name, target_file), rows):
+            pass
+    except LookupError as e:
+        print(f"  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"  {RED}✗  Error:{R} {e}\n")
+        return
+
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ IMPACT ACROSS PROJECTS  {R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    print(f"  {WHITE}{BOLD}Target:{R}  {AMBER}{BOLD}{real_name}{R}  {GRAY}{target_file}{R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    if not rows:
+        print(f"\n  {CYAN}✓{R}  Safe to change — no callers in any indexed project.\n")
+        return
+
+    projects = {}
+    for row in rows:
+        projects.setdefault(row[0], []).append(row)
+    for project, group in projects.items():
+        print(f"\n  {WHITE}{BOLD}{project}{R}  {GRAY}({len(group)}){R}")
+        for _, _, name, file_path, line, depth, _ in group:
+            color = RED if depth == 1 else CYAN
+            print(f"  {BLUE}{'    ' * (depth - 1)}╰─▸{R} {color}{name}{R}  {GRAY}{file_path}:{line}{R}")
+    print(f"\n{GRAY}  {'─' * W}{R}")
+    print(f"  {DIM}Impacted: {WHITE}{len(rows)}{R} {DIM}symbols in {WHITE}{len(projects)}{R} {DIM}projects{R}\n")
+
+ENTRY_TITLES = {"route": "Routes", "cli": "Commands", "job": "Jobs", "test": "Tests", "fixture": "Fixtures"}
+
+def load_entry_points(symbol_name, graph=None):
+    """(seeds, rows) from entry_points.fetch_entry_points or the warm CallGraph."""
+    if graph is not None:
+        return graph.affected_entry_points([symbol_name])
+
+    from database import get_connection
+    from entry_points import fetch_entry_points
+    from impact import find_project_id
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            project_id = find_project_id(cur)
+            if not project_id:
+                raise LookupError("this folder has not been indexed yet (run n3mo index)")
+            return fetch_entry_points(cur, project_id, [symbol_name])
+    finally:
+        conn.close()
+
+
+def cmd_entry_points(args, graph=None):
+    """
+    impact --entry-points: only the routes, commands, jobs and tests the
+    change reaches, each at its shallowest depth. The walk stops at the
+    first entry point on every path, so --depth does not apply.
+    """
+    machine = args.format != "text"
+    try:
+        if args.graph:
+            raise LookupError("--graph cannot be combined with --entry-points")
+        seeds, rows = load_entry_points(args.symbol, graph)
+        if not seeds:
+            raise LookupError(f"symbol '{args.symbol}' not found in index")
+    except LookupError as e:
+        if machine:
+            print(f"n3mo: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"\n  {RED}✗  Error:{R} {e}\n")
+        return
+
+    if machine:
+        from output_formats import ENTRY_FIELDS, write_rows
+        try:
+            write_rows((row[:7] + ("; ".join(row[7]),) for row in rows), args.format, ENTRY_FIELDS)
+        except BrokenPipeError:
+            sys.stderr.close()
+        return
+
+    W = 64
+    print()
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ AFFECTED ENTRY POINTS  {R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    definitions = f"  {GRAY}({len(seeds)} definitions){R}" if len(seeds) > 1 else ""
+    print(f"  {WHITE}{BOLD}Change:{R}  {AMBER}{BOLD}{args.symbol}{R}{definitions}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    if not rows:
+        print(f"\n  {CYAN}✓{R}  No route, command, job or test reaches it.\n")
+        return
+
+    for kind, title in ENTRY_TITLES.items():
+        group = [row for row in rows if row[4] == kind]
+        if not group:
+            continue
+        testing = kind in ("test", "fixture")
+        print(f"\n  {BLUE if testing else RED}{BOLD}◉ {title}{R}  {GRAY}({len(group)}){R}\n")
+        for _, name, file_path, line, _, depth, origin, decorators in group:
+            hint = f"@{decorators[0]}" if decorators and kind != "test" else f"{os.path.basename(file_path)}:{line}"
+            print(f"  {CYAN if testing else RED}▸{R} {WHITE}{BOLD}{name:<28}{R} {GRAY}{hint}  ·  depth {depth}{R}")
+    print(f"\n{GRAY}  {'─' * W}{R}")
+    print(f"  {DIM}Entry points: {WHITE}{len(rows)}{R}  {GRAY}│  first entry point on each call path{R}\n")
+
+# ==========================================
+# 🧭 COMMAND: DEPS
+# ==========================================
+
+def print_deps_tree(rows, target_name, cycles=()):
+    """Each dependency once, at its shallowest depth, indented by depth."""
+    W = 64
+    best = {}
+    for symbol_id, name, path, line, depth, via in rows:
+        if symbol_id not in best or depth < best[symbol_id][3]:
+            best[symbol_id] = (name, path, line, depth)
+
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ DEPENDENCIES  {R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    print(f"  {WHITE}{BOLD}Source:{R}  {AMBER}{BOLD}{target_name}{R}")
+    print(f"{GRAY}  {'─' * W}{R}\n")
+    for name, path, line, depth in sorted(best.values(), key=lambda r: (r[3], r[1], r[0])):
+        color = AMBER if depth == 1 else CYAN
+        indent = "    " * (depth - 1)
+        print(f"  {BLUE}{indent}╰─▸{R} {color}{name:<26}{R} {GRAY}{os.path.basename(path)}{R}")
+    print_cycles(cycles)
+    print(f"\n{GRAY}  {'─' * W}{R}")
+    print(f"  {DIM}Depends on: {WHITE}{len(best)} symbols{R}  {GRAY}│  depth ≤ {max(r[3] for r in best.values())}{R}\n")
+
+
+def cmd_deps(args, graph=None):
+    """
+    Forward counterpart of cmd_impact: what `symbol` transitively calls.
+    """
+    from deps import stream_deps
+
+    def walk_graph(g, source):
+        return g.walk_callees(source[0], args.depth, args.fanout)
+
+    def walk_db(conn, project_id, source):
+        return stream_deps(conn, project_id, source[0], args.depth, args.fanout)
+
+    if args.format != "text":
+        return export_rows(args, graph, walk_graph, walk_db)
+
+    # Text output also lists the recursive groups on the walk
+    def walk_graph_text(g, source):
+        cycles = g.cycles(source[0], args.depth, forward=True) if args.fanout is None else []
+        return list(walk_graph(g, source)), cycles
+
+    def walk_db_text(conn, project_id, source):
+        from deps import CALLEE_LEVELS
+        from impact import fetch_cycles
+
+        rows = list(walk_db(conn, project_id, source))
+        if args.fanout is not None:
+            return rows, []
+        with conn.cursor() as cur:
+            return rows, fetch_cycles(cur, project_id, source[0], args.depth, levels=CALLEE_LEVELS)
+
+    print()
+    try:
+        with open_traversal(args.symbol, graph, walk_graph_text, walk_db_text) as ((_, real_name, target_file), (rows, cycles)):
+            pass
+    except LookupError as e:
+        print(f"  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"  {RED}✗  Error:{R} {e}\n")
+        return
+
+    if not rows:
+        print(f"  {CYAN}✓{R}  {WHITE}{real_name}{R} {GRAY}({target_file}){R} calls nothing resolvable.\n")
+        return
+    print_deps_tree(rows, real_name, cycles)
+
+# ==========================================
+# 🎯 COMMAND: REACHES
+# ==========================================
+
+def load_reaches(changed_name, entry_name, graph=None, with_path=False):
+    """
+    Can a change to `changed_name` reach `entry_name`, i.e. does the entry
+    point (transitively) call it? Returns (changed, entry, affects, path),
+    where changed/entry are (id, name, file_path) and path runs from the
+    entry point down to the changed symbol (None unless asked for).
+    Raises LookupError with a user-facing reason.
+    """
+    if graph is not None:
+        changed, entry = graph.find_target(changed_name), graph.find_target(entry_name)
+        for name, symbol in ((changed_name, changed), (entry_name, entry)):
+            if not symbol:
+                raise LookupError(f"symbol '{name}' not found in index")
+        affects = graph.reaches(entry[0], changed[0])
+        path = graph.path(entry[0], changed[0]) if affects and with_path else None
+        return changed, entry, affects, path
+
+    from database import get_connection
+    from impact import find_project_id, find_target
+    from reachability import fetch_path, fetch_reaches
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            project_id = find_project_id(cur)
+            if not project_id:
+                raise LookupError("this folder has not been indexed yet (run n3mo index)")
+            changed, entry = find_target(cur, project_id, changed_name), find_target(cur, project_id, entry_name)
+            for name, symbol in ((changed_name, changed), (entry_name, entry)):
+                if not symbol:
+                    raise LookupError(f"symbol '{name}' not found in index")
+            affects = fetch_reaches(cur, project_id, entry[0], changed[0])
+            if affects is None:
+                raise LookupError("reachability labels are missing (run n3mo index)")
+            path = fetch_path(cur, project_id, entry[0], changed[0]) if affects and with_path else None
+        return changed, entry, affects, path
+    finally:
+        conn.close()
+
+
+def cmd_reaches(args, graph=None):
+    try:
+        changed, entry, affects, path = load_reaches(args.symbol, args.entry, graph, args.path)
+    except LookupError as e:
+        if args.json:
+            print(f"n3mo: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"\n  {RED}✗  Error:{R} {e}\n")
+        return
+
+    if args.json:
+        import json
+        print(json.dumps({
+            "symbol": changed[1], "entry": entry[1], "reaches": bool(affects),
+            "path": [{"id": symbol_id, "name": name, "file": file_path, "line": line}
+                     for symbol_id, name, file_path, line in path] if path else None,
+        }))
+        return
+
+    W = 64
+    print()
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ REACHABILITY  {R}")
+    print(f"{GRAY}  {'─' * W}{R}")
+    print(f"  {WHITE}{BOLD}Change:{R}  {AMBER}{BOLD}{changed[1]}{R}  {GRAY}{changed[2]}{R}")
+    print(f"  {WHITE}{BOLD}Entry:{R}   {AMBER}{BOLD}{entry[1]}{R}  {GRAY}{entry[2]}{R}")
+    print(f"{GRAY}  {'─' * W}{R}\n")
+    if not affects:
+        print(f"  {CYAN}✓{R}  {WHITE}{entry[1]}{R} never calls {WHITE}{changed[1]}{R}; the change cannot reach it.\n")
+        return
+    print(f"  {RED}●{R}  {WHITE}{entry[1]}{R} reaches {WHITE}{changed[1]}{R}.")
+    if path:
+        print()
+        for depth, (_, name, file_path, line) in enumerate(path):
+            if depth == 0:
+                print(f"  {AMBER}{name}{R}  {GRAY}{os.path.basename(file_path)}{R}")
+                continue
+            indent = "    " * (depth - 1)
+            color = RED if depth == len(path) - 1 else CYAN
+            print(f"  {BLUE}{indent}╰─▸{R} {color}{name:<26}{R} {GRAY}called at line {line}{R}")
+        print(f"\n  {DIM}{len(path) - 1} calls deep{R}")
+    print()
+
+# ==========================================
+# 🗂️ COMMAND: MODGRAPH
+# ==========================================
+
+def cmd_modgraph(args):
+    from database import get_connection
+    from impact import find_project_id
+    from modgraph import fetch_modgraph
+    from output_formats import MODGRAPH_FIELDS, write_rows
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            project_id = find_project_id(cur)
+            rows = fetch_modgraph(cur, project_id, args.granularity, args.min_weight) if project_id else None
+    finally:
+        conn.close()
+
+    if rows is None:
+        if args.format != "text":
+            print("n3mo: this folder has not been indexed yet (run n3mo index)", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n  {RED}✗{R} This folder has not been indexed yet. Run {WHITE}n3mo index{R} first.\n")
+        return
+    if args.limit:
+        rows = rows[:args.limit]
+    if args.format != "text":
+        write_rows(rows, args.format, MODGRAPH_FIELDS)
+        return
+
+    print()
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ {args.granularity.upper()} DEPENDENCIES  {R}  {GRAY}calls / imports{R}\n")
+    for source, target, calls, imports in rows:
+        print(f"  {WHITE}{source:<36}{R} {BLUE}→{R} {CYAN}{target:<36}{R} {GRAY}{calls:>5} / {imports:<5}{R}")
+    print(f"\n  {DIM}{len(rows)} edges{R}\n")
+
+# ==========================================
+# 🌐 COMMAND: PACKAGES (cross-project registry)
+# ==========================================
+
+def cmd_packages(args):
+    """
+    Lists which project provides which packages; --add/--remove edit this
+    folder's manual entries (for layouts the indexer cannot detect, such
+    as single-module libraries). Takes effect on the next `n3mo index`.
+    """
+    from database import get_connection
+    from impact import find_project_id
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if args.add or args.remove:
+                project_id = find_project_id(cur)
+                if not project_id:
+                    print(f"\n  {RED}✗{R} This folder has not been indexed yet. Run {WHITE}n3mo index{R} first.\n")
+                    return
+                for entry in args.add:
+                    package, _, path = entry.partition("=")
+                    cur.execute("""
+                        INSERT INTO project_packages (project_id, package, path, source)
+                        VALUES (%s, %s, %s, 'manual')
+                        ON CONFLICT (project_id, package) DO UPDATE SET path = EXCLUDED.path, source = 'manual'
+                    """, (project_id, package, path or package.replace(".", "/")))
+                for package in args.remove:
+                    cur.execute("DELETE FROM project_packages WHERE project_id = %s AND package = %s",
+                                (project_id, package))
+                conn.commit()
+            cur.execute("""
+                SELECT p.name, pp.package, pp.path, pp.source
+                FROM project_packages pp JOIN projects p ON p.id = pp.project_id
+                ORDER BY p.name, pp.package
+            """)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    if args.json:
+        import json
+        print(json.dumps([dict(zip(("project", "package", "path", "source"), row)) for row in rows], indent=2))
+        return
+    print()
+    print(f"{BG_DARK}{CYAN}{BOLD}  ◈ PACKAGE REGISTRY  {R}\n")
+    if not rows:
+        print(f"  {GRAY}No packages registered yet (index a library, or use --add).{R}\n")
+        return
+    for project, package, path, source in rows:
+        manual = f" {AMBER}manual{R}" if source == "manual" else ""
+        print(f"  {WHITE}{project:<28}{R} {CYAN}{package:<24}{R} {GRAY}{path}{R}{manual}")
+    print()
+
+# ==========================================
+# 🔎 COMMAND: SEARCH
+# ==========================================
+
+def cmd_search(args, conn=None, repo_url=None):
+    from symbol_search import search_symbols
+
+    mode = "prefix" if args.prefix else "fuzzy"
+    try:
+        rows = search_symbols(args.pattern, limit=args.limit, mode=mode, conn=conn, repo_url=repo_url)
+    except LookupError as e:
+        print(f"\n  {RED}✗{R} {str(e).capitalize()}.\n")
+        return
+    except Exception as e:
+        print(f"\n  {RED}✗  Error:{R} {e}\n")
+        return
+
+    # Editor autocomplete wants plain JSON, not ANSI
+    if args.json:
+        import json
+        print(json.dumps([
+            {"name": name, "qualified_name": qualified, "kind": kind, "file": path, "line": line,
+             "score": round(float(score), 3)}
+            for name, qualified, kind, path, line, score in rows
+        ]))
+        return
+
+    if not rows:
+        print(f"\n  {RED}✗{R} No symbols matching {WHITE}'{args.pattern}'{R}.\n")
+        return
+    print()
+    for name, qualified, kind, path, line, score in rows:
+        print(f"  {CYAN}▸{R} {WHITE}{BOLD}{qualified:<28}{R} {DIM}{(kind or '').lower():<9}{R} {GRAY}{path}:{line}{R}")
+    print()
+
+
+# ==========================================
+# 🧪 COMMAND: TESTS-FOR
+# ==========================================
+
+def cmd_tests_for(args):
+    """
+    Prints the pytest node ids that can observe a diff, one per line, so
+    CI can run `pytest $(n3mo tests-for --diff origin/main...HEAD)`.
+    Summary and warnings go to stderr.
+    """
+    from database import get_connection
+    from impact import find_project_id
+    from test_selection import git_diff, parse_diff, repo_root, select_tests
+
+    try:
+        diff = sys.stdin.read() if args.diff == "-" else git_diff(args.diff, repo_root())
+        changes = parse_diff(diff)
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                project_id = find_project_id(cur)
+                if not project_id:
+                    raise LookupError("this folder has not been indexed yet (run n3mo index)")
+                node_ids, seeds, notes = select_tests(cur, project_id, changes)
+        finally:
+            conn.close()
+    except LookupError as e:
+        print(f"n3mo: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for note in notes:
+        print(f"n3mo: {note}", file=sys.stderr)
+    if args.json:
+        import json
+        print(json.dumps(node_ids))
+    else:
+        for node in node_ids:
+            print(node)
+    print(f"n3mo: {len(node_ids)} test selections from {seeds} changed symbols in {len(changes)} files",
+          file=sys.stderr)
+
+# ==========================================
+# 🛰️ COMMAND: INDEX / SERVE
+# ==========================================
+
+def cmd_index(args):
+    try:
+        from run_indexer import main as run_indexer_logic
+    except ImportError as e:
+        print(f"\n  {RED}✗  Indexer unavailable:{R} {e}\n")
+        return
+    workers = [w for w in (args.workers or "").split(",") if w]
+    run_indexer_logic(rebuild=args.rebuild, include_tests=not args.no_tests, shards=args.shards, workers=workers)
+
+
+def cmd_worker(args):
+    from shard_index import parse_address, serve_worker
+    authkey = os.getenv("N3MO_WORKER_KEY", "").encode()
+    if not authkey:
+        print(f"\n  {RED}✗{R} Set {WHITE}N3MO_WORKER_KEY{R} (the coordinator needs the same one).\n")
+        return
+    try:
+        serve_worker(parse_address(args.listen), authkey)
+    except KeyboardInterrupt:
+        print(f"\n  {GRAY}Worker stopped.{R}\n")
+
+
+def cmd_watch(args):
+    from live_index import watch
+    watch(polling=args.poll, include_tests=not args.no_tests)
+
+
+def cmd_serve(args):
+    from daemon import serve
+    serve(args.socket)
+
+
+def cmd_lsp(args):
+    from lsp_server import serve_stdio
+    serve_stdio()
+
+
+def cmd_web(args):
+    from graph_server import serve_graph
+
+    print(f"\n  {CYAN}◈{R}  Graph server on {BLUE}http://localhost:{args.port}/?symbol=<name>{R}")
+    print(f"  {GRAY}Press Ctrl+C to exit{R}\n")
+    try:
+        serve_graph(args.port)
+    except KeyboardInterrupt:
+        print(f"\n  {GRAY}Shutting down…{R}\n")
+
+
+def build_parser():
+    from output_formats import FORMATS, TRAVERSAL_FIELDS
+
     parser = argparse.ArgumentParser(prog="n3mo")
     subparsers = parser.add_subparsers(dest='command')
     parser_impact = subparsers.add_parser('impact')
     parser_impact.add_argument('symbol')
     parser_impact.add_argument('--graph', action='store_true')
+    parser_impact.add_argument('--depth', type=int, default=5, help='max caller depth (default: 5)')
+    parser_impact.add_argument('--format', choices=FORMATS, default='text',
+                               help='json/ndjson/csv stream stable fields: ' + ','.join(TRAVERSAL_FIELDS))
+    parser_impact.add_argument('--granularity', choices=('symbol', 'file', 'package'), default='symbol',
+                               help='roll the blast radius up to files or packages')
+    parser_impact.add_argument('--entry-points', action='store_true',
+                               help='only the affected routes, commands, jobs and tests')
+    parser_impact.add_argument('--cross-projects', action='store_true',
+                               help='follow callers into other indexed projects (shared libraries)')
     parser_impact.set_defaults(func=cmd_impact)
+    parser_deps = subparsers.add_parser('deps', help='what a symbol transitively calls')
+    parser_deps.add_argument('symbol')
+    parser_deps.add_argument('--depth', type=int, default=5, help='max callee depth (default: 5)')
+    parser_deps.add_argument('--fanout', type=int, default=None,
+                             help='follow at most N call sites out of each symbol')
+    parser_deps.add_argument('--format', choices=FORMATS, default='text',
+                             help='json/ndjson/csv stream stable fields: ' + ','.join(TRAVERSAL_FIELDS))
+    parser_deps.set_defaults(func=cmd_deps)
+    parser_reaches = subparsers.add_parser('reaches', help='can a change to SYMBOL reach ENTRY?')
+    parser_reaches.add_argument('symbol', help='the changed symbol')
+    parser_reaches.add_argument('entry', help='entry point, e.g. an API handler or job')
+    parser_reaches.add_argument('--path', action='store_true', help='show one shortest call chain')
+    parser_reaches.add_argument('--json', action='store_true')
+    parser_reaches.set_defaults(func=cmd_reaches)
+    parser_modgraph = subparsers.add_parser('modgraph', help='file/package dependency graph')
+    parser_modgraph.add_argument('--granularity', choices=('file', 'package'), default='package')
+    parser_modgraph.add_argument('--min-weight', type=int, default=1, help='hide edges with fewer references')
+    parser_modgraph.add_argument('--limit', type=int, default=None, help='heaviest N edges only')
+    parser_modgraph.add_argument('--format', choices=FORMATS, default='text')
+    parser_modgraph.set_defaults(func=cmd_modgraph)
+    parser_tests = subparsers.add_parser('tests-for', help='pytest node ids that can observe a change')
+    parser_tests.add_argument('--diff', required=True, metavar='RANGE',
+                              help="git range, e.g. origin/main...HEAD, or '-' to read a diff from stdin")
+    parser_tests.add_argument('--json', action='store_true')
+    parser_tests.set_defaults(func=cmd_tests_for)
+    parser_packages = subparsers.add_parser('packages', help='which project provides which packages')
+    parser_packages.add_argument('--add', action='append', default=[], metavar='PKG[=PATH]',
+                                 help='register a package this folder provides (path defaults to PKG)')
+    parser_packages.add_argument('--remove', action='append', default=[], metavar='PKG')
+    parser_packages.add_argument('--json', action='store_true')
+    parser_packages.set_defaults(func=cmd_packages)
+    parser_search = subparsers.add_parser('search')
+    parser_search.add_argument('pattern')
+    parser_search.add_argument('--limit', type=int, default=20)
+    parser_search.add_argument('--prefix', action='store_true', help='prefix match only (autocomplete)')
+    parser_search.add_argument('--json', action='store_true')
+    parser_search.set_defaults(func=cmd_search)
     parser_index = subparsers.add_parser('index')
-    parser_index.set_defaults(func=lambda args: run_indexer_logic())
-    args = parser.parse_args()
+    parser_index.add_argument('--rebuild', action='store_true',
+                              help='bulk-load into staging tables and swap atomically')
+    parser_index.add_argument('--no-tests', action='store_true',
+                              help='skip test directories and test_*.py files')
+    parser_index.add_argument('--shards', type=int, default=0,
+                              help='rebuild in N shards, extracted and loaded by worker processes')
+    parser_index.add_argument('--workers', default=None, metavar='HOST:PORT,...',
+                              help='send shards to `n3mo worker` processes instead of local ones')
+    parser_index.set_defaults(func=cmd_index)
+    parser_worker = subparsers.add_parser('worker', help='extract and load shards for a coordinator (n3mo index --workers)')
+    parser_worker.add_argument('--listen', default='127.0.0.1:7431', help='host:port (default: 127.0.0.1:7431)')
+    parser_worker.set_defaults(func=cmd_worker)
+    parser_watch = subparsers.add_parser('watch', help='keep the index live as files change')
+    parser_watch.add_argument('--poll', action='store_true',
+                              help='poll for changes instead of inotify (macOS, network and Docker mounts)')
+    parser_watch.add_argument('--no-tests', action='store_true',
+                              help='skip test directories and test_*.py files')
+    parser_watch.set_defaults(func=cmd_watch)
+    parser_web = subparsers.add_parser('web', help='graph API server + visualizer')
+    parser_web.add_argument('--port', type=int, default=8000)
+    parser_web.set_defaults(func=cmd_web)
+    parser_serve = subparsers.add_parser('serve', help='keep the call graph warm behind a Unix socket')
+    parser_serve.add_argument('--socket', default=None, help='socket path (default: $N3MO_SOCKET)')
+    parser_serve.set_defaults(func=cmd_serve)
+    parser_lsp = subparsers.add_parser('lsp', help='language server on stdio (references, call hierarchy, n3mo/impact)')
+    parser_lsp.set_defaults(func=cmd_lsp)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
     if hasattr(args, 'func'): args.func(args)
 
 if __name__ == '__main__':
@@ -7,31 +7,46 @@ IGNORED_DIRS = {
     ".venv", "venv", "env", ".idea", ".vscode"
 }
 
+# Test code is indexed by default so `n3mo tests-for` can map changes to
+# tests; `n3mo index --no-tests` skips it for a smaller index.
+TEST_DIRS = {"tests", "test", "testing"}
+
+def is_test_file(filename: str) -> bool:
+    from entry_points import TEST_FILE
+    return bool(TEST_FILE.match(filename))
+
 def detect_language(filename: str) -> str | None:
     # --- ADDED: Python Support ---
     if filename.endswith(".py"):
         return "python"
     # -----------------------------
-    if filename.endswith(".js"):
+    if filename.endswith((".js", ".jsx", ".mjs", ".cjs")):
         return "javascript"
+    if filename.endswith(".d.ts"):
+        return None  # declarations only, nothing to call
     if filename.endswith(".ts"):
         return "typescript"
+    if filename.endswith(".tsx"):
+        return "tsx"
     return None
 
-def crawl_repo(repo_path: str):
+def crawl_repo(repo_path: str, include_tests: bool = True):
     """
     Scans the repo and returns a list of file paths.
     """
     files = []
+    skipped = IGNORED_DIRS if include_tests else IGNORED_DIRS | TEST_DIRS
 
     for root, dirs, filenames in os.walk(repo_path):
         # Modify dirs in-place so os.walk skips them
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        dirs[:] = [d for d in dirs if d not in skipped]
 
         for filename in filenames:
             language = detect_language(filename)
             if not language:
                 continue
+            if not include_tests and is_test_file(filename):
+                continue
 
             full_path = os.path.join(root, filename)
             
@@ -55,8 +70,8 @@ def crawl_repo(repo_path: str):
     return files
 
 # Wrapper function to match what run_indexer.py expects
-def crawl_directory(repo_path):
-    return crawl_repo(repo_path)
+def crawl_directory(repo_path, include_tests=True):
+    return crawl_repo(repo_path, include_tests)
 
 if __name__ == "__main__":
     # Test it locally
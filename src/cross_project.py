@@ -0,0 +1,226 @@
+from crawler import TEST_DIRS
+from impact import MAX_DEPTH
+from module_map import ModuleMap
+from resolve_imports import FILES_QUERY, load_resolver
+
+# ==========================================
+# 🌐 CROSS-PROJECT LINKING (shared libraries across indexed repos)
+# ==========================================
+# Every project registers the top-level Python packages it provides and
+# where they live (project_packages: found at index time, or added with
+# `n3mo packages --add`). After a project is linked, its imports that
+# stayed external are looked up in the registry, resolved inside the
+# providing project with that project's module map and re-exports, and
+# the calls bound through them are stored in cross_calls:
+#
+#   service-a: from acme_sdk.users import get_user; get_user(...)
+#   -> cross_calls (service-a call -> acme-sdk symbol get_user)
+#
+# calls itself stays project-local, so per-project queries, components
+# and labels are unchanged; only `n3mo impact --cross-projects` reads
+# the cross edges. Re-indexing a provider also relinks the projects that
+# depend on it, because its symbol ids may have changed.
+
+REGISTRY_QUERY = """
+SELECT pp.package, pp.project_id, pp.path
+FROM project_packages pp
+JOIN projects p ON p.id = pp.project_id
+WHERE pp.project_id <> %s
+ORDER BY p.indexed_at DESC NULLS LAST, p.id;
+"""
+
+EXTERNAL_IMPORTS_QUERY = """
+SELECT file_path, module, name, alias
+FROM imports
+WHERE project_id = %s
+  AND resolved_file IS NULL
+  AND file_path LIKE '%%.py'
+  AND module NOT LIKE '.%%';
+"""
+
+CALLS_IN_FILES_QUERY = """
+SELECT c.id, c.source_symbol_id, c.call_name, s.file_path
+FROM calls c
+JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+WHERE c.project_id = %(project_id)s
+  AND c.dispatch_of IS NULL
+  AND s.file_path = ANY(%(files)s);
+"""
+
+# Projects that import one of the project's packages without resolving it, or already point into it
+DEPENDENTS_QUERY = """
+SELECT DISTINCT project_id
+FROM imports
+WHERE project_id <> %(project_id)s
+  AND resolved_file IS NULL
+  AND split_part(module, '.', 1) IN (SELECT package FROM project_packages WHERE project_id = %(project_id)s)
+UNION
+SELECT source_project_id FROM cross_calls WHERE target_project_id = %(project_id)s;
+"""
+
+LOCAL_CALLERS_QUERY = """
+SELECT c.resolved_symbol_id, c.source_symbol_id, c.line_number
+FROM calls c
+WHERE c.project_id = %(project_id)s
+  AND c.resolved_symbol_id = ANY(%(frontier)s::uuid[]);
+"""
+
+CROSS_CALLERS_QUERY = """
+SELECT x.target_symbol_id, x.source_project_id, x.source_symbol_id, c.line_number
+FROM cross_calls x
+JOIN calls c ON c.project_id = x.source_project_id AND c.id = x.call_id
+WHERE x.target_project_id = %(project_id)s
+  AND x.target_symbol_id = ANY(%(frontier)s::uuid[]);
+"""
+
+DETAILS_QUERY = """
+SELECT s.id, COALESCE(p.name || '.', '') || s.name, s.file_path
+FROM symbols s
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id
+WHERE s.project_id = %(project_id)s AND s.id = ANY(%(ids)s::uuid[]);
+"""
+
+
+def provided_packages(module_map):
+    """{package: directory} a project can be imported as (test packages excluded)."""
+    return {name: path for name, path in module_map.top_level_packages().items() if name not in TEST_DIRS}
+
+
+def refresh_packages(cur, project_id, files=None):
+    """
+    Rewrites the project's detected registry rows (manual ones are kept)
+    and returns the detected package names. `files` is the crawled file
+    list; the index alone misses empty __init__.py files. Caller commits.
+    """
+    from psycopg2 import sql
+    from database import execute_values
+
+    if files is None:
+        cur.execute(sql.SQL(FILES_QUERY).format(symbols=sql.Identifier("symbols"), imports=sql.Identifier("imports")),
+                    {"project_id": project_id})
+        files = [row[0] for row in cur.fetchall()]
+    packages = provided_packages(ModuleMap(files))
+    cur.execute("DELETE FROM project_packages WHERE project_id = %s AND source = 'index'", (project_id,))
+    execute_values(cur, """
+        INSERT INTO project_packages (project_id, package, path, source) VALUES %s
+        ON CONFLICT (project_id, package) DO NOTHING
+    """, [(project_id, name, path, "index") for name, path in sorted(packages.items())])
+    return sorted(packages)
+
+
+def link_project(cur, project_id):
+    """
+    Rewrites the project's outgoing cross_calls. Returns the number of
+    cross-project call edges. Caller commits.
+    """
+    from database import execute_values
+
+    cur.execute(REGISTRY_QUERY, (project_id,))
+    providers = {}
+    for package, provider_id, path in cur.fetchall():
+        providers.setdefault(package, (provider_id, path))    # most recently indexed provider wins
+
+    by_provider = {}
+    cur.execute(EXTERNAL_IMPORTS_QUERY, (project_id,))
+    for file_path, module, name, alias in cur.fetchall():
+        package, _, rest = module.partition(".")
+        if package in providers:
+            provider_id, path = providers[package]
+            stem = "/".join([path] + rest.split(".")) if rest else path
+            by_provider.setdefault(provider_id, []).append((file_path, stem, module, name, alias))
+
+    # (file, local name) -> (provider, symbol id) for names, (provider, file, top-level names) for modules
+    symbols, modules = {}, {}
+    for provider_id, rows in by_provider.items():
+        resolver, _ = load_resolver(cur, provider_id)
+        for file_path, stem, module, name, alias in rows:
+            target_file, symbol_id = resolver.resolve_python(stem, name)
+            if symbol_id:
+                symbols[(file_path, alias or name)] = (provider_id, symbol_id)
+            elif target_file and name != "*":
+                modules[(file_path, alias or name or module)] = (provider_id, target_file, resolver.top_level)
+
+    edges = []
+    if symbols or modules:
+        files = sorted({key[0] for key in symbols} | {key[0] for key in modules})
+        cur.execute(CALLS_IN_FILES_QUERY, {"project_id": project_id, "files": files})
+        for call_id, source_id, call_name, file_path in cur.fetchall():
+            target = symbols.get((file_path, call_name))
+            if target is None and "." in call_name:
+                prefix, attr = call_name.rsplit(".", 1)
+                bound = modules.get((file_path, prefix))
+                if bound and (bound[1], attr) in bound[2]:
+                    target = (bound[0], bound[2][(bound[1], attr)])
+            if target:
+                edges.append((project_id, call_id, source_id, target[0], target[1]))
+
+    cur.execute("DELETE FROM cross_calls WHERE source_project_id = %s", (project_id,))
+    execute_values(cur, """
+        INSERT INTO cross_calls (source_project_id, call_id, source_symbol_id, target_project_id, target_symbol_id)
+        VALUES %s ON CONFLICT DO NOTHING
+    """, edges, page_size=5000)
+    return len(edges)
+
+
+def relink_cross_project(project_id, files=None):
+    """Index-time entry point: registry, this project's edges, then its dependents'."""
+    from database import get_connection
+
+    print("🌐 Linking across projects...")
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            packages = refresh_packages(cur, project_id, files)
+            edges = link_project(cur, project_id)
+            cur.execute(DEPENDENTS_QUERY, {"project_id": project_id})
+            dependents = [row[0] for row in cur.fetchall()]
+            for dependent in dependents:
+                edges += link_project(cur, dependent)
+            conn.commit()
+            provides = f"provides {', '.join(packages)}; " if packages else ""
+            print(f"🌐 {provides}{edges} cross-project calls ({len(dependents)} dependent projects relinked).")
+    except Exception as e:
+        print(f"❌ Cross-project linking failed: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def fetch_cross_impact(cur, project_id, target_id, max_depth=MAX_DEPTH):
+    """
+    Callers of a symbol across every indexed project, breadth first.
+    Returns rows (project, id, qualified_name, file_path, line, depth, via_id)
+    ordered by depth; each symbol appears once, at its shallowest depth.
+    """
+    cur.execute("SELECT id, name FROM projects")
+    project_names = dict(cur.fetchall())
+
+    seen = {(project_id, target_id)}
+    frontier = {project_id: [target_id]}
+    found = []   # (project, id, line, depth, via)
+    depth = 0
+    while frontier and depth < max_depth:
+        depth += 1
+        next_frontier = {}
+        for project, ids in frontier.items():
+            callers = []
+            cur.execute(LOCAL_CALLERS_QUERY, {"project_id": project, "frontier": ids})
+            callers += [(project, source, line, via) for via, source, line in cur.fetchall()]
+            cur.execute(CROSS_CALLERS_QUERY, {"project_id": project, "frontier": ids})
+            callers += [(source_project, source, line, via) for via, source_project, source, line in cur.fetchall()]
+            for caller_project, source, line, via in callers:
+                if (caller_project, source) in seen:
+                    continue
+                seen.add((caller_project, source))
+                found.append((caller_project, source, line, depth, via))
+                next_frontier.setdefault(caller_project, []).append(source)
+        frontier = next_frontier
+
+    details = {}
+    for project in {row[0] for row in found}:
+        cur.execute(DETAILS_QUERY, {"project_id": project, "ids": [row[1] for row in found if row[0] == project]})
+        details.update({(project, row[0]): row[1:] for row in cur.fetchall()})
+    rows = []
+    for project, symbol_id, line, depth, via in found:
+        name, file_path = details.get((project, symbol_id), ("?", "?"))
+        rows.append((project_names.get(project, project), symbol_id, name, file_path, line, depth, via))
+    return rows
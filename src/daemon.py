@@ -0,0 +1,190 @@
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+from contextlib import contextmanager
+
+from call_graph import GraphCache
+from cli import build_parser, cmd_deps, cmd_impact, cmd_reaches, cmd_search, RED, R
+from database import create_pool
+from impact import find_project_id
+
+# ==========================================
+# 🛰️ QUERY DAEMON (n3mo serve)
+# ==========================================
+# Keeps Python, the connection pool and each project's call graph warm,
+# and answers CLI requests over a local Unix socket.
+#
+# Protocol (one request per connection):
+#   client -> {"argv": [...], "repo_url": "/host/path"}\n
+#   daemon -> {"status": "ok" | "fallback"}\n  followed by the command output
+#
+# "fallback" tells the wrapper to run the command in the container instead
+# (indexing, --graph and anything else that is not a read-only query).
+#
+# Requests run concurrently, one thread each. Commands print() to
+# sys.stdout, so the daemon replaces sys.stdout/sys.stderr with a router
+# that sends each thread's writes to the socket of the request it serves.
+
+DEFAULT_SOCKET = "/run/n3mo/n3mo.sock"
+
+
+class ThreadRouter(io.TextIOBase):
+    """Stands in for sys.stdout/sys.stderr: writes go to the stream bound to the calling thread."""
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    @property
+    def _stream(self):
+        return getattr(self._local, "stream", None) or self._default
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def close(self):
+        pass    # commands close stderr on a broken pipe; the handler owns the socket
+
+    @contextmanager
+    def bound(self, stream):
+        self._local.stream = stream
+        try:
+            yield
+        finally:
+            self._local.stream = None
+
+
+@contextmanager
+def routed_output(stream):
+    """This thread's stdout and stderr go to `stream` (see ThreadRouter)."""
+    with sys.stdout.bound(stream), sys.stderr.bound(stream):
+        yield
+
+
+class N3moDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, pool):
+        self.pool = pool
+        self.graphs = GraphCache()
+        super().__init__(socket_path, DaemonRequestHandler)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def _send_status(self, status):
+        self.wfile.write((json.dumps({"status": status}) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return self._send_status("fallback")
+
+        # argparse prints --help / usage errors itself and exits
+        captured = io.StringIO()
+        try:
+            with routed_output(captured):
+                args = build_parser().parse_args(request.get("argv", []))
+        except SystemExit:
+            self._send_status("ok")
+            self.wfile.write(captured.getvalue().encode("utf-8"))
+            return
+
+        if args.command == "impact" and not args.graph and args.granularity == "symbol":
+            run = self._impact
+        elif args.command == "deps":
+            run = self._deps
+        elif args.command == "reaches":
+            run = self._reaches
+        elif args.command == "search":
+            run = self._search
+        else:
+            return self._send_status("fallback")
+
+        self._send_status("ok")
+        out = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+        try:
+            with routed_output(out):
+                run(args, request.get("repo_url"))
+        except SystemExit:
+            pass  # --format errors exit(1) after writing to stderr
+        except Exception as e:
+            out.write(f"\n  {RED}✗  Error:{R} {e}\n")
+        finally:
+            out.detach()
+
+    def _project_graph(self, repo_url):
+        pool = self.server.pool
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                project_id = find_project_id(cur, repo_url)
+                graph = self.server.graphs.get(cur, project_id) if project_id else None
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+
+        if graph is None:
+            print(f"\n  {RED}✗{R} This folder has not been indexed yet. Run n3mo index first.\n")
+        return graph
+
+    def _impact(self, args, repo_url):
+        if args.cross_projects:
+            # Runs in the database; the graph only covers one project
+            return cmd_impact(args, repo_url=repo_url)
+        graph = self._project_graph(repo_url)
+        if graph is not None:
+            cmd_impact(args, graph=graph)
+
+    def _deps(self, args, repo_url):
+        graph = self._project_graph(repo_url)
+        if graph is not None:
+            cmd_deps(args, graph=graph)
+
+    def _reaches(self, args, repo_url):
+        graph = self._project_graph(repo_url)
+        if graph is not None:
+            cmd_reaches(args, graph=graph)
+
+    def _search(self, args, repo_url):
+        pool = self.server.pool
+        conn = pool.getconn()
+        try:
+            cmd_search(args, conn=conn, repo_url=repo_url)
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+
+
+def serve(socket_path=None):
+    socket_path = socket_path or os.getenv("N3MO_SOCKET", DEFAULT_SOCKET)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    # Before the first request thread starts (see ThreadRouter)
+    sys.stdout, sys.stderr = ThreadRouter(sys.stdout), ThreadRouter(sys.stderr)
+    pool = create_pool()
+    server = N3moDaemon(socket_path, pool)
+    # The wrapper on the host connects through the bind mount
+    os.chmod(socket_path, 0o666)
+    print(f"🛰️  N3MO daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 N3MO daemon stopped.")
+    finally:
+        server.server_close()
+        pool.closeall()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
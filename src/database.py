@@ -5,20 +5,30 @@ import uuid
 import time
 
 # 1. Database Connection Config
+def connection_params():
+    return dict(
+        host=os.getenv("POSTGRES_HOST", "postgres"),
+        database=os.getenv("POSTGRES_DB", "n3mo"),
+        user=os.getenv("POSTGRES_USER", "n3mo"),
+        password=os.getenv("POSTGRES_PASSWORD", "n3mo")
+    )
+
+def use_sqlite():
+    """N3MO_DB=sqlite: embedded single-file backend, no server (sqlite_backend.py)."""
+    return os.getenv("N3MO_DB", "postgres").lower() == "sqlite"
+
 def get_connection():
     """
     Establishes a connection to the PostgreSQL database.
     Retries up to 5 times if the database is not ready.
     """
+    if use_sqlite():
+        from sqlite_backend import connect
+        return connect()
     max_retries = 5  # <--- FIXED (Was "5a")
     for i in range(max_retries):
         try:
-            return psycopg2.connect(
-                host=os.getenv("POSTGRES_HOST", "postgres"),
-                database=os.getenv("POSTGRES_DB", "n3mo"),
-                user=os.getenv("POSTGRES_USER", "n3mo"),
-                password=os.getenv("POSTGRES_PASSWORD", "n3mo")
-            )
+            return psycopg2.connect(**connection_params())
         except psycopg2.OperationalError:
             if i < max_retries - 1:
                 time.sleep(2)
@@ -26,6 +36,27 @@ def get_connection():
             else:
                 raise
 
+def create_pool(minconn=1, maxconn=8):
+    """
+    Thread-safe pool for long-running processes (n3mo serve), so requests
+    reuse warm connections instead of paying a new handshake each time.
+    """
+    if use_sqlite():
+        from sqlite_backend import Pool
+        return Pool()
+    from psycopg2.pool import ThreadedConnectionPool
+    return ThreadedConnectionPool(minconn, maxconn, **connection_params())
+
+def execute_values(cur, query, rows, template=None, page_size=100):
+    """
+    psycopg2.extras.execute_values on either backend: `VALUES %s` in the
+    query expands to all of `rows`.
+    """
+    if hasattr(cur, "execute_values"):
+        return cur.execute_values(query, rows, template=template, page_size=page_size)
+    from psycopg2.extras import execute_values as pg_execute_values
+    return pg_execute_values(cur, query, rows, template=template, page_size=page_size)
+
 # 2. Ensure Project Exists
 def ensure_project(name, repo_url):
     conn = get_connection()
@@ -54,14 +85,18 @@ def upsert_symbol(project_id, symbol_data):
         with conn.cursor() as cur:
             query = """
             INSERT INTO symbols 
-                (id, project_id, parent_id, file_path, name, kind, signature, start_line, end_line)
+                (id, project_id, parent_id, file_path, name, kind, signature, start_line, end_line,
+                 decorators, entry_kind, bases)
             VALUES 
-                (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             ON CONFLICT (project_id, file_path, parent_id, name) 
             DO UPDATE SET 
                 signature = EXCLUDED.signature,
                 start_line = EXCLUDED.start_line,
-                end_line = EXCLUDED.end_line
+                end_line = EXCLUDED.end_line,
+                decorators = EXCLUDED.decorators,
+                entry_kind = EXCLUDED.entry_kind,
+                bases = EXCLUDED.bases
             RETURNING id;
             """
             
@@ -74,7 +109,10 @@ def upsert_symbol(project_id, symbol_data):
                 symbol_data["kind"],
                 symbol_data["signature"],
                 symbol_data["start_line"],
-                symbol_data["end_line"]
+                symbol_data["end_line"],
+                symbol_data.get("decorators") or [],
+                symbol_data.get("entry_kind"),
+                symbol_data.get("bases") or []
             ))
             
             conn.commit()
@@ -146,4 +184,17 @@ def upsert_call(project_id, call_data):
     except Exception as e:
         conn.rollback()
     finally:
-        if conn: conn.close()
\ No newline at end of file
+        if conn: conn.close()
+
+# 6. Mark Project Indexed
+def mark_indexed(project_id):
+    """
+    Bumps projects.indexed_at so warm caches (n3mo serve) know to reload.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE projects SET indexed_at = NOW() WHERE id = %s", (project_id,))
+            conn.commit()
+    finally:
+        if conn: conn.close()
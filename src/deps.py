@@ -0,0 +1,104 @@
+from impact import COMPONENT_LEVELS, MAX_DEPTH, STREAM_BATCH, has_components
+
+# ==========================================
+# 🧭 DEPENDENCY QUERIES (Forward Edges)
+# ==========================================
+# The mirror image of impact.py: start at a symbol and follow
+# calls.source_symbol_id -> resolved_symbol_id. Each step is one lookup on
+# idx_calls_source_resolved.
+#
+# fanout caps how many call sites are followed out of each symbol (the
+# first N by line). LIMIT NULL means no cap.
+
+DEPS_STREAM_QUERY = """
+WITH RECURSIVE walk(id, line_number, depth, via) AS (
+    SELECT c.resolved_symbol_id, c.line_number, 1, c.source_symbol_id
+    FROM (
+        SELECT resolved_symbol_id, line_number, source_symbol_id
+        FROM calls
+        WHERE project_id = %(project_id)s
+          AND source_symbol_id = %(source_id)s
+          AND resolved_symbol_id IS NOT NULL
+        ORDER BY line_number
+        LIMIT %(fanout)s
+    ) c
+    UNION
+    SELECT c.resolved_symbol_id, c.line_number, w.depth + 1, w.id
+    FROM walk w
+    CROSS JOIN LATERAL (
+        SELECT resolved_symbol_id, line_number
+        FROM calls
+        WHERE project_id = %(project_id)s
+          AND source_symbol_id = w.id
+          AND resolved_symbol_id IS NOT NULL
+        ORDER BY line_number
+        LIMIT %(fanout)s
+    ) c
+    WHERE w.depth < %(max_depth)s
+)
+SELECT w.id, COALESCE(p.name || '.', '') || s.name, s.file_path, w.line_number, w.depth, w.via
+FROM walk w
+JOIN symbols s ON s.project_id = %(project_id)s AND s.id = w.id
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id;
+"""
+
+# SQLite has no LATERAL: number each symbol's call sites by line once
+# and keep the first `fanout` of them in both steps of the walk.
+DEPS_WINDOW_STREAM_QUERY = """
+WITH RECURSIVE sites AS (
+    SELECT source_symbol_id, resolved_symbol_id, line_number,
+           ROW_NUMBER() OVER (PARTITION BY source_symbol_id ORDER BY line_number) AS n
+    FROM calls
+    WHERE project_id = %(project_id)s AND resolved_symbol_id IS NOT NULL
+),
+walk(id, line_number, depth, via) AS (
+    SELECT resolved_symbol_id, line_number, 1, source_symbol_id
+    FROM sites
+    WHERE source_symbol_id = %(source_id)s AND (%(fanout)s IS NULL OR n <= %(fanout)s)
+    UNION
+    SELECT c.resolved_symbol_id, c.line_number, w.depth + 1, w.id
+    FROM walk w
+    JOIN sites c ON c.source_symbol_id = w.id
+    WHERE w.depth < %(max_depth)s AND (%(fanout)s IS NULL OR c.n <= %(fanout)s)
+)
+SELECT w.id, COALESCE(p.name || '.', '') || s.name, s.file_path, w.line_number, w.depth, w.via
+FROM walk w
+JOIN symbols s ON s.project_id = %(project_id)s AND s.id = w.id
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id;
+"""
+
+
+# Without --fanout the walk runs on the condensed DAG (see impact.py)
+CALLEE_LEVELS = COMPONENT_LEVELS.format(prev="source_component", next="target_component")
+
+DEPS_DAG_STREAM_QUERY = CALLEE_LEVELS + """
+SELECT c.resolved_symbol_id, COALESCE(p.name || '.', '') || t.name, t.file_path, c.line_number,
+       GREATEST(lt.depth, 1), c.source_symbol_id
+FROM levels lt
+JOIN symbol_components tc ON tc.project_id = %(project_id)s AND tc.component_id = lt.component
+JOIN calls c ON c.project_id = %(project_id)s AND c.resolved_symbol_id = tc.symbol_id
+JOIN symbol_components sc ON sc.project_id = %(project_id)s AND sc.symbol_id = c.source_symbol_id
+JOIN levels ls ON ls.component = sc.component_id
+JOIN symbols t ON t.project_id = c.project_id AND t.id = c.resolved_symbol_id
+LEFT JOIN symbols p ON p.project_id = t.project_id AND p.id = t.parent_id
+WHERE c.resolved_symbol_id <> %(start_id)s
+  AND (ls.depth = lt.depth - 1 OR ls.component = lt.component);
+"""
+
+
+def stream_deps(conn, project_id, source_id, max_depth=MAX_DEPTH, fanout=None):
+    """
+    Yields (id, qualified_name, file_path, line, depth, via_id): `line` is
+    the call site inside `via`, the symbol that depends on `id`.
+    """
+    params = {"project_id": project_id, "source_id": source_id, "start_id": source_id,
+              "max_depth": max_depth, "fanout": fanout}
+    query = DEPS_WINDOW_STREAM_QUERY if getattr(conn, "dialect", None) == "sqlite" else DEPS_STREAM_QUERY
+    if fanout is None:
+        with conn.cursor() as cur:
+            if has_components(cur, project_id, source_id):
+                query = DEPS_DAG_STREAM_QUERY
+    with conn.cursor(name="n3mo_deps_stream") as cur:
+        cur.itersize = STREAM_BATCH
+        cur.execute(query, params)
+        yield from cur
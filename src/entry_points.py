@@ -0,0 +1,142 @@
+import os
+import re
+
+# ==========================================
+# 🚪 ENTRY POINTS (routes, CLIs, jobs, tests)
+# ==========================================
+# The extractor records each definition's decorators; classify_entry_point
+# turns them into an entry_kind tag on symbols. `n3mo impact --entry-points`
+# then answers "which routes / commands / jobs / tests does this change
+# touch?" with a reverse BFS from the changed symbols that stops at the
+# first tagged caller on each path, instead of listing the whole ripple.
+
+ENTRY_KINDS = ("route", "cli", "job", "test", "fixture")
+TEST_KINDS = ("test", "fixture")   # n3mo tests-for walks through routes/CLIs/jobs to these
+
+# Matched against the decorator's callee with call arguments stripped,
+# e.g. app.get("/users") -> "app.get"
+ROUTE_DECORATOR = re.compile(r"(\.(route|api_route|websocket|get|post|put|patch|delete|head|options)"
+                             r"|^(Get|Post|Put|Patch|Delete|Head|Options|All))$")   # NestJS: @Get(":id")
+CLI_DECORATOR = re.compile(r"^(click\.(command|group)|\w+\.(command|group|callback))$")
+JOB_DECORATOR = re.compile(r"^(shared_task|periodic_task|\w+\.(task|periodic_task|cron|job))$")
+FIXTURE_DECORATOR = re.compile(r"^(pytest\.)?fixture$")
+TEST_FILE = re.compile(r"^(test_.*|.*_test|conftest)\.py$")
+
+# One frontier of the DB walk: callers of the frontier and their tags
+CALLERS_QUERY = """
+SELECT c.resolved_symbol_id, c.source_symbol_id, s.entry_kind
+FROM calls c
+JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+WHERE c.project_id = %(project_id)s
+  AND c.resolved_symbol_id = ANY(%(frontier)s::uuid[]);
+"""
+
+SEEDS_QUERY = """
+SELECT id, name, entry_kind
+FROM symbols
+WHERE project_id = %(project_id)s AND name = ANY(%(names)s);
+"""
+
+ENTRY_DETAILS_QUERY = """
+SELECT s.id, COALESCE(p.name || '.', '') || s.name, s.file_path, s.start_line, s.decorators
+FROM symbols s
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id
+WHERE s.project_id = %(project_id)s AND s.id = ANY(%(ids)s::uuid[]);
+"""
+
+
+def decorator_callee(decorator):
+    """'app.get("/x", tags=[...])' -> 'app.get'"""
+    return decorator.split("(", 1)[0].strip()
+
+
+def classify_entry_point(name, kind, decorators, file_path):
+    """entry_kind for a definition, or None when nothing calls it from outside."""
+    for decorator in decorators:
+        callee = decorator_callee(decorator)
+        if ROUTE_DECORATOR.search(callee):
+            return "route"
+        if CLI_DECORATOR.match(callee):
+            return "cli"
+        if JOB_DECORATOR.match(callee):
+            return "job"
+        if FIXTURE_DECORATOR.match(callee):
+            return "fixture"   # pytest injects it by name, so no call edge leads to the tests
+    if kind == "FUNCTION" and name.startswith("test") and TEST_FILE.match(os.path.basename(file_path)):
+        return "test"
+    return None
+
+
+def reverse_bfs(seeds, entry_kind_of, callers_of, stop_kinds=ENTRY_KINDS):
+    """
+    Multi-target reverse BFS. seeds: [symbol_id, ...]; entry_kind_of(id)
+    gives the tag (or None); callers_of(frontier) yields
+    (callee_id, caller_id, caller_entry_kind). Each symbol is expanded at
+    most once. Symbols tagged with one of `stop_kinds` are reported but
+    not expanded; other tags are walked through like untagged symbols.
+    Returns {entry_id: (kind, depth, seed_id)} at the shallowest depth.
+    """
+    found = {}
+    origin = {}
+    frontier = []
+    for seed in seeds:
+        if seed in origin:
+            continue
+        origin[seed] = seed
+        kind = entry_kind_of(seed)
+        if kind in stop_kinds:
+            found[seed] = (kind, 0, seed)
+        else:
+            frontier.append(seed)
+
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for callee, caller, kind in callers_of(frontier):
+            if caller in origin:
+                continue
+            origin[caller] = origin[callee]
+            if kind in stop_kinds:
+                found[caller] = (kind, depth, origin[callee])
+            else:
+                next_frontier.append(caller)
+        frontier = next_frontier
+    return found
+
+
+def fetch_entry_points(cur, project_id, names):
+    """
+    Entry points reachable (as callers) from every symbol called one of
+    `names`. Returns (seeds, rows): seeds maps id -> name, rows are
+    (id, qualified_name, file_path, line, kind, depth, origin_name, decorators)
+    sorted by kind, depth and name.
+    """
+    cur.execute(SEEDS_QUERY, {"project_id": project_id, "names": list(names)})
+    seed_rows = cur.fetchall()
+    seeds = {symbol_id: name for symbol_id, name, _ in seed_rows}
+    tags = {symbol_id: kind for symbol_id, _, kind in seed_rows}
+    return seeds, walk_entry_points(cur, project_id, seeds, tags)
+
+
+def walk_entry_points(cur, project_id, seeds, tags, stop_kinds=ENTRY_KINDS):
+    """
+    seeds: {id: name}, tags: {id: entry_kind} for the seeds. Returns the
+    rows described in fetch_entry_points, for entry points of `stop_kinds`.
+    """
+    def callers_of(frontier):
+        cur.execute(CALLERS_QUERY, {"project_id": project_id, "frontier": frontier})
+        return cur.fetchall()
+
+    found = reverse_bfs(list(seeds), tags.get, callers_of, stop_kinds)
+    if not found:
+        return []
+    cur.execute(ENTRY_DETAILS_QUERY, {"project_id": project_id, "ids": list(found)})
+    rows = [(symbol_id, name, file_path, line, found[symbol_id][0], found[symbol_id][1],
+             seeds[found[symbol_id][2]], decorators or [])
+            for symbol_id, name, file_path, line, decorators in cur.fetchall()]
+    return sort_entry_points(rows)
+
+
+def sort_entry_points(rows):
+    return sorted(rows, key=lambda r: (ENTRY_KINDS.index(r[4]), r[5], r[2], r[1]))
@@ -0,0 +1,168 @@
+import importlib
+import os
+import threading
+import uuid
+
+from crawler import detect_language
+
+# ==========================================
+# 🧩 EXTRACTOR REGISTRY (language -> grammar + extractor)
+# ==========================================
+# The crawler tags every file with a language; extract_file dispatches on
+# it instead of feeding everything to the Python grammar. Grammars are
+# optional packages (tree-sitter-javascript, tree-sitter-typescript): a
+# missing one skips that language with a single warning.
+#
+# tree-sitter Parsers are not thread-safe, so each thread (indexing
+# worker) keeps its own, created on first use and reused for every file.
+#
+# Extractors stream rows into a sink: add_symbol() returns the id that
+# children and calls refer to, add_call() and add_import() take the rest.
+# FileRows builds the per-row dicts most callers want. Full rebuilds use
+# bulk_loader.ExtractionBatch instead, which keeps compact columns.
+
+# language -> (grammar module, function returning the language pointer)
+GRAMMARS = {
+    "python": ("tree_sitter_python", "language"),
+    "javascript": ("tree_sitter_javascript", "language"),
+    "typescript": ("tree_sitter_typescript", "language_typescript"),
+    "tsx": ("tree_sitter_typescript", "language_tsx"),
+}
+
+
+def _python(code_bytes, file_path, language, sink):
+    from symbol_extractor import extract_into
+    extract_into(code_bytes, file_path, sink)
+
+
+def _javascript(code_bytes, file_path, language, sink):
+    from js_extractor import extract_js_into
+    extract_js_into(code_bytes, file_path, language, sink)
+
+
+EXTRACTORS = {
+    "python": _python,
+    "javascript": _javascript,
+    "typescript": _javascript,
+    "tsx": _javascript,
+}
+
+_languages = {}
+_missing = set()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_language(language):
+    """tree_sitter.Language for a registry key, or None when its grammar is not installed."""
+    if language in _languages:
+        return _languages[language]
+    from tree_sitter import Language
+
+    with _lock:
+        if language not in _languages:
+            module_name, attr = GRAMMARS[language]
+            try:
+                grammar = importlib.import_module(module_name)
+                _languages[language] = Language(getattr(grammar, attr)())
+            except ImportError:
+                _languages[language] = None
+                if module_name not in _missing:
+                    _missing.add(module_name)
+                    print(f"⚠️ {module_name.replace('_', '-')} is not installed; skipping {language} files.")
+        return _languages[language]
+
+
+def get_parser(language):
+    """This thread's cached Parser for `language` (None without a grammar)."""
+    parsers = getattr(_local, "parsers", None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    if language not in parsers:
+        from tree_sitter import Parser
+
+        grammar = get_language(language)
+        parsers[language] = Parser(grammar) if grammar is not None else None
+    return parsers[language]
+
+
+class FileRows:
+    """Sink producing one file's (symbols, imports, calls) as dicts with UUID ids."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.symbols = []
+        self.imports = []
+        self.calls = []
+
+    def add_symbol(self, parent_id, name, kind, start_line, end_line, decorators, entry_kind, bases):
+        symbol_id = str(uuid.uuid4())
+        self.symbols.append({
+            "id": symbol_id,
+            "parent_id": parent_id,
+            "name": name,
+            "kind": kind,
+            "file_path": self.file_path,
+            "start_line": start_line,
+            "end_line": end_line,
+            "signature": f"{kind.lower()} {name}...",
+            "decorators": decorators,
+            "entry_kind": entry_kind,
+            "bases": bases,
+        })
+        return symbol_id
+
+    def add_call(self, source_id, call_name, line_number):
+        self.calls.append({
+            "id": str(uuid.uuid4()),
+            "source_symbol_id": source_id,
+            "call_name": call_name,
+            "line_number": line_number,
+        })
+
+    def add_import(self, module, name=None, alias=None):
+        self.imports.append({
+            "id": str(uuid.uuid4()),
+            "file_path": self.file_path,
+            "module": module,
+            "name": name,
+            "alias": alias,
+        })
+
+
+def extract_source(code_bytes, file_path):
+    """extract_file for text already in memory (e.g. an unsaved editor buffer)."""
+    rows = FileRows(file_path)
+    language = detect_language(os.path.basename(file_path))
+    if language is not None and get_language(language) is not None:
+        EXTRACTORS[language](code_bytes, file_path, language, rows)
+    return rows.symbols, rows.imports, rows.calls
+
+
+def extract_file(file_path):
+    """
+    (symbols, imports, calls) for any supported file, or three empty lists
+    for unknown languages, missing grammars and unreadable files.
+    """
+    rows = FileRows(file_path)
+    if not extract_file_into(file_path, rows):
+        return [], [], []
+    return rows.symbols, rows.imports, rows.calls
+
+
+def extract_file_into(file_path, sink):
+    """
+    extract_file streaming into `sink`. False when the file could not be
+    read or parsed (the sink may hold part of it; see ExtractionBatch).
+    """
+    language = detect_language(os.path.basename(file_path))
+    if language is None or get_language(language) is None:
+        return True
+    try:
+        with open(file_path, "rb") as f:
+            code_bytes = f.read()
+        EXTRACTORS[language](code_bytes, file_path, language, sink)
+        return True
+    except Exception as e:
+        print(f"⚠️ Error reading {file_path}: {e}")
+        return False
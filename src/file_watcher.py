@@ -0,0 +1,165 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# ==========================================
+# 👀 FILE WATCHER (inotify, or polling where it is missing)
+# ==========================================
+# watch_batches() yields sets of absolute paths that changed (created,
+# written, moved or deleted) under a root. Bursts are coalesced: a batch
+# is only handed out once the tree has been quiet for `debounce` seconds,
+# so a save-all or a `git checkout` becomes one batch, not hundreds.
+#
+# Linux uses inotify through libc (no extra dependency). macOS, and
+# Docker bind mounts whose host does not forward events, fall back to
+# comparing (mtime, size) snapshots every `interval` seconds.
+
+DEBOUNCE = 0.3
+POLL_INTERVAL = 1.0
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")     # wd, mask, cookie, len (name follows, NUL padded)
+
+
+def _walk_dirs(root, skipped):
+    for path, dirs, _ in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in skipped]
+        yield path
+
+
+def _walk_files(root, skipped):
+    for path, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in skipped]
+        for name in files:
+            yield os.path.join(path, name)
+
+
+class InotifyWatcher:
+    def __init__(self, root, skipped=()):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.root = root
+        self.skipped = set(skipped)
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}         # watch descriptor -> directory
+        for path in _walk_dirs(root, self.skipped):
+            self._add(path)
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def poll(self, timeout=None):
+        """Changed paths from events ready within `timeout` seconds (None blocks)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        data = os.read(self._fd, 1 << 16)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: treat everything as touched
+                changed.update(_walk_files(self.root, self.skipped))
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if name in self.skipped:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files can land before the watch does; report what is already there
+                    for sub in _walk_dirs(path, self.skipped):
+                        self._add(sub)
+                    changed.update(_walk_files(path, self.skipped))
+                else:
+                    changed.add(path)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    def __init__(self, root, skipped=(), interval=POLL_INTERVAL):
+        self.root = root
+        self.skipped = set(skipped)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in _walk_files(self.root, self.skipped):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+            current = self._scan()
+            previous, self._snapshot = self._snapshot, current
+            changed = {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root, skipped=(), polling=False):
+    """inotify when the platform has it, else polling."""
+    if not polling:
+        try:
+            return InotifyWatcher(root, skipped)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, skipped)
+
+
+def watch_batches(watcher, debounce=DEBOUNCE):
+    """Yields coalesced sets of changed paths, each after `debounce` quiet seconds."""
+    while True:
+        batch = watcher.poll(None)
+        while batch:
+            more = watcher.poll(debounce)
+            if not more:
+                break
+            batch |= more
+        if batch:
+            yield batch
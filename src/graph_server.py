@@ -0,0 +1,286 @@
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from call_graph import GraphCache
+from database import create_pool
+from impact import MAX_DEPTH, current_repo_url, find_project_id
+from source_cache import SourceCache
+from visualizer import impact_chunks, impact_payload
+
+# ==========================================
+# 🌐 GRAPH API SERVER
+# ==========================================
+# Serves the visualizer as static assets plus JSON endpoints that cut
+# subgraphs out of the warm in-memory call graph on demand:
+#
+#   GET /impact?symbol=NAME[&depth=N]   laid-out blast radius (compact)
+#       ...&format=ndjson               same, streamed one depth ring per line
+#   GET /callers?symbol=NAME|id=ID      direct callers
+#   GET /callees?symbol=NAME|id=ID      direct callees
+#   GET /symbol?name=NAME|id=ID         symbol definitions
+#   GET /source?file=PATH&line=N|id=ID  call-site / definition snippet
+#
+# Responses are gzip'ed when the client accepts it and carry an ETag
+# derived from the project's indexed_at stamp, so unchanged graphs are
+# answered with 304 before any work is done. Source files can change
+# without a re-index, so /source is tagged by its content instead.
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "static")
+INDEX_PAGE = "impact.html"
+DEFAULT_PORT = 8000
+MAX_QUERY_DEPTH = 10
+CONTENT_ETAG_ROUTES = {"/source"}
+CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".js": "text/javascript", ".css": "text/css"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class GraphServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool, repo_url=None, source_root=None):
+        self.pool = pool
+        self.graphs = GraphCache()
+        self.repo_url = repo_url or current_repo_url()
+        self.source_root = os.path.realpath(source_root or os.getenv("TARGET_CODE_DIR", "/app/target_code"))
+        self.sources = SourceCache()
+        super().__init__(address, GraphRequestHandler)
+
+    def project_graph(self):
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                project_id = find_project_id(cur, self.repo_url)
+                if not project_id:
+                    raise ApiError(404, "project has not been indexed yet (run n3mo index)")
+                graph = self.graphs.get(cur, project_id)
+            conn.rollback()
+        finally:
+            self.pool.putconn(conn)
+        return graph
+
+
+class GraphRequestHandler(BaseHTTPRequestHandler):
+    server_version = "N3MO"
+
+    # --- Routing ---
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = API_ROUTES.get(url.path)
+        try:
+            if route:
+                self._api(route, url)
+            else:
+                self._static(url.path)
+        except ApiError as e:
+            self._send(json.dumps({"error": str(e)}).encode("utf-8"), "application/json", status=e.status)
+        except BrokenPipeError:
+            pass
+
+    def _api(self, route, url):
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        stream = params.get("format") == "ndjson"
+        if stream:
+            route = STREAM_ROUTES.get(url.path)
+            if route is None:
+                raise ApiError(400, f"{url.path} does not support format=ndjson")
+        graph = self.server.project_graph()
+        if url.path in CONTENT_ETAG_ROUTES:
+            body = json.dumps(route(self, graph, params), separators=(",", ":")).encode("utf-8")
+            etag = _etag(hashlib.sha1(body).hexdigest())
+            if self._not_modified(etag):
+                return
+        else:
+            etag = _etag(graph.project_id, graph.stamp, url.path, url.query)
+            if self._not_modified(etag):
+                return
+            if stream:
+                return self._send_stream(route(self, graph, params), "application/x-ndjson", etag=etag)
+            body = json.dumps(route(self, graph, params), separators=(",", ":")).encode("utf-8")
+        self._send(body, "application/json", etag=etag)
+
+    def _static(self, path):
+        name = INDEX_PAGE if path in ("/", "/index.html") else path.removeprefix("/static/")
+        full_path = os.path.realpath(os.path.join(STATIC_DIR, name))
+        if not full_path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(full_path):
+            raise ApiError(404, "not found")
+        stat = os.stat(full_path)
+        etag = _etag(full_path, stat.st_mtime_ns, stat.st_size)
+        if self._not_modified(etag):
+            return
+        with open(full_path, "rb") as f:
+            body = f.read()
+        content_type = CONTENT_TYPES.get(os.path.splitext(full_path)[1], "application/octet-stream")
+        self._send(body, content_type, etag=etag)
+
+    # --- Endpoints ---
+
+    def impact(self, graph, params):
+        return impact_payload(*_impact_rows(graph, params))
+
+    def impact_stream(self, graph, params):
+        # Resolve the symbol before any bytes go out, so errors stay JSON
+        return impact_chunks(*_impact_rows(graph, params))
+
+    def callers(self, graph, params):
+        target = _find_symbol(graph, params)
+        return {"symbol": graph.describe(target),
+                "callers": [dict(graph.describe(src), line=line) for src, line in graph.callers.get(target, ())]}
+
+    def callees(self, graph, params):
+        source = _find_symbol(graph, params)
+        return {"symbol": graph.describe(source),
+                "callees": [dict(graph.describe(dst), line=line) for dst, line in graph.callees.get(source, ())]}
+
+    def symbol(self, graph, params):
+        if "id" in params:
+            return {"matches": [graph.describe(_find_symbol(graph, params))]}
+        name = params.get("name") or params.get("symbol")
+        if not name:
+            raise ApiError(400, "pass ?name= or ?id=")
+        return {"matches": [graph.describe(i) for i in graph.by_name.get(name, ())]}
+
+    def source(self, graph, params):
+        if "id" in params:
+            # Definition of a symbol (the target node has no call site)
+            symbol = graph.describe(_find_symbol(graph, params))
+            rel_path, default_line = symbol["file"], symbol["start_line"] or 1
+        else:
+            rel_path, default_line = params.get("file"), 1
+        if not rel_path:
+            raise ApiError(400, "pass ?file= or ?id=")
+        line = _int_param(params, "line", default_line, 1, None)
+        context = _int_param(params, "context", 3, 0, 50)
+        full_path = os.path.realpath(os.path.join(self.server.source_root, rel_path))
+        if not full_path.startswith(self.server.source_root + os.sep):
+            raise ApiError(403, "path outside the indexed project")
+        lines = self.server.sources.context(full_path, line, context)
+        if not lines:
+            raise ApiError(404, f"no source for {rel_path}:{line}")
+        return {"file": rel_path, "line": line, "lines": lines}
+
+    # --- HTTP plumbing ---
+
+    def _not_modified(self, etag):
+        if self.headers.get("If-None-Match") in (f'"{etag}"', f'"{etag}-gz"'):
+            self.send_response(304)
+            self.send_header("ETag", self.headers["If-None-Match"])
+            self.end_headers()
+            return True
+        return False
+
+    def _send(self, body, content_type, status=200, etag=None):
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            body = gzip.compress(body, compresslevel=6)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        if etag:
+            # Strong ETags must differ per encoding
+            self.send_header("ETag", f'"{etag}-gz"' if use_gzip else f'"{etag}"')
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, chunks, content_type, etag=None):
+        """
+        One JSON document per line, flushed as it is produced. There is no
+        Content-Length, so the connection closes at the end (HTTP/1.0).
+        """
+        encoder = None
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            encoder = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip container
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoder:
+            self.send_header("Content-Encoding", "gzip")
+        if etag:
+            self.send_header("ETag", f'"{etag}-gz"' if encoder else f'"{etag}"')
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for chunk in chunks:
+            line = json.dumps(chunk, separators=(",", ":")).encode("utf-8") + b"\n"
+            if encoder:
+                line = encoder.compress(line) + encoder.flush(zlib.Z_SYNC_FLUSH)
+            self.wfile.write(line)
+            self.wfile.flush()
+        if encoder:
+            self.wfile.write(encoder.flush())
+
+    def log_message(self, format, *args):
+        pass
+
+
+API_ROUTES = {
+    "/impact": GraphRequestHandler.impact,
+    "/callers": GraphRequestHandler.callers,
+    "/callees": GraphRequestHandler.callees,
+    "/symbol": GraphRequestHandler.symbol,
+    "/source": GraphRequestHandler.source,
+}
+
+STREAM_ROUTES = {
+    "/impact": GraphRequestHandler.impact_stream,
+}
+
+
+def _etag(*parts):
+    return hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+
+
+def _int_param(params, key, default, low, high):
+    try:
+        value = int(params.get(key) or default)
+    except ValueError:
+        raise ApiError(400, f"{key} must be an integer")
+    value = max(low, value)
+    return min(high, value) if high is not None else value
+
+
+def _impact_rows(graph, params):
+    target = _find_symbol(graph, params)
+    depth = _int_param(params, "depth", MAX_DEPTH, 1, MAX_QUERY_DEPTH)
+    # Keyed by id: same-named symbols (Base.process, Child.process) stay apart
+    return graph.walk_callers(target, max_depth=depth), (target, graph.qualified_name(target), graph.symbols[target][1])
+
+
+def _find_symbol(graph, params):
+    if "id" in params:
+        if params["id"] not in graph.symbols:
+            raise ApiError(404, f"unknown symbol id {params['id']}")
+        return params["id"]
+    name = params.get("symbol") or params.get("name")
+    if not name:
+        raise ApiError(400, "pass ?symbol= or ?id=")
+    target = graph.find_target(name)
+    if not target:
+        raise ApiError(404, f"symbol '{name}' not found in index")
+    return target[0]
+
+
+def serve_graph(port=DEFAULT_PORT, host="0.0.0.0"):
+    """
+    Blocks until Ctrl+C. One process serves every browser tab and user.
+    """
+    pool = create_pool()
+    server = GraphServer((host, port), pool)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.closeall()
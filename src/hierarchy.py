@@ -0,0 +1,226 @@
+import uuid
+from collections import defaultdict
+
+from psycopg2 import sql
+
+# ==========================================
+# 🧬 CLASS HIERARCHY (bases, MRO, self.method() linking)
+# ==========================================
+# The extractor stores each class's base expressions in symbols.bases.
+# Here they are resolved to class symbols and linearised (C3, like
+# Python's MRO), so the linker can bind
+#
+#   self.m() / cls.m() / this.m()   in class C -> first m along MRO(C),
+#                                                 plus overrides of m in C's subclasses
+#   super().m()                     in class C -> first m along MRO(C) after C
+#
+# instead of "any symbol named m". A call site that can dispatch to
+# several overrides gets one extra calls row per override, marked with
+# dispatch_of = the original call id. Every traversal just sees more edges.
+# The rows are rebuilt on every link run.
+
+SELF_PREFIXES = ("self.", "cls.", "this.")
+SUPER_PREFIXES = ("super().",)
+
+SYMBOLS_QUERY = """
+SELECT id, name, kind, parent_id, file_path, bases
+FROM {symbols}
+WHERE project_id = %s;
+"""
+
+IMPORTS_QUERY = """
+SELECT file_path, name, alias, resolved_symbol_id
+FROM {imports}
+WHERE project_id = %s AND resolved_symbol_id IS NOT NULL;
+"""
+
+METHOD_CALLS_QUERY = """
+SELECT id, source_symbol_id, call_name, line_number
+FROM {calls}
+WHERE project_id = %s
+  AND dispatch_of IS NULL
+  AND (call_name ~ '^(self|cls|this)\\.[A-Za-z_$][A-Za-z0-9_$]*$' OR call_name ~ '^super\\(\\)\\.[A-Za-z_][A-Za-z0-9_]*$');
+"""
+
+
+class Hierarchy:
+    def __init__(self):
+        self.symbols = {}                      # id -> (name, kind, parent_id, file_path)
+        self.bases = {}                        # class id -> [base class id or None, ...]
+        self.base_names = {}                   # class id -> [base expression, ...]
+        self.subclasses = defaultdict(list)    # class id -> direct subclass ids
+        self.methods = defaultdict(dict)       # class id -> {method name: id}
+        self._mro = {}                         # MRO cache: class id -> [class id, ...]
+        self._targets = {}                     # (class id, prefix, method) -> targets
+
+    @classmethod
+    def load(cls, cur, project_id, symbols_table="symbols", imports_table="imports"):
+        hierarchy = cls()
+        cur.execute(sql.SQL(SYMBOLS_QUERY).format(symbols=sql.Identifier(symbols_table)), (project_id,))
+        classes_by_name = defaultdict(list)
+        for symbol_id, name, kind, parent_id, file_path, bases in cur.fetchall():
+            hierarchy.symbols[symbol_id] = (name, kind, parent_id, file_path)
+            if kind == "CLASS":
+                classes_by_name[name].append(symbol_id)
+                hierarchy.base_names[symbol_id] = bases or []
+
+        for symbol_id, (name, kind, parent_id, _) in hierarchy.symbols.items():
+            parent = hierarchy.symbols.get(parent_id)
+            if kind == "FUNCTION" and parent and parent[1] == "CLASS":
+                hierarchy.methods[parent_id].setdefault(name, symbol_id)
+
+        imported = defaultdict(dict)   # file -> {local name: class id}
+        cur.execute(sql.SQL(IMPORTS_QUERY).format(imports=sql.Identifier(imports_table)), (project_id,))
+        for file_path, name, alias, resolved_id in cur.fetchall():
+            target = hierarchy.symbols.get(resolved_id)
+            if target and target[1] == "CLASS":
+                imported[file_path][alias or name] = resolved_id
+
+        for class_id, base_names in hierarchy.base_names.items():
+            file_path = hierarchy.symbols[class_id][3]
+            resolved = [hierarchy._resolve_base(base, file_path, classes_by_name, imported[file_path])
+                        for base in base_names]
+            hierarchy.bases[class_id] = resolved
+            for base_id in resolved:
+                if base_id and base_id != class_id:
+                    hierarchy.subclasses[base_id].append(class_id)
+        return hierarchy
+
+    def _resolve_base(self, base, file_path, classes_by_name, imported):
+        """Same file first, then an import in this file, then a project-unique name."""
+        name = base.rsplit(".", 1)[-1]
+        candidates = classes_by_name.get(name, [])
+        same_file = [c for c in candidates if self.symbols[c][3] == file_path]
+        if same_file:
+            return same_file[0]
+        if name in imported:
+            return imported[name]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def mro(self, class_id):
+        """C3 linearisation, cached. Unresolved bases are skipped; cycles and
+        inconsistent orders fall back to depth-first order."""
+        if class_id in self._mro:
+            return self._mro[class_id]
+        self._mro[class_id] = [class_id]       # guards against inheritance cycles
+        bases = [b for b in self.bases.get(class_id, ()) if b and b != class_id]
+        sequences = [[c for c in self.mro(b) if c != class_id] for b in bases] + [list(bases)]
+        result = [class_id]
+        while any(sequences):
+            for seq in sequences:
+                if not seq:
+                    continue
+                head = seq[0]
+                if not any(head in other[1:] for other in sequences):
+                    break
+            else:
+                head = None
+            if head is None:
+                for seq in sequences:
+                    result.extend(c for c in seq if c not in result)
+                break
+            result.append(head)
+            for seq in sequences:
+                if seq and seq[0] == head:
+                    del seq[0]
+        self._mro[class_id] = result
+        return result
+
+    def lookup(self, class_id, method, after=None):
+        """First definition of `method` along MRO(class_id), optionally after a class."""
+        order = self.mro(class_id)
+        if after is not None:
+            order = order[order.index(after) + 1:] if after in order else []
+        for cls in order:
+            method_id = self.methods.get(cls, {}).get(method)
+            if method_id:
+                return method_id
+        return None
+
+    def descendants(self, class_id):
+        seen, stack = set(), [class_id]
+        while stack:
+            for sub in self.subclasses.get(stack.pop(), ()):
+                if sub not in seen:
+                    seen.add(sub)
+                    stack.append(sub)
+        seen.discard(class_id)
+        return seen
+
+    def enclosing_class(self, symbol_id):
+        """Class of the method a call sits in (through nested functions)."""
+        current = self.symbols.get(symbol_id)
+        while current:
+            parent = self.symbols.get(current[2])
+            if parent and parent[1] == "CLASS":
+                return current[2]
+            current = parent
+        return None
+
+    def targets(self, source_id, call_name):
+        """Methods a self./super() call can reach: [static target, *overrides], or []."""
+        class_id = self.enclosing_class(source_id)
+        if class_id is None:
+            return []
+        prefix, method = call_name.rsplit(".", 1)
+        is_super = prefix + "." in SUPER_PREFIXES
+        key = (class_id, is_super, method)
+        if key not in self._targets:
+            if is_super:
+                found = [self.lookup(class_id, method, after=class_id)]
+            else:
+                found = [self.lookup(class_id, method)]
+                found.extend(self.lookup(sub, method) for sub in sorted(self.descendants(class_id)))
+            targets = []
+            for method_id in found:
+                if method_id and method_id not in targets:
+                    targets.append(method_id)
+            self._targets[key] = targets
+        return self._targets[key]
+
+
+def link_methods(cur, project_id, calls_table="calls", symbols_table="symbols", imports_table="imports"):
+    """
+    Binds self./cls./this./super() calls through the class hierarchy and
+    rewrites their dispatch rows. Run before the name-based passes in
+    resolve_calls. Caller commits. Returns the number of linked call sites.
+    """
+    from database import execute_values
+
+    calls = sql.Identifier(calls_table)
+    hierarchy = Hierarchy.load(cur, project_id, symbols_table, imports_table)
+    cur.execute(sql.SQL("DELETE FROM {} WHERE project_id = %s AND dispatch_of IS NOT NULL").format(calls),
+                (project_id,))
+    cur.execute(sql.SQL(METHOD_CALLS_QUERY).format(calls=calls), (project_id,))
+
+    bound, dispatch = [], []
+    for call_id, source_id, call_name, line in cur.fetchall():
+        targets = hierarchy.targets(source_id, call_name)
+        if not targets:
+            continue
+        bound.append((call_id, targets[0]))
+        dispatch.extend((str(uuid.uuid4()), project_id, source_id, call_name, line, target, call_id)
+                        for target in targets[1:])
+
+    execute_values(cur, sql.SQL("""
+        UPDATE {} c SET resolved_symbol_id = v.target::uuid
+        FROM (VALUES %s) AS v (id, target)
+        WHERE c.id = v.id::uuid
+    """).format(calls), bound, page_size=5000)
+    execute_values(cur, sql.SQL("""
+        INSERT INTO {} (id, project_id, source_symbol_id, call_name, line_number, resolved_symbol_id, dispatch_of)
+        VALUES %s
+    """).format(calls), dispatch, page_size=5000)
+    return len(bound)
+
+
+def refresh_inherits(cur, project_id):
+    """Rewrites the project's inherits rows from symbols.bases. Caller commits."""
+    from database import execute_values
+
+    hierarchy = Hierarchy.load(cur, project_id)
+    cur.execute("DELETE FROM inherits WHERE project_id = %s", (project_id,))
+    execute_values(cur, "INSERT INTO inherits (project_id, class_id, position, base_name, base_id) VALUES %s",
+                   [(project_id, class_id, position, name, hierarchy.bases[class_id][position])
+                    for class_id, names in hierarchy.base_names.items()
+                    for position, name in enumerate(names)], page_size=5000)
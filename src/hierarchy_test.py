@@ -0,0 +1,81 @@
+import pytest
+
+from hierarchy import Hierarchy
+
+
+def build(classes):
+    """{class name: (base names, method names)} -> Hierarchy keyed by name ("Cls.method" for methods)."""
+    hierarchy = Hierarchy()
+    for name, (bases, methods) in classes.items():
+        hierarchy.symbols[name] = (name, "CLASS", None, "m.py")
+        hierarchy.bases[name] = [base if base in classes else None for base in bases]
+        for base in bases:
+            if base in classes and base != name:
+                hierarchy.subclasses[base].append(name)
+        for method in methods:
+            hierarchy.symbols[f"{name}.{method}"] = (method, "FUNCTION", name, "m.py")
+            hierarchy.methods[name][method] = f"{name}.{method}"
+    return hierarchy
+
+
+def python_mro(classes, name):
+    """The same hierarchy as real Python classes: their __mro__, minus object."""
+    made = {}
+
+    def make(cls):
+        if cls not in made:
+            made[cls] = type(cls, tuple(make(b) for b in classes[cls][0]) or (object,), {})
+        return made[cls]
+
+    return [c.__name__ for c in make(name).__mro__[:-1]]
+
+
+C3_EXAMPLE = {    # the example from Python's 2.3 MRO write-up
+    "O": ([], []), "A": (["O"], []), "B": (["O"], []), "C": (["O"], []), "D": (["O"], []), "E": (["O"], []),
+    "K1": (["A", "B", "C"], []), "K2": (["D", "B", "E"], []), "K3": (["D", "A"], []),
+    "Z": (["K1", "K2", "K3"], []),
+}
+
+
+@pytest.mark.parametrize("name", sorted(C3_EXAMPLE))
+def test_mro_matches_python(name):
+    assert build(C3_EXAMPLE).mro(name) == python_mro(C3_EXAMPLE, name)
+
+
+def test_mro_diamond():
+    classes = {"Base": ([], []), "Left": (["Base"], []), "Right": (["Base"], []), "Child": (["Left", "Right"], [])}
+    assert build(classes).mro("Child") == ["Child", "Left", "Right", "Base"] == python_mro(classes, "Child")
+
+
+def test_mro_skips_unresolved_bases():
+    hierarchy = build({"Base": ([], []), "Child": (["Mixin", "Base"], [])})
+    assert hierarchy.mro("Child") == ["Child", "Base"]
+
+
+def test_mro_inconsistent_order_falls_back_to_depth_first():
+    # Python itself refuses this hierarchy (TypeError); the index must still answer
+    classes = {"A": ([], []), "B": ([], []), "X": (["A", "B"], []), "Y": (["B", "A"], []), "Z": (["X", "Y"], [])}
+    with pytest.raises(TypeError):
+        python_mro(classes, "Z")
+    assert build(classes).mro("Z") == ["Z", "X", "Y", "A", "B"]
+
+
+def test_mro_inheritance_cycle_terminates():
+    hierarchy = build({"A": (["B"], []), "B": (["A"], [])})
+    assert hierarchy.mro("A") == ["A", "B"]
+    assert hierarchy.mro("B") == ["B", "A"]
+
+
+def test_lookup_and_super():
+    hierarchy = build({"Base": ([], ["run", "step"]), "Mid": (["Base"], ["step"]), "Leaf": (["Mid"], [])})
+    assert hierarchy.lookup("Leaf", "step") == "Mid.step"
+    assert hierarchy.lookup("Leaf", "run") == "Base.run"
+    assert hierarchy.lookup("Mid", "step", after="Mid") == "Base.step"
+    assert hierarchy.lookup("Leaf", "missing") is None
+
+
+def test_targets_include_overrides_in_subclasses():
+    hierarchy = build({"Base": ([], ["run", "step"]), "Child": (["Base"], ["step"]), "Other": (["Base"], ["step"])})
+    assert hierarchy.targets("Base.run", "self.step") == ["Base.step", "Child.step", "Other.step"]
+    assert hierarchy.targets("Child.step", "super().step") == ["Base.step"]
+    assert hierarchy.targets("Child.step", "self.step") == ["Child.step"]
@@ -0,0 +1,180 @@
+import os
+
+# ==========================================
+# 💥 IMPACT QUERIES (Project-Scoped)
+# ==========================================
+# Every join carries project_id so the planner can use the
+# (project_id, ...) composite indexes and, on a partitioned
+# schema, prune to the single partition holding this project.
+
+MAX_DEPTH = 5
+
+FIND_TARGET_QUERY = """
+SELECT id, name, file_path
+FROM symbols
+WHERE project_id = %s AND name = %s
+ORDER BY file_path, start_line, id      -- same pick as CallGraph.find_target
+LIMIT 1;
+"""
+
+IMPACT_QUERY = """
+WITH RECURSIVE impact_chain AS (
+    SELECT c.source_symbol_id AS id, s.name AS source, s.file_path, c.line_number, 1 AS depth, t.name AS target
+    FROM calls c
+    JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+    JOIN symbols t ON t.project_id = c.project_id AND t.id = c.resolved_symbol_id
+    WHERE c.project_id = %(project_id)s
+      AND c.resolved_symbol_id = %(target_id)s
+    UNION ALL
+    SELECT c.source_symbol_id, s.name, s.file_path, c.line_number, ic.depth + 1, ic.source
+    FROM impact_chain ic
+    JOIN calls c ON c.project_id = %(project_id)s AND c.resolved_symbol_id = ic.id
+    JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+    WHERE ic.depth < %(max_depth)s
+)
+SELECT DISTINCT source, file_path, line_number, depth, target
+FROM impact_chain ORDER BY depth ASC, file_path;
+"""
+
+
+# Same traversal for --format json|ndjson|csv, shaped for streaming:
+# UNION (not UNION ALL) drops a row the moment it repeats, so nothing
+# downstream has to sort or de-duplicate, and rows leave the server
+# through a named cursor as the recursion produces them (roughly by depth,
+# not sorted). Names are "Parent.name" when the symbol has a parent.
+IMPACT_STREAM_QUERY = """
+WITH RECURSIVE walk(id, line_number, depth, via) AS (
+    SELECT c.source_symbol_id, c.line_number, 1, c.resolved_symbol_id
+    FROM calls c
+    WHERE c.project_id = %(project_id)s
+      AND c.resolved_symbol_id = %(target_id)s
+    UNION
+    SELECT c.source_symbol_id, c.line_number, w.depth + 1, c.resolved_symbol_id
+    FROM walk w
+    JOIN calls c ON c.project_id = %(project_id)s AND c.resolved_symbol_id = w.id
+    WHERE w.depth < %(max_depth)s
+)
+SELECT w.id, COALESCE(p.name || '.', '') || s.name, s.file_path, w.line_number, w.depth, w.via
+FROM walk w
+JOIN symbols s ON s.project_id = %(project_id)s AND s.id = w.id
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id;
+"""
+
+STREAM_BATCH = 2000
+
+# --- Condensed (SCC) walks, see scc.py ---
+# Walk the component DAG once (no cycles to go around), keep each
+# component's shallowest depth, then expand back to call sites that lie
+# on a shortest path (or inside a recursive group). Members of the
+# target's own recursive group are reported at depth 1.
+COMPONENT_LEVELS = """
+WITH RECURSIVE reach(component, depth) AS (
+    SELECT component_id, 0
+    FROM symbol_components
+    WHERE project_id = %(project_id)s AND symbol_id = %(start_id)s
+    UNION
+    SELECT e.{next}, r.depth + 1
+    FROM reach r
+    JOIN component_edges e ON e.project_id = %(project_id)s AND e.{prev} = r.component
+    WHERE r.depth < %(max_depth)s
+),
+levels AS (
+    SELECT component, MIN(depth) AS depth FROM reach GROUP BY component
+)
+"""
+CALLER_LEVELS = COMPONENT_LEVELS.format(prev="target_component", next="source_component")
+
+IMPACT_DAG_JOINS = """
+FROM levels ls
+JOIN symbol_components sc ON sc.project_id = %(project_id)s AND sc.component_id = ls.component
+JOIN calls c ON c.project_id = %(project_id)s AND c.source_symbol_id = sc.symbol_id
+JOIN symbol_components tc ON tc.project_id = %(project_id)s AND tc.symbol_id = c.resolved_symbol_id
+JOIN levels lt ON lt.component = tc.component_id
+JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+"""
+
+IMPACT_DAG_WHERE = """
+WHERE c.source_symbol_id <> %(start_id)s
+  AND (lt.depth = ls.depth - 1 OR lt.component = ls.component)
+"""
+
+IMPACT_DAG_QUERY = CALLER_LEVELS + """
+SELECT DISTINCT s.name, s.file_path, c.line_number, GREATEST(ls.depth, 1) AS depth, t.name
+""" + IMPACT_DAG_JOINS + """
+JOIN symbols t ON t.project_id = c.project_id AND t.id = c.resolved_symbol_id
+""" + IMPACT_DAG_WHERE + """
+ORDER BY depth ASC, s.file_path;
+"""
+
+IMPACT_DAG_STREAM_QUERY = CALLER_LEVELS + """
+SELECT c.source_symbol_id, COALESCE(p.name || '.', '') || s.name, s.file_path, c.line_number,
+       GREATEST(ls.depth, 1), c.resolved_symbol_id
+""" + IMPACT_DAG_JOINS + """
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id
+""" + IMPACT_DAG_WHERE + ";"
+
+# Recursive groups (components with more than one symbol) on the walk
+CYCLES_QUERY = """
+SELECT array_agg(s.name ORDER BY s.name)
+FROM levels l
+JOIN symbol_components sc ON sc.project_id = %(project_id)s AND sc.component_id = l.component
+JOIN symbols s ON s.project_id = sc.project_id AND s.id = sc.symbol_id
+GROUP BY l.component, l.depth
+HAVING COUNT(*) > 1
+ORDER BY l.depth, l.component;
+"""
+
+
+def current_repo_url():
+    """
+    The wrapper forwards the host folder as N3MO_REPO_URL; inside the
+    container TARGET_CODE_DIR is always the mount point.
+    """
+    return os.getenv("N3MO_REPO_URL") or os.getenv("TARGET_CODE_DIR", "/app/target_code")
+
+
+def find_project_id(cur, repo_url=None):
+    cur.execute("SELECT id FROM projects WHERE repo_url = %s", (repo_url or current_repo_url(),))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def find_target(cur, project_id, symbol_name):
+    cur.execute(FIND_TARGET_QUERY, (project_id, symbol_name))
+    return cur.fetchone()
+
+
+def has_components(cur, project_id, symbol_id):
+    """False until the indexer has condensed this project (scc.py)."""
+    cur.execute("SELECT 1 FROM symbol_components WHERE project_id = %s AND symbol_id = %s",
+                (project_id, symbol_id))
+    return cur.fetchone() is not None
+
+
+def fetch_impact(cur, project_id, target_id, max_depth=MAX_DEPTH):
+    if has_components(cur, project_id, target_id):
+        cur.execute(IMPACT_DAG_QUERY, {"project_id": project_id, "start_id": target_id, "max_depth": max_depth})
+    else:
+        cur.execute(IMPACT_QUERY, {"project_id": project_id, "target_id": target_id, "max_depth": max_depth})
+    return cur.fetchall()
+
+
+def fetch_cycles(cur, project_id, start_id, max_depth=MAX_DEPTH, levels=CALLER_LEVELS):
+    """Recursive groups met by the walk, as sorted name lists."""
+    cur.execute(levels + CYCLES_QUERY, {"project_id": project_id, "start_id": start_id, "max_depth": max_depth})
+    return [row[0] for row in cur.fetchall()]
+
+
+def stream_impact(conn, project_id, target_id, max_depth=MAX_DEPTH):
+    """
+    Yields (id, qualified_name, file_path, line, depth, via_id) through a
+    server-side cursor, STREAM_BATCH rows per round trip.
+    """
+    with conn.cursor() as cur:
+        condensed = has_components(cur, project_id, target_id)
+    query = IMPACT_DAG_STREAM_QUERY if condensed else IMPACT_STREAM_QUERY
+    with conn.cursor(name="n3mo_impact_stream") as cur:
+        cur.itersize = STREAM_BATCH
+        cur.execute(query, {"project_id": project_id, "target_id": target_id,
+                            "start_id": target_id, "max_depth": max_depth})
+        yield from cur
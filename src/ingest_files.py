@@ -22,8 +22,8 @@ from pathlib import Path
 # 1. Imports
 from symbol_extractor import extract_symbols_imports_calls
 from database import ensure_project, upsert_symbol, upsert_import, upsert_call
-from resolve_imports import resolve_project_imports
-from resolve_calls import resolve_project_calls
+from resolve_imports import resolve_import_links
+from resolve_calls import resolve_call_links
 
 # ==========================================
 # 🛑 IGNORE LIST (The Speed Boost)
@@ -33,10 +33,11 @@ IGNORE_DIRS = {
     ".git", ".github", ".idea", ".vscode", # Configs & Git
     "__pycache__", "build", "dist",       # Build Artifacts
     "node_modules", "site-packages",      # External Dependencies
-    "migrations", "tests", "docs"         # Optional: Skip DB migrations/docs
+    "migrations", "docs"                  # Optional: Skip DB migrations/docs
 }
+TEST_DIRS = {"tests", "test", "testing"}  # kept unless include_tests=False (n3mo tests-for needs them)
 
-def ingest_repo(repo_path, project_name, repo_url):
+def ingest_repo(repo_path, project_name, repo_url, include_tests=True):
     print(f"\n🚀 STARTING INGESTION: {project_name}")
     print(f"📂 Scanning: {repo_path}")
 
@@ -45,6 +46,8 @@ def ingest_repo(repo_path, project_name, repo_url):
     print(f"✅ Project ID: {project_id}")
 
     file_count = 0
+    rel_paths = []
+    skipped = IGNORE_DIRS if include_tests else IGNORE_DIRS | TEST_DIRS
     
     # 3. Walk the directory
     # Note: We capture 'dirs' now so we can filter it!
@@ -54,12 +57,13 @@ def ingest_repo(repo_path, project_name, repo_url):
         # ⚡ CRITICAL OPTIMIZATION
         # Modify 'dirs' in-place to stop os.walk from entering ignored folders
         # ----------------------------------------
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        dirs[:] = [d for d in dirs if d not in skipped]
 
         for file in files:
             if file.endswith(".py"):
                 full_path = Path(root) / file
                 rel_path = os.path.relpath(full_path, repo_path)
+                rel_paths.append(rel_path)
                 
                 # Extra check: Skip hidden files (like .DS_Store or .coverage)
                 if file.startswith("."):
@@ -76,10 +80,10 @@ def ingest_repo(repo_path, project_name, repo_url):
     print("\n🔗 STARTING LINKING PHASE...")
     
     # Resolve Imports
-    resolve_project_imports(project_id)
+    resolve_import_links(project_id, rel_paths)
     
     # Resolve Calls
-    resolve_project_calls(project_id)
+    resolve_call_links(project_id)
 
     print(f"\n🏁 INGESTION COMPLETE.")
     print(f"Files: {file_count}")
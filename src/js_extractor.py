@@ -0,0 +1,159 @@
+from entry_points import classify_entry_point
+from extractors import FileRows, get_parser
+
+# ==========================================
+# 🟨 JAVASCRIPT / TYPESCRIPT EXTRACTION
+# ==========================================
+# Same output as symbol_extractor (symbols, imports, calls), so linking,
+# impact and the rest of the pipeline do not care which language a
+# definition came from. Named functions, classes, methods and
+# `const f = () => ...` style bindings are definitions; anonymous
+# callbacks belong to the enclosing definition, like Python lambdas.
+
+DEFINITIONS = {
+    "function_declaration": "FUNCTION",
+    "generator_function_declaration": "FUNCTION",
+    "method_definition": "FUNCTION",
+    "class_declaration": "CLASS",
+    "abstract_class_declaration": "CLASS",
+}
+
+# name = <function value>, in declarations and class fields
+BINDINGS = {"variable_declarator", "public_field_definition", "field_definition"}
+FUNCTION_VALUES = {"arrow_function", "function_expression", "function", "generator_function"}
+CALLEE_TYPES = {"identifier", "member_expression", "property_identifier"}
+
+
+def extract_js_symbols(code_bytes, file_path="unknown", language="javascript"):
+    """
+    Returns: (symbols, imports, calls)
+    """
+    rows = FileRows(file_path)
+    extract_js_into(code_bytes, file_path, language, rows)
+    return rows.symbols, rows.imports, rows.calls
+
+
+def extract_js_into(code_bytes, file_path, language, sink):
+    """Streams the same rows into `sink` (see symbol_extractor.extract_into)."""
+    tree = get_parser(language).parse(code_bytes)
+    _visit(tree.root_node, None, sink, file_path)
+
+
+def _text(node):
+    return node.text.decode("utf8") if node is not None else None
+
+
+def _definition(node):
+    """(kind, name) when the node defines something, else None."""
+    kind = DEFINITIONS.get(node.type)
+    if kind:
+        name = _text(node.child_by_field_name("name"))
+        return (kind, name) if name else None
+    if node.type in BINDINGS:
+        value = node.child_by_field_name("value")
+        name_node = node.child_by_field_name("name") or node.child_by_field_name("property")
+        if value is not None and value.type in FUNCTION_VALUES and name_node is not None \
+                and name_node.type in ("identifier", "property_identifier"):
+            return "FUNCTION", _text(name_node)
+    return None
+
+
+def _decorators(node):
+    """
+    TS decorators without the '@'. They are either children of the
+    definition or its preceding siblings (class body members, exported
+    classes).
+    """
+    found = [child for child in node.children if child.type == "decorator"]
+    sibling = node.prev_named_sibling
+    while sibling is not None and sibling.type == "decorator":
+        found.insert(0, sibling)
+        sibling = sibling.prev_named_sibling
+    return [" ".join(_text(d).lstrip("@").split())[:200] for d in found]
+
+
+def _bases(node):
+    """`class A extends B` -> ['B'] (generic arguments dropped). TS `implements` is not inheritance."""
+    heritage = next((c for c in node.children if c.type == "class_heritage"), None)
+    if heritage is None:
+        return []
+    clause = next((c for c in heritage.children if c.type == "extends_clause"), heritage)
+    value = clause.child_by_field_name("value")
+    if value is None:   # JS grammar: class_heritage -> "extends" expression
+        value = next((c for c in clause.named_children if c.type != "type_arguments"), None)
+    if value is not None and value.type in ("identifier", "member_expression"):
+        return [_text(value)]
+    return []
+
+
+def _visit(node, scope_id, sink, file_path):
+    node_type = node.type
+    new_scope_id = scope_id
+
+    definition = _definition(node)
+    if definition:
+        kind, name = definition
+        decorators = _decorators(node)
+        new_scope_id = sink.add_symbol(scope_id, name, kind, node.start_point[0] + 1, node.end_point[0] + 1,
+                                       decorators, classify_entry_point(name, kind, decorators, file_path),
+                                       _bases(node) if kind == "CLASS" else [])
+
+    elif node_type == "import_statement":
+        _add_imports(node, sink)
+        return
+
+    elif node_type in ("call_expression", "new_expression"):
+        callee = node.child_by_field_name("function" if node_type == "call_expression" else "constructor")
+        if callee is not None and callee.type in CALLEE_TYPES:
+            call_name = _text(callee).replace("?.", ".")
+            if call_name == "require":
+                _add_require(node, sink)
+            elif scope_id is not None and "\n" not in call_name:
+                sink.add_call(scope_id, call_name, node.start_point[0] + 1)
+
+    for child in node.children:
+        _visit(child, new_scope_id, sink, file_path)
+
+
+def _string_value(node):
+    return _text(node)[1:-1] if node is not None and node.type == "string" else None
+
+
+def _add_imports(node, sink):
+    module = _string_value(node.child_by_field_name("source"))
+    clause = next((c for c in node.children if c.type == "import_clause"), None)
+    if clause is None:
+        return sink.add_import(module)                           # import "./side-effect"
+    for child in clause.children:
+        if child.type == "identifier":                           # import React from "react"
+            sink.add_import(module, alias=_text(child))
+        elif child.type == "namespace_import":                   # import * as fs from "fs"
+            alias = next((c for c in child.children if c.type == "identifier"), None)
+            sink.add_import(module, alias=_text(alias))
+        elif child.type == "named_imports":                      # import { a as b } from "./x"
+            for spec in child.children:
+                if spec.type == "import_specifier":
+                    sink.add_import(module, name=_text(spec.child_by_field_name("name")),
+                                    alias=_text(spec.child_by_field_name("alias")))
+
+
+def _add_require(node, sink):
+    """const x = require("m") / const { a, b } = require("m")"""
+    arguments = node.child_by_field_name("arguments")
+    module = _string_value(arguments.named_children[0]) if arguments is not None and arguments.named_children else None
+    if module is None:
+        return
+    declarator = node.parent
+    target = None
+    if declarator is not None and declarator.type == "variable_declarator":
+        target = declarator.child_by_field_name("name")
+    if target is not None and target.type == "object_pattern":
+        for prop in target.named_children:
+            if prop.type == "shorthand_property_identifier_pattern":
+                sink.add_import(module, name=_text(prop))
+            elif prop.type == "pair_pattern":
+                sink.add_import(module, name=_text(prop.child_by_field_name("key")),
+                                alias=_text(prop.child_by_field_name("value")))
+    else:
+        sink.add_import(module, alias=_text(target) if target is not None else None)
+
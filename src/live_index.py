@@ -0,0 +1,186 @@
+import os
+import time
+
+from bulk_loader import CALL_COLUMNS, IMPORT_COLUMNS, SYMBOL_COLUMNS, ProjectRows
+from call_graph import qualified_keys
+from crawler import IGNORED_DIRS, TEST_DIRS, crawl_directory, detect_language, is_test_file
+from database import ensure_project, execute_values, get_connection
+from extractors import extract_file
+from file_watcher import DEBOUNCE, InotifyWatcher, open_watcher, watch_batches
+from hierarchy import refresh_inherits
+from modgraph import refresh_module_edges
+from reachability import refresh_reachability
+from resolve_calls import link_calls
+from resolve_imports import link_imports
+from scc import refresh_components
+
+# ==========================================
+# ⚡ LIVE INDEX (n3mo watch)
+# ==========================================
+# Applies a batch of touched files to the live tables in one transaction:
+#
+# 1. Re-extract only those files. Definitions that survive the edit keep
+#    their ids (matched on file + qualified name), so calls elsewhere
+#    that point at them stay linked.
+# 2. Replace the files' symbols, imports and calls.
+# 3. Unlink only the calls whose last name segment was added or removed
+#    (plus anything pointing at a removed id), then run the usual linking
+#    passes, which only touch unresolved calls.
+# 4. Refresh the derived tables: module edges of the files involved,
+#    then components, labels and the class hierarchy, and bump
+#    indexed_at so `n3mo serve` reloads its graph.
+#
+# Cross-project links are left to the next `n3mo index`.
+
+FILE_SYMBOLS_QUERY = """
+SELECT id, file_path, parent_id, name
+FROM symbols
+WHERE project_id = %(project_id)s AND file_path = ANY(%(files)s);
+"""
+
+# Files whose module edges can change besides the touched ones
+AFFECTED_FILES_QUERY = """
+SELECT DISTINCT s.file_path
+FROM calls c
+JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+WHERE c.project_id = %(project_id)s
+  AND (c.resolved_symbol_id = ANY(%(removed)s::uuid[]) OR substring(c.call_name from '[^.]+$') = ANY(%(names)s))
+UNION
+SELECT file_path FROM imports WHERE project_id = %(project_id)s AND resolved_file = ANY(%(files)s);
+"""
+
+DELETE_FILE_ROWS = [
+    """DELETE FROM calls WHERE project_id = %(project_id)s AND source_symbol_id IN (
+           SELECT id FROM symbols WHERE project_id = %(project_id)s AND file_path = ANY(%(files)s))""",
+    "DELETE FROM imports WHERE project_id = %(project_id)s AND file_path = ANY(%(files)s)",
+    "DELETE FROM symbols WHERE project_id = %(project_id)s AND file_path = ANY(%(files)s)",
+]
+
+UNLINK_CALLS = """
+UPDATE calls
+SET resolved_symbol_id = NULL
+WHERE project_id = %(project_id)s
+  AND (resolved_symbol_id = ANY(%(removed)s::uuid[]) OR substring(call_name from '[^.]+$') = ANY(%(names)s));
+"""
+
+
+def _insert(cur, table, columns, rows):
+    execute_values(cur, f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s", rows, page_size=5000)
+
+
+def update_files(cur, project_id, target_dir, touched, files):
+    """
+    Re-indexes `touched` (repo-relative paths; deleted ones just drop
+    out) and relinks what they can affect. `files` is the project's
+    current file list, for the module map. Returns (symbols, added,
+    removed) counts. Caller commits.
+    """
+    touched = sorted(touched)
+    cur.execute(FILE_SYMBOLS_QUERY, {"project_id": project_id, "files": touched})
+    old = qualified_keys((str(row[0]), row[1], row[2] and str(row[2]), row[3]) for row in cur.fetchall())
+
+    rows = ProjectRows(project_id)
+    for rel_path in touched:
+        full_path = os.path.join(target_dir, rel_path)
+        if os.path.isfile(full_path):
+            rows.add_file(rel_path, *extract_file(full_path))
+    new = qualified_keys((row[0], row[3], row[2], row[4]) for row in rows.symbols)
+
+    kept = {new[key]: old[key] for key in new.keys() & old.keys()}
+    for row in rows.symbols:
+        row[0], row[2] = kept.get(row[0], row[0]), kept.get(row[2], row[2])
+    calls = [call[:2] + (kept.get(call[2], call[2]),) + call[3:] for call in rows.calls]
+    params = {
+        "project_id": project_id,
+        "files": touched,
+        "removed": [old[key] for key in old.keys() - new.keys()],
+        "names": sorted({key[1][-1] for key in old.keys() ^ new.keys()}),
+    }
+
+    cur.execute(AFFECTED_FILES_QUERY, params)
+    affected = {row[0] for row in cur.fetchall()} | set(touched)
+    for query in DELETE_FILE_ROWS:
+        cur.execute(query, params)
+    cur.execute(UNLINK_CALLS, params)
+    _insert(cur, "symbols", SYMBOL_COLUMNS, rows.symbols)
+    _insert(cur, "imports", IMPORT_COLUMNS, rows.imports)
+    _insert(cur, "calls", CALL_COLUMNS, calls)
+
+    link_imports(cur, project_id, files=files)
+    link_calls(cur, project_id)
+    refresh_inherits(cur, project_id)
+    refresh_module_edges(cur, project_id, affected)
+    refresh_components(cur, project_id)
+    refresh_reachability(cur, project_id)
+    cur.execute("UPDATE projects SET indexed_at = NOW() WHERE id = %s", (project_id,))
+    return len(rows.symbols), len(new.keys() - old.keys()), len(params["removed"])
+
+
+def _indexable(rel_path, include_tests):
+    parts = rel_path.split(os.sep)
+    skipped = IGNORED_DIRS if include_tests else IGNORED_DIRS | TEST_DIRS
+    if rel_path.startswith("..") or skipped.intersection(parts[:-1]):
+        return False
+    if not include_tests and is_test_file(parts[-1]):
+        return False
+    return detect_language(parts[-1]) is not None
+
+
+def watch(polling=False, include_tests=True, debounce=DEBOUNCE):
+    """Keeps the current project's index in step with the working tree until Ctrl+C."""
+    target_dir = os.getenv("TARGET_CODE_DIR", "/app/target_code")
+    repo_url = os.getenv("N3MO_REPO_URL", target_dir)
+    project_id = ensure_project(os.path.basename(repo_url.rstrip("/")) or repo_url, repo_url)
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT indexed_at FROM projects WHERE id = %s", (project_id,))
+            indexed = cur.fetchone()[0] is not None
+    finally:
+        conn.close()
+    if not indexed:
+        from run_indexer import main as run_indexer_logic
+        run_indexer_logic(rebuild=True, include_tests=include_tests)
+
+    files = {os.path.relpath(f, target_dir) for f in crawl_directory(target_dir, include_tests)}
+    skipped = IGNORED_DIRS if include_tests else IGNORED_DIRS | TEST_DIRS
+    watcher = open_watcher(target_dir, skipped, polling)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {target_dir} ({len(files)} files, {mode}). Ctrl+C to stop.")
+
+    try:
+        for batch in watch_batches(watcher, debounce):
+            touched = set()
+            for path in batch:
+                rel_path = os.path.relpath(path, target_dir)
+                if os.path.isfile(path):
+                    if _indexable(rel_path, include_tests):
+                        touched.add(rel_path)
+                        files.add(rel_path)
+                else:
+                    # Deleted (or moved away): a file, or a whole directory of them
+                    gone = {f for f in files if f == rel_path or f.startswith(rel_path + os.sep)}
+                    touched |= gone
+                    files -= gone
+            if not touched:
+                continue
+
+            start = time.perf_counter()
+            conn = get_connection()
+            try:
+                with conn.cursor() as cur:
+                    symbols, added, removed = update_files(cur, project_id, target_dir, touched, sorted(files))
+                conn.commit()
+                elapsed = (time.perf_counter() - start) * 1000
+                shown = ", ".join(sorted(touched)[:3]) + (f" +{len(touched) - 3} more" if len(touched) > 3 else "")
+                print(f"♻️  {shown}: {symbols} symbols (+{added} / -{removed}) in {elapsed:.0f} ms")
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Update failed, index left as it was: {e}")
+            finally:
+                conn.close()
+    except KeyboardInterrupt:
+        print("\n👋 N3MO: Stopped watching.")
+    finally:
+        watcher.close()
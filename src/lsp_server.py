@@ -0,0 +1,369 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from call_graph import CallGraph
+from database import get_connection
+from extractors import extract_source
+from impact import MAX_DEPTH, find_project_id
+from source_cache import get_code_context
+
+# ==========================================
+# 🧷 LANGUAGE SERVER (n3mo lsp, stdio)
+# ==========================================
+# Editors talk JSON-RPC over stdin/stdout (Content-Length framed). The
+# project's call graph is loaded once (call_graph.py) and every request is
+# answered from memory, no database round trip:
+#
+#   textDocument/references           call sites of the symbol under the cursor
+#   textDocument/prepareCallHierarchy \
+#   callHierarchy/incomingCalls        > direct callers / callees
+#   callHierarchy/outgoingCalls       /
+#   n3mo/impact                       transitive callers (same walk as n3mo impact)
+#
+# Open buffers are re-extracted on didChange/didSave (just that file) and
+# patched into the graph before the next request. A background thread
+# reloads the graph when projects.indexed_at moves (n3mo index / watch),
+# then re-applies the open buffers on top.
+
+RELOAD_INTERVAL = 5.0     # seconds between indexed_at checks
+
+# LSP SymbolKind
+KIND_CLASS, KIND_METHOD, KIND_FUNCTION = 5, 6, 12
+
+ERROR_METHOD_NOT_FOUND = -32601
+ERROR_INTERNAL = -32603
+
+WORD = re.compile(r"[A-Za-z_$][\w$]*")
+
+
+def read_message(stream):
+    """Next JSON-RPC message, or None at end of input."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(stream.read(length)) if length is not None else {}
+
+
+def write_message(stream, message):
+    body = json.dumps(message).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+    stream.flush()
+
+
+def uri_to_path(uri):
+    return unquote(urlparse(uri).path)
+
+
+class LanguageServer:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.root = os.getcwd()
+        self.source_dir = self.root     # where files are read (TARGET_CODE_DIR inside Docker)
+        self.graph = CallGraph(None)
+        self.documents = {}       # file_path -> text of open buffers
+        self.pending = set()      # files to re-extract before the next request
+        self.lock = threading.Lock()
+        self.running = True
+        self.handlers = {
+            "initialize": self.initialize,
+            "shutdown": lambda params: None,
+            "exit": self.exit,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didSave": self.did_save,
+            "textDocument/didClose": self.did_close,
+            "textDocument/references": self.references,
+            "textDocument/prepareCallHierarchy": self.prepare_call_hierarchy,
+            "callHierarchy/incomingCalls": self.incoming_calls,
+            "callHierarchy/outgoingCalls": self.outgoing_calls,
+            "n3mo/impact": self.impact,
+        }
+
+    # --- Transport ---
+
+    def serve(self):
+        while self.running:
+            message = read_message(self.reader)
+            if message is None:
+                break
+            self.dispatch(message)
+
+    def dispatch(self, message):
+        method = message.get("method")
+        handler = self.handlers.get(method)
+        params = message.get("params") or {}
+        if "id" not in message:
+            # Notifications get no reply, not even for errors
+            if handler:
+                try:
+                    with self.lock:
+                        handler(params)
+                except Exception as e:
+                    self.log(f"{method} failed: {e}")
+            return
+        if method is None:
+            return
+        if handler is None:
+            return self.send({"jsonrpc": "2.0", "id": message["id"],
+                              "error": {"code": ERROR_METHOD_NOT_FOUND, "message": f"Unhandled method {method}"}})
+        try:
+            with self.lock:
+                self.flush()
+                result = handler(params)
+            self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+        except Exception as e:
+            self.send({"jsonrpc": "2.0", "id": message["id"], "error": {"code": ERROR_INTERNAL, "message": str(e)}})
+
+    def send(self, message):
+        write_message(self.writer, message)
+
+    def log(self, text, level=3):
+        self.send({"jsonrpc": "2.0", "method": "window/logMessage", "params": {"type": level, "message": text}})
+
+    # --- Lifecycle ---
+
+    def initialize(self, params):
+        if params.get("rootUri"):
+            self.root = uri_to_path(params["rootUri"])
+        elif params.get("rootPath"):
+            self.root = params["rootPath"]
+        self.source_dir = self.root if os.path.isdir(self.root) else os.getenv("TARGET_CODE_DIR", self.root)
+        self.graph = self.load() or self.graph
+        threading.Thread(target=self._watch_index, daemon=True).start()
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 1, "save": {"includeText": True}},
+                "referencesProvider": True,
+                "callHierarchyProvider": True,
+                "experimental": {"n3moImpact": True},
+            },
+            "serverInfo": {"name": "n3mo"},
+        }
+
+    def exit(self, params):
+        self.running = False
+
+    def load(self):
+        """The project's graph from the database, or None when this folder is not indexed."""
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                project_id = find_project_id(cur, self.root) or find_project_id(cur)
+                if project_id is None:
+                    self.send({"jsonrpc": "2.0", "method": "window/showMessage", "params": {
+                        "type": 2, "message": "n3mo: this folder is not indexed yet. Run n3mo index."}})
+                    return None
+                cur.execute("SELECT indexed_at FROM projects WHERE id = %s", (project_id,))
+                stamp = cur.fetchone()[0]
+                graph = CallGraph.load(cur, project_id)
+                graph.stamp = stamp
+            conn.rollback()
+            return graph
+        finally:
+            conn.close()
+
+    def _watch_index(self):
+        while self.running:
+            time.sleep(RELOAD_INTERVAL)
+            try:
+                conn = get_connection()
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT indexed_at FROM projects WHERE id = %s", (self.graph.project_id,))
+                        row = cur.fetchone()
+                    conn.rollback()
+                finally:
+                    conn.close()
+                if row is None or row[0] == self.graph.stamp:
+                    continue
+                graph = self.load()        # built outside the lock; requests keep the old one meanwhile
+                if graph is not None:
+                    with self.lock:
+                        self.graph = graph
+                        self.pending |= set(self.documents)
+                    self.log(f"n3mo: reloaded call graph ({len(graph)} symbols)")
+            except Exception as e:
+                self.log(f"n3mo: reload failed: {e}", level=1)
+
+    # --- Documents ---
+
+    def _path(self, uri):
+        return os.path.relpath(uri_to_path(uri), self.root)
+
+    def _uri(self, file_path):
+        return Path(self.root, file_path).as_uri()
+
+    def did_open(self, params):
+        document = params["textDocument"]
+        self.documents[self._path(document["uri"])] = document["text"]
+        # The index already has the saved file; only edits need a re-extract
+
+    def did_change(self, params):
+        path = self._path(params["textDocument"]["uri"])
+        self.documents[path] = params["contentChanges"][-1]["text"]
+        self.pending.add(path)
+
+    def did_save(self, params):
+        path = self._path(params["textDocument"]["uri"])
+        if "text" in params:
+            self.documents[path] = params["text"]
+        self.pending.add(path)
+
+    def did_close(self, params):
+        path = self._path(params["textDocument"]["uri"])
+        self.documents.pop(path, None)
+        self.pending.add(path)        # unsaved edits are gone: back to the file on disk
+
+    def flush(self):
+        """Re-extracts edited buffers (or the files on disk) into the graph."""
+        for path in self.pending:
+            text = self.documents.get(path)
+            if text is None:
+                try:
+                    with open(os.path.join(self.source_dir, path), encoding="utf-8") as f:
+                        text = f.read()
+                except OSError:
+                    text = ""
+            self.graph.replace_file(path, *extract_source(text.encode("utf-8"), path))
+        self.pending.clear()
+
+    def _line(self, path, line):
+        if path in self.documents:
+            lines = self.documents[path].split("\n")
+            return lines[line - 1] if 0 < line <= len(lines) else ""
+        context = get_code_context(os.path.join(self.source_dir, path), line, 0)
+        return context[0][1] if context else ""
+
+    def _range(self, path, line, name):
+        """Range of `name` on a 1-based line (the whole line start when it is not there)."""
+        text = self._line(path, line)
+        match = re.search(r"(?<![\w$])" + re.escape(name) + r"(?![\w$])", text)
+        start, end = match.span() if match else (0, 0)
+        return {"start": {"line": line - 1, "character": start}, "end": {"line": line - 1, "character": end}}
+
+    # --- Symbols ---
+
+    def symbol_at(self, params):
+        """Id of the symbol named under the cursor: its definition, the call there, or any by that name."""
+        graph = self.graph
+        path = self._path(params["textDocument"]["uri"])
+        line = params["position"]["line"] + 1
+        column = params["position"]["character"]
+        word = next((m.group(0) for m in WORD.finditer(self._line(path, line)) if m.start() <= column <= m.end()), None)
+        if word is None:
+            return None
+
+        in_file = [i for i in graph.by_file.get(path, ()) if graph.symbols[i][0] == word]
+        for symbol_id in in_file:
+            if graph.symbols[symbol_id][2] == line:
+                return symbol_id
+        enclosing = [i for i in graph.by_file.get(path, ()) if graph.symbols[i][2] <= line <= graph.symbols[i][3]]
+        if enclosing:
+            innermost = max(enclosing, key=lambda i: graph.symbols[i][2])
+            for callee, call_line in graph.callees.get(innermost, ()):
+                if call_line == line and graph.symbols[callee][0] == word:
+                    return callee
+        if in_file:
+            return in_file[0]
+        candidates = graph.by_name.get(word)
+        return candidates[0] if candidates else None
+
+    def _kind(self, symbol_id):
+        if self.graph.symbols[symbol_id][4] == "CLASS":
+            return KIND_CLASS
+        return KIND_METHOD if symbol_id in self.graph.parents else KIND_FUNCTION
+
+    def _item(self, symbol_id):
+        name, path, start_line, end_line, _ = self.graph.symbols[symbol_id]
+        return {
+            "name": name,
+            "kind": self._kind(symbol_id),
+            "detail": self.graph.qualified_name(symbol_id),
+            "uri": self._uri(path),
+            "range": {"start": {"line": start_line - 1, "character": 0}, "end": {"line": end_line or start_line, "character": 0}},
+            "selectionRange": self._range(path, start_line, name),
+            "data": {"id": symbol_id},
+        }
+
+    # --- Requests ---
+
+    def references(self, params):
+        target = self.symbol_at(params)
+        if target is None:
+            return []
+        graph = self.graph
+        name, path, start_line, _, _ = graph.symbols[target]
+        sites = sorted((graph.symbols[caller][1], line or graph.symbols[caller][2])
+                       for caller, line in graph.callers.get(target, ()))
+        if params.get("context", {}).get("includeDeclaration"):
+            sites.insert(0, (path, start_line))
+        return [{"uri": self._uri(site_path), "range": self._range(site_path, line, name)} for site_path, line in sites]
+
+    def prepare_call_hierarchy(self, params):
+        target = self.symbol_at(params)
+        return [self._item(target)] if target else None
+
+    def incoming_calls(self, params):
+        target = params["item"]["data"]["id"]
+        graph = self.graph
+        if target not in graph.symbols:
+            return []
+        by_caller = defaultdict(list)
+        for caller, line in graph.callers.get(target, ()):
+            by_caller[caller].append(line)
+        name = graph.symbols[target][0]
+        return [{"from": self._item(caller),
+                 "fromRanges": [self._range(graph.symbols[caller][1], line, name) for line in sorted(lines) if line]}
+                for caller, lines in by_caller.items()]
+
+    def outgoing_calls(self, params):
+        source = params["item"]["data"]["id"]
+        graph = self.graph
+        if source not in graph.symbols:
+            return []
+        by_callee = defaultdict(list)
+        for callee, line in graph.callees.get(source, ()):
+            by_callee[callee].append(line)
+        path = graph.symbols[source][1]
+        return [{"to": self._item(callee),
+                 "fromRanges": [self._range(path, line, graph.symbols[callee][0]) for line in sorted(lines) if line]}
+                for callee, lines in by_callee.items()]
+
+    def impact(self, params):
+        """
+        Custom request. params: textDocument + position, optional depth.
+        Returns the target and every transitive caller with its call site,
+        the same rows as `n3mo impact --format json`.
+        """
+        target = self.symbol_at(params)
+        if target is None:
+            return None
+        graph = self.graph
+        depth = params.get("depth") or MAX_DEPTH
+        callers = [{"id": symbol_id, "name": name, "uri": self._uri(path), "depth": level, "via": via,
+                    "range": self._range(path, line, graph.symbols[via][0]) if line else None}
+                   for symbol_id, name, path, line, level, via in graph.walk_callers(target, depth)]
+        return {"target": self._item(target), "callers": callers, "cycles": graph.cycles(target, depth)}
+
+
+def serve_stdio():
+    reader, writer = sys.stdin.buffer, sys.stdout.buffer
+    # Anything else that prints (extractor warnings) must not corrupt the protocol stream
+    sys.stdout = sys.stderr
+    LanguageServer(reader, writer).serve()
@@ -0,0 +1,167 @@
+import posixpath
+
+from psycopg2 import sql
+
+from database import get_connection
+
+# ==========================================
+# 🗂️ FILE / PACKAGE DEPENDENCY GRAPH
+# ==========================================
+# Symbol-level edges rolled up to file -> file and package -> package
+# (a package is the file's directory). Weights count call sites and
+# resolved imports. Self-edges are dropped. The indexer refreshes these
+# tables after linking, so `n3mo modgraph` and
+# `n3mo impact --granularity` read a graph that is orders of magnitude
+# smaller than calls.
+#
+# Edges are keyed by their source, so refreshing a set of files only
+# touches rows whose source is one of them.
+
+GRANULARITIES = ("symbol", "file", "package")
+EDGE_TABLES = {
+    "file": ("file_edges", "source_file", "target_file"),
+    "package": ("package_edges", "source_package", "target_package"),
+}
+
+# 'pkg/sub/mod.py' -> 'pkg/sub', 'mod.py' -> '.'
+PACKAGE_OF = "COALESCE(NULLIF(regexp_replace({}, '/?[^/]*$', ''), ''), '.')"
+
+DELETE_FILE_EDGES = """
+DELETE FROM file_edges
+WHERE project_id = %(project_id)s
+  AND (%(files)s::text[] IS NULL OR source_file = ANY(%(files)s::text[]));
+"""
+
+INSERT_FILE_EDGES = """
+INSERT INTO file_edges (project_id, source_file, target_file, call_count, import_count)
+SELECT %(project_id)s, source_file, target_file, SUM(calls), SUM(imports)
+FROM (
+    SELECT s.file_path AS source_file, t.file_path AS target_file, 1 AS calls, 0 AS imports
+    FROM calls c
+    JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+    JOIN symbols t ON t.project_id = c.project_id AND t.id = c.resolved_symbol_id
+    WHERE c.project_id = %(project_id)s
+      AND c.resolved_symbol_id IS NOT NULL
+      AND (%(files)s::text[] IS NULL OR s.file_path = ANY(%(files)s::text[]))
+    UNION ALL
+    SELECT i.file_path, i.resolved_file, 0, 1
+    FROM imports i
+    WHERE i.project_id = %(project_id)s
+      AND i.resolved_file IS NOT NULL
+      AND (%(files)s::text[] IS NULL OR i.file_path = ANY(%(files)s::text[]))
+) e
+WHERE source_file <> target_file
+GROUP BY source_file, target_file;
+"""
+
+DELETE_PACKAGE_EDGES = """
+DELETE FROM package_edges
+WHERE project_id = %(project_id)s
+  AND (%(packages)s::text[] IS NULL OR source_package = ANY(%(packages)s::text[]));
+"""
+
+INSERT_PACKAGE_EDGES = """
+INSERT INTO package_edges (project_id, source_package, target_package, call_count, import_count)
+SELECT %(project_id)s, source_package, target_package, SUM(call_count), SUM(import_count)
+FROM (
+    SELECT {source} AS source_package, {target} AS target_package, call_count, import_count
+    FROM file_edges
+    WHERE project_id = %(project_id)s
+) e
+WHERE source_package <> target_package
+  AND (%(packages)s::text[] IS NULL OR source_package = ANY(%(packages)s::text[]))
+GROUP BY source_package, target_package;
+""".format(source=PACKAGE_OF.format("source_file"), target=PACKAGE_OF.format("target_file"))
+
+MODGRAPH_QUERY = """
+SELECT {source}, {target}, call_count, import_count
+FROM {edges}
+WHERE project_id = %(project_id)s
+  AND call_count + import_count >= %(min_weight)s
+ORDER BY call_count + import_count DESC, 1, 2;
+"""
+
+# Coarse blast radius: the symbol's direct callers, rolled up to their
+# file/package, then every unit that depends on those, transitively.
+COARSE_IMPACT_QUERY = """
+WITH RECURSIVE walk(unit, depth, via, weight) AS (
+    SELECT {unit_of_s}, 1, {unit_of_t}, COUNT(*)::int
+    FROM calls c
+    JOIN symbols s ON s.project_id = c.project_id AND s.id = c.source_symbol_id
+    JOIN symbols t ON t.project_id = c.project_id AND t.id = c.resolved_symbol_id
+    WHERE c.project_id = %(project_id)s
+      AND c.resolved_symbol_id = %(target_id)s
+    GROUP BY 1, 3
+    UNION
+    SELECT e.{source}, w.depth + 1, e.{target}, e.call_count + e.import_count
+    FROM walk w
+    JOIN {edges} e ON e.project_id = %(project_id)s AND e.{target} = w.unit
+    WHERE w.depth < %(max_depth)s
+)
+SELECT unit, depth, via, weight
+FROM walk
+WHERE unit <> %(origin)s
+ORDER BY depth, weight DESC, unit;
+"""
+
+
+def package_of(file_path):
+    return posixpath.dirname(file_path) or "."
+
+
+def refresh_module_edges(cur, project_id, files=None):
+    """
+    Re-aggregates file_edges for the given source files (None = whole
+    project), then the package_edges rows of their packages.
+    Caller commits.
+    """
+    files = sorted(set(files)) if files is not None else None
+    packages = sorted({package_of(f) for f in files}) if files is not None else None
+
+    params = {"project_id": project_id, "files": files, "packages": packages}
+    cur.execute(DELETE_FILE_EDGES, params)
+    cur.execute(INSERT_FILE_EDGES, params)
+    cur.execute(DELETE_PACKAGE_EDGES, params)
+    cur.execute(INSERT_PACKAGE_EDGES, params)
+
+
+def rebuild_module_edges(project_id, files=None):
+    print("🗂️  Aggregating file/package dependencies...")
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            refresh_module_edges(cur, project_id, files)
+            conn.commit()
+    except Exception as e:
+        print(f"❌ Module graph refresh failed: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def fetch_modgraph(cur, project_id, granularity="file", min_weight=1):
+    """(source, target, call_count, import_count), heaviest edges first."""
+    table, source, target = EDGE_TABLES[granularity]
+    query = sql.SQL(MODGRAPH_QUERY).format(
+        source=sql.Identifier(source), target=sql.Identifier(target), edges=sql.Identifier(table))
+    cur.execute(query, {"project_id": project_id, "min_weight": min_weight})
+    return cur.fetchall()
+
+
+def fetch_coarse_impact(cur, project_id, target, granularity, max_depth):
+    """
+    target is (id, name, file_path). Returns (unit, depth, via, weight)
+    rows ordered by depth; a unit can appear at several depths.
+    """
+    table, source, target_col = EDGE_TABLES[granularity]
+    if granularity == "file":
+        unit_of_s, unit_of_t, origin = sql.SQL("s.file_path"), sql.SQL("t.file_path"), target[2]
+    else:
+        unit_of_s = sql.SQL(PACKAGE_OF.format("s.file_path"))
+        unit_of_t = sql.SQL(PACKAGE_OF.format("t.file_path"))
+        origin = package_of(target[2])
+    query = sql.SQL(COARSE_IMPACT_QUERY).format(
+        unit_of_s=unit_of_s, unit_of_t=unit_of_t,
+        source=sql.Identifier(source), target=sql.Identifier(target_col), edges=sql.Identifier(table))
+    cur.execute(query, {"project_id": project_id, "target_id": target[0],
+                        "max_depth": max_depth, "origin": origin})
+    return cur.fetchall()
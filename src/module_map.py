@@ -0,0 +1,90 @@
+import posixpath
+from collections import defaultdict
+
+# ==========================================
+# 🗺️ MODULE MAP (import text -> file)
+# ==========================================
+# Built once per project from the crawled file list. Python modules are
+# registered under their dotted path from the source root (the highest
+# directory that is not itself a package) and under their full
+# repo-relative path, so both `from database import x` (flat src/ layout)
+# and `from src.database import x` resolve. JS/TS imports are resolved
+# by path only; bare package names ("react") stay external.
+#
+# A "stem" is a module path without its extension: 'pkg/mod' for
+# pkg/mod.py, 'pkg' for pkg/__init__.py.
+
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+
+class ModuleMap:
+    def __init__(self, files):
+        self.files = {posixpath.normpath(f.replace("\\", "/")) for f in files}
+        self.stems = defaultdict(list)    # dotted module -> [stem, ...]
+        self.packages = {posixpath.dirname(f) for f in self.files if posixpath.basename(f) == "__init__.py"}
+
+        for path in sorted(self.files):
+            if not path.endswith(".py"):
+                continue
+            stem = path[:-3]
+            if posixpath.basename(stem) == "__init__":
+                stem = posixpath.dirname(stem)
+            parts = stem.split("/") if stem else []
+            dirs = path.split("/")[:-1]
+            root = len(dirs)
+            while root > 0 and "/".join(dirs[:root]) in self.packages:
+                root -= 1
+            for name in {".".join(parts), ".".join(parts[root:])}:
+                if name:
+                    self.stems[name].append(stem)
+
+    def file_of(self, stem):
+        """pkg/mod -> pkg/mod.py or pkg/mod/__init__.py, if indexed."""
+        for candidate in (stem + ".py", stem + "/__init__.py"):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def python_stem(self, module, importer):
+        """Stem of a Python import ('.models', '..', 'pkg.mod') seen from `importer`."""
+        level = len(module) - len(module.lstrip("."))
+        rest = module[level:]
+        if level:
+            base = posixpath.dirname(importer)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            return posixpath.join(base, *rest.split(".")) if rest else base
+        candidates = self.stems.get(rest)
+        if not candidates:
+            return None
+        # Same dotted name in several places (scripts, vendored copies): nearest to the importer
+        return max(candidates, key=lambda stem: (_shared_prefix(stem, importer), -len(stem)))
+
+    def js_file(self, module, importer):
+        """'./util' from src/app.ts -> src/util.ts (or .js, or util/index.ts ...)."""
+        if not module.startswith("."):
+            return None
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(importer), module))
+        if path in self.files:
+            return path
+        for candidate in [path + ext for ext in JS_EXTENSIONS] + [path + "/index" + ext for ext in JS_EXTENSIONS]:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def top_level_packages(self):
+        """{package name: directory} for importable top-level packages ('acme_sdk': 'src/acme_sdk')."""
+        found = {}
+        for path in sorted(self.packages, key=len):
+            if path and posixpath.dirname(path) not in self.packages:
+                found.setdefault(posixpath.basename(path), path)
+        return found
+
+
+def _shared_prefix(stem, importer):
+    count = 0
+    for a, b in zip(stem.split("/"), posixpath.dirname(importer).split("/")):
+        if a != b:
+            break
+        count += 1
+    return count
@@ -0,0 +1,47 @@
+import sys
+
+# ==========================================
+# 📤 MACHINE-READABLE OUTPUT (--format)
+# ==========================================
+# Writes traversal rows as they arrive, one at a time, so piping a huge
+# impact set into jq / a CSV loader never holds it all in memory.
+# The field names are a stable interface for CI tooling.
+
+FORMATS = ("text", "json", "ndjson", "csv")
+TRAVERSAL_FIELDS = ("id", "name", "file", "line", "depth", "via")
+COARSE_FIELDS = ("unit", "depth", "via", "weight")           # impact --granularity file|package
+MODGRAPH_FIELDS = ("source", "target", "calls", "imports")
+ENTRY_FIELDS = ("id", "name", "file", "line", "kind", "depth", "origin", "decorators")  # impact --entry-points
+CROSS_FIELDS = ("project", "id", "name", "file", "line", "depth", "via")   # impact --cross-projects
+
+
+def write_rows(rows, fmt, fields=TRAVERSAL_FIELDS, out=None):
+    """
+    rows: iterable of tuples in `fields` order. Returns the row count.
+    json is a single array, but it is still written incrementally.
+    """
+    import csv
+    import json  # not at module level: argparse reads FORMATS on every --help
+
+    out = out or sys.stdout
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "ndjson":
+        for row in rows:
+            out.write(json.dumps(dict(zip(fields, row)), default=str) + "\n")
+            count += 1
+    elif fmt == "json":
+        out.write("[")
+        for row in rows:
+            out.write((",\n " if count else "\n ") + json.dumps(dict(zip(fields, row)), default=str))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    else:
+        raise ValueError(f"unknown format: {fmt}")
+    out.flush()
+    return count
@@ -0,0 +1,192 @@
+from collections import deque
+
+# ==========================================
+# 🎯 REACHABILITY LABELS ("does A affect B?")
+# ==========================================
+# 2-hop labels over the condensed call graph (scc.py), built with pruned
+# landmark labeling: every component gets an out-label (hubs it reaches)
+# and an in-label (hubs that reach it), so
+#
+#   a reaches b  <=>  out(a) ∩ in(b) ≠ ∅
+#
+# which is one array-overlap test, however far apart a and b are. The
+# labels are exact (no false positives or negatives). Components are
+# topologically numbered with callers first, so b < a rules a pair out
+# before any label is read.
+#
+# A change to X can affect Y when Y (transitively) calls X, i.e. when
+# Y's component reaches X's.
+
+REACHES_QUERY = """
+SELECT sa.component_id, sb.component_id, la.out_hubs && lb.in_hubs
+FROM symbol_components sa
+JOIN component_labels la ON la.project_id = sa.project_id AND la.component_id = sa.component_id
+JOIN symbol_components sb ON sb.project_id = sa.project_id AND sb.symbol_id = %(target_id)s
+JOIN component_labels lb ON lb.project_id = sb.project_id AND lb.component_id = sb.component_id
+WHERE sa.project_id = %(project_id)s AND sa.symbol_id = %(source_id)s;
+"""
+
+# One BFS level of the path search: callees of the frontier that can
+# still reach the goal (their out-label meets the goal's in-label).
+PATH_STEP_QUERY = """
+SELECT c.source_symbol_id, c.resolved_symbol_id, c.line_number
+FROM calls c
+JOIN symbol_components sc ON sc.project_id = c.project_id AND sc.symbol_id = c.resolved_symbol_id
+JOIN component_labels l ON l.project_id = sc.project_id AND l.component_id = sc.component_id
+WHERE c.project_id = %(project_id)s
+  AND c.source_symbol_id = ANY(%(frontier)s::uuid[])
+  AND l.out_hubs && %(goal_in)s::int[];
+"""
+
+PATH_NAMES_QUERY = """
+SELECT s.id, COALESCE(p.name || '.', '') || s.name, s.file_path
+FROM symbols s
+LEFT JOIN symbols p ON p.project_id = s.project_id AND p.id = s.parent_id
+WHERE s.project_id = %(project_id)s AND s.id = ANY(%(ids)s::uuid[]);
+"""
+
+
+def build_labels(component_count, dag_edges):
+    """
+    Pruned landmark labeling on a DAG. Returns (out_labels, in_labels):
+    per component, a sorted list of hub components.
+    """
+    successors = [[] for _ in range(component_count)]
+    predecessors = [[] for _ in range(component_count)]
+    for source, target in dag_edges:
+        successors[source].append(target)
+        predecessors[target].append(source)
+
+    out_labels = [set() for _ in range(component_count)]
+    in_labels = [set() for _ in range(component_count)]
+
+    # Hubs that sit on many paths first, so later searches prune early
+    order = sorted(range(component_count),
+                   key=lambda c: (len(successors[c]) + 1) * (len(predecessors[c]) + 1), reverse=True)
+    for hub in order:
+        # Forward: hub reaches u, unless earlier hubs already prove it
+        queue, seen = deque([hub]), {hub}
+        while queue:
+            u = queue.popleft()
+            if not out_labels[hub].isdisjoint(in_labels[u]):
+                continue
+            in_labels[u].add(hub)
+            for w in successors[u]:
+                if w not in seen:
+                    seen.add(w)
+                    queue.append(w)
+        # Backward: u reaches hub
+        queue, seen = deque([hub]), {hub}
+        while queue:
+            u = queue.popleft()
+            if not out_labels[u].isdisjoint(in_labels[hub]):
+                continue
+            out_labels[u].add(hub)
+            for w in predecessors[u]:
+                if w not in seen:
+                    seen.add(w)
+                    queue.append(w)
+    return [sorted(l) for l in out_labels], [sorted(l) for l in in_labels]
+
+
+def labels_reach(out_labels, in_labels, source, target):
+    if target < source:
+        return False
+    return not set(out_labels[source]).isdisjoint(in_labels[target])
+
+
+def refresh_reachability(cur, project_id):
+    """
+    Rebuilds component_labels from component_edges. Run after
+    scc.refresh_components. Caller commits. Returns the average label size.
+    """
+    from database import execute_values
+
+    cur.execute("SELECT COALESCE(MAX(component_id) + 1, 0) FROM symbol_components WHERE project_id = %s",
+                (project_id,))
+    component_count = cur.fetchone()[0]
+    cur.execute("SELECT source_component, target_component FROM component_edges WHERE project_id = %s",
+                (project_id,))
+    out_labels, in_labels = build_labels(component_count, cur.fetchall())
+
+    cur.execute("DELETE FROM component_labels WHERE project_id = %s", (project_id,))
+    execute_values(cur, "INSERT INTO component_labels (project_id, component_id, out_hubs, in_hubs) VALUES %s",
+                   [(project_id, c, out_labels[c], in_labels[c]) for c in range(component_count)],
+                   page_size=5000)
+    total = sum(map(len, out_labels)) + sum(map(len, in_labels))
+    return total / component_count if component_count else 0.0
+
+
+def rebuild_reachability(project_id):
+    from database import get_connection
+
+    print("🎯 Building reachability labels...")
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            avg = refresh_reachability(cur, project_id)
+            conn.commit()
+            print(f"🎯 Labels ready ({avg:.1f} hubs per component).")
+    except Exception as e:
+        print(f"❌ Reachability labels failed: {e}")
+    finally:
+        if conn: conn.close()
+
+
+def fetch_reaches(cur, project_id, source_id, target_id):
+    """True/False, or None when the project has no labels yet."""
+    cur.execute(REACHES_QUERY, {"project_id": project_id, "source_id": source_id, "target_id": target_id})
+    row = cur.fetchone()
+    if row is None:
+        return None
+    source_component, target_component, overlap = row
+    return target_component >= source_component and bool(overlap)
+
+
+def fetch_path(cur, project_id, source_id, target_id):
+    """
+    Shortest call chain source -> ... -> target as
+    [(id, qualified_name, file_path, line), ...], where line is the call
+    site in the previous symbol (None for the first), or None when there
+    is no chain. Only call sites whose callee can still reach the target
+    are followed, so the search never leaves the relevant subgraph.
+    """
+    cur.execute("""
+        SELECT l.in_hubs FROM symbol_components sc
+        JOIN component_labels l ON l.project_id = sc.project_id AND l.component_id = sc.component_id
+        WHERE sc.project_id = %s AND sc.symbol_id = %s
+    """, (project_id, target_id))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    goal_in = row[0]
+
+    parent = {source_id: None}
+    frontier = [source_id]
+    while frontier and target_id not in parent:
+        cur.execute(PATH_STEP_QUERY, {"project_id": project_id, "frontier": frontier, "goal_in": goal_in})
+        next_frontier = []
+        for caller, callee, line in cur.fetchall():
+            if callee not in parent:
+                parent[callee] = (caller, line)
+                next_frontier.append(callee)
+        frontier = next_frontier
+
+    path = unwind_path(parent, target_id)
+    if path is None:
+        return None
+    cur.execute(PATH_NAMES_QUERY, {"project_id": project_id, "ids": [node for node, _ in path]})
+    names = {row[0]: row[1:] for row in cur.fetchall()}
+    return [(node, *names[node], line) for node, line in path]
+
+
+def unwind_path(parent, target_id):
+    if target_id not in parent:
+        return None
+    path, node = [], target_id
+    while node is not None:
+        step = parent[node]
+        path.append((node, step[1] if step else None))
+        node = step[0] if step else None
+    path.reverse()
+    return path
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from reachability import build_labels, labels_reach
+from scc import condense
+
+
+def reachable(successors, start):
+    seen, stack = {start}, [start]
+    while stack:
+        for child in successors.get(stack.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def random_graph(seed, nodes=40, edges=70):
+    rng = random.Random(seed)
+    successors = {n: [] for n in range(nodes)}
+    for _ in range(edges):
+        successors[rng.randrange(nodes)].append(rng.randrange(nodes))
+    return list(range(nodes)), successors
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_labels_answer_reachability_exactly(seed):
+    nodes, successors = random_graph(seed, nodes=60, edges=90)
+    component_of, members, dag_edges = condense(nodes, successors)
+    out_labels, in_labels = build_labels(len(members), dag_edges)
+
+    dag = {}
+    for source, target in dag_edges:
+        dag.setdefault(source, []).append(target)
+    for a in range(len(members)):
+        reach = reachable(dag, a)
+        for b in range(len(members)):
+            assert labels_reach(out_labels, in_labels, a, b) == (b in reach), (a, b)
+
+
+def test_labels_on_empty_and_isolated_components():
+    assert build_labels(0, set()) == ([], [])
+    out_labels, in_labels = build_labels(3, set())
+    assert labels_reach(out_labels, in_labels, 1, 1)
+    assert not labels_reach(out_labels, in_labels, 0, 2)
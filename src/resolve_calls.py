@@ -1,4 +1,106 @@
+from psycopg2 import sql
+
 from database import get_connection
+from hierarchy import link_methods, refresh_inherits
+
+# 0. Scoped Match: the caller's own file, then what that file imports
+# (resolve_imports.py). Only calls these cannot place fall through to
+# the project-wide name joins below.
+QUERY_SAME_FILE = """
+UPDATE {calls} c
+SET resolved_symbol_id = s.id
+FROM {symbols} src, {symbols} s
+WHERE c.project_id = %s
+AND c.resolved_symbol_id IS NULL
+AND src.project_id = c.project_id AND src.id = c.source_symbol_id
+AND s.project_id = c.project_id AND s.file_path = src.file_path
+AND s.parent_id IS NULL
+AND s.name = c.call_name;
+"""
+
+# f() after `from m import f [as g]`, or after `from m import *`
+QUERY_IMPORTED = """
+UPDATE {calls} c
+SET resolved_symbol_id = COALESCE(i.resolved_symbol_id, s.id)
+FROM {symbols} src, {imports} i
+LEFT JOIN {symbols} s
+  ON i.name = '*' AND s.project_id = i.project_id AND s.file_path = i.resolved_file AND s.parent_id IS NULL
+WHERE c.project_id = %s
+AND c.resolved_symbol_id IS NULL
+AND src.project_id = c.project_id AND src.id = c.source_symbol_id
+AND i.project_id = c.project_id AND i.file_path = src.file_path
+AND (
+    (i.resolved_symbol_id IS NOT NULL AND c.call_name = COALESCE(i.alias, i.name))
+    OR (i.name = '*' AND s.name = c.call_name)
+);
+"""
+
+# m.f() after `import pkg.m as m`, `from pkg import m`, `import * as m from "./m"`
+QUERY_MODULE_ATTR = """
+UPDATE {calls} c
+SET resolved_symbol_id = s.id
+FROM {symbols} src, {imports} i, {symbols} s
+WHERE c.project_id = %s
+AND c.resolved_symbol_id IS NULL
+AND src.project_id = c.project_id AND src.id = c.source_symbol_id
+AND i.project_id = c.project_id AND i.file_path = src.file_path
+AND i.resolved_symbol_id IS NULL AND i.resolved_file IS NOT NULL
+AND s.project_id = c.project_id AND s.file_path = i.resolved_file AND s.parent_id IS NULL
+AND c.call_name = COALESCE(i.alias, i.name, i.module) || '.' || s.name;
+"""
+
+# 1. Exact Match (Best case)
+QUERY_EXACT = """
+UPDATE {calls} c
+SET resolved_symbol_id = s.id
+FROM {symbols} s
+WHERE c.call_name = s.name
+AND c.project_id = s.project_id
+AND s.project_id = %s
+AND c.resolved_symbol_id IS NULL;
+"""
+
+# 2. "Smart" Match (Handles self.func, cls.func and module.func)
+# This is the part that fixes _visit_imports!
+# Comparing the last dotted segment (instead of LIKE '%.' || name)
+# turns this into an equality join the planner can hash, rather
+# than a nested loop over every call x every symbol in the project.
+QUERY_SMART = """
+UPDATE {calls} c
+SET resolved_symbol_id = s.id
+FROM {symbols} s
+WHERE c.call_name LIKE '%%.%%'
+AND substring(c.call_name from '[^.]+$') = s.name
+AND c.project_id = s.project_id
+AND s.project_id = %s
+AND c.resolved_symbol_id IS NULL;
+"""
+
+
+def link_calls(cur, project_id, calls_table="calls", symbols_table="symbols", imports_table="imports"):
+    """
+    Runs the linking passes on the given tables (live or staging):
+    self./super() calls through the class hierarchy first (hierarchy.py),
+    then same-file and imported names, then exact and smart name matches
+    for whatever is left. Imports must be resolved first (link_imports).
+    Returns (method, scoped, exact, smart) match counts. Caller commits.
+    """
+    match_method = link_methods(cur, project_id, calls_table, symbols_table, imports_table)
+    tables = {"calls": sql.Identifier(calls_table), "symbols": sql.Identifier(symbols_table),
+              "imports": sql.Identifier(imports_table)}
+
+    match_scoped = 0
+    for query in (QUERY_SAME_FILE, QUERY_IMPORTED, QUERY_MODULE_ATTR):
+        cur.execute(sql.SQL(query).format(**tables), (project_id,))
+        match_scoped += cur.rowcount
+
+    cur.execute(sql.SQL(QUERY_EXACT).format(**tables), (project_id,))
+    match_exact = cur.rowcount
+
+    cur.execute(sql.SQL(QUERY_SMART).format(**tables), (project_id,))
+    match_smart = cur.rowcount
+    return match_method, match_scoped, match_exact, match_smart
+
 
 def resolve_call_links(project_id):
     """
@@ -8,41 +110,14 @@ def resolve_call_links(project_id):
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            # 1. Exact Match (Best case)
-            query_exact = """
-            UPDATE calls c
-            SET resolved_symbol_id = s.id
-            FROM symbols s
-            WHERE c.call_name = s.name
-            AND c.project_id = s.project_id
-            AND s.project_id = %s
-            AND c.resolved_symbol_id IS NULL;
-            """
-            cur.execute(query_exact, (project_id,))
-            match_exact = cur.rowcount
-
-            # 2. "Smart" Match (Handles self.func and module.func)
-            # This is the part that fixes _visit_imports!
-            query_smart = """
-            UPDATE calls c
-            SET resolved_symbol_id = s.id
-            FROM symbols s
-            WHERE (
-                c.call_name LIKE '%%.' || s.name       -- Matches module.func
-                OR c.call_name = 'self.' || s.name     -- Matches self.func
-                OR c.call_name = 'cls.' || s.name      -- Matches cls.func
-            )
-            AND c.project_id = s.project_id
-            AND s.project_id = %s
-            AND c.resolved_symbol_id IS NULL;
-            """
-            cur.execute(query_smart, (project_id,))
-            match_smart = cur.rowcount
-            
+            match_method, match_scoped, match_exact, match_smart = link_calls(cur, project_id)
+            refresh_inherits(cur, project_id)
             conn.commit()
-            print(f"🔗 Connected {match_exact + match_smart} calls ({match_exact} exact, {match_smart} smart).")
+            print(f"🔗 Connected {match_method + match_scoped + match_exact + match_smart} calls "
+                  f"({match_method} via class hierarchy, {match_scoped} via file/imports, "
+                  f"{match_exact} exact, {match_smart} smart).")
             
     except Exception as e:
         print(f"❌ Linking failed: {e}")
     finally:
-        if conn: conn.close()
\ No newline at end of file
+        if conn: conn.close()
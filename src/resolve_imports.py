@@ -1,21 +1,162 @@
+from psycopg2 import sql
+
 from database import get_connection
+from module_map import ModuleMap
+
+# ==========================================
+# 📦 IMPORT RESOLUTION (import -> file, import -> symbol)
+# ==========================================
+# Every import row is resolved through the module map (module_map.py)
+# instead of matching its name against any symbol in the project:
+#
+#   import pkg.mod [as m]        -> resolved_file = pkg/mod.py
+#   from pkg import mod          -> resolved_file = pkg/mod.py        (submodule)
+#   from .mod import f [as g]    -> resolved_symbol_id = f,
+#                                   resolved_file = the file defining f
+#   from pkg import f            -> f through pkg/__init__.py re-exports
+#                                   (`from .impl import f`, `from .impl import *`)
+#   import { f } from "./util"   -> same, by path, for JS/TS
+#
+# Imports of anything outside the project stay NULL. All rows of the
+# project are re-resolved on each run, so stale links get cleared.
+
+MAX_REEXPORT_DEPTH = 16
+
+FILES_QUERY = """
+SELECT file_path FROM {symbols} WHERE project_id = %(project_id)s
+UNION
+SELECT file_path FROM {imports} WHERE project_id = %(project_id)s;
+"""
+
+IMPORTS_QUERY = """
+SELECT id, file_path, module, name, alias, resolved_file, resolved_symbol_id
+FROM {imports}
+WHERE project_id = %s;
+"""
+
+TOP_LEVEL_QUERY = """
+SELECT id, file_path, name
+FROM {symbols}
+WHERE project_id = %s AND parent_id IS NULL;
+"""
+
+UPDATE_IMPORTS = """
+UPDATE {imports} i
+SET resolved_file = v.resolved_file, resolved_symbol_id = v.symbol_id::uuid
+FROM (VALUES %s) AS v (id, resolved_file, symbol_id)
+WHERE i.id = v.id::uuid;
+"""
+
+
+class ImportResolver:
+    def __init__(self, module_map, imports, top_level):
+        """
+        imports: [(id, file_path, module, name, alias), ...]
+        top_level: {(file_path, name): symbol id} for module-level definitions
+        """
+        self.modules = module_map
+        self.top_level = top_level
+        self.by_file = {}
+        for row in imports:
+            self.by_file.setdefault(row[1], []).append(row)
+        self._names = {}
+
+    def resolve(self, file_path, module, name):
+        """(resolved_file, resolved_symbol_id); either can be None."""
+        if file_path.endswith(".py"):
+            return self.resolve_python(self.modules.python_stem(module, file_path), name)
+        return self._named(self.modules.js_file(module, file_path), name)
+
+    def resolve_python(self, stem, name):
+        if stem is None:
+            return None, None
+        if name and name != "*":
+            submodule = self.modules.file_of(f"{stem}/{name}" if stem else name)
+            if submodule:
+                return submodule, None
+        return self._named(self.modules.file_of(stem), name)
+
+    def _named(self, target, name):
+        if target is None or not name or name == "*":
+            return target, None
+        found = self.lookup(target, name)
+        return found if found else (target, None)
+
+    def lookup(self, file_path, name, depth=0):
+        """
+        Where `name` as exported by `file_path` is defined: (file, symbol id),
+        following re-exports (imports inside that file), or None.
+        """
+        key = (file_path, name)
+        if key in self.top_level:
+            return file_path, self.top_level[key]
+        if key in self._names:
+            return self._names[key]
+        self._names[key] = None                   # breaks re-export cycles
+        found = None
+        if depth < MAX_REEXPORT_DEPTH:
+            for _, _, module, imported, alias in self.by_file.get(file_path, ()):
+                if imported == "*":
+                    target, _ = self.resolve(file_path, module, None)
+                    found = self.lookup(target, name, depth + 1) if target else None
+                elif (alias or imported) == name:
+                    target, symbol_id = self.resolve(file_path, module, imported)
+                    found = (target, symbol_id) if symbol_id else None
+                if found:
+                    break
+        self._names[key] = found
+        return found
+
+
+def load_resolver(cur, project_id, imports_table="imports", symbols_table="symbols", files=None):
+    """
+    (ImportResolver, import rows) for a project. `files` is the crawled
+    file list (repo-relative); without it the module map is built from
+    the files already in the index, which misses empty __init__.py files.
+    """
+    tables = {"imports": sql.Identifier(imports_table), "symbols": sql.Identifier(symbols_table)}
+    if files is None:
+        cur.execute(sql.SQL(FILES_QUERY).format(**tables), {"project_id": project_id})
+        files = [row[0] for row in cur.fetchall()]
+
+    cur.execute(sql.SQL(IMPORTS_QUERY).format(**tables), (project_id,))
+    rows = cur.fetchall()
+    cur.execute(sql.SQL(TOP_LEVEL_QUERY).format(**tables), (project_id,))
+    top_level = {}
+    for symbol_id, file_path, name in cur.fetchall():
+        top_level.setdefault((file_path, name), symbol_id)
+    return ImportResolver(ModuleMap(files), [row[:5] for row in rows], top_level), rows
+
+
+def link_imports(cur, project_id, imports_table="imports", symbols_table="symbols", files=None):
+    """
+    Resolves every import of the project on the given tables (live or
+    staging); see load_resolver for `files`. Returns the number of
+    resolved imports. Caller commits.
+    """
+    from database import execute_values
+
+    tables = {"imports": sql.Identifier(imports_table), "symbols": sql.Identifier(symbols_table)}
+    resolver, rows = load_resolver(cur, project_id, imports_table, symbols_table, files)
+    changed, resolved = [], 0
+    for import_id, file_path, module, name, _, old_file, old_symbol in rows:
+        new_file, new_symbol = resolver.resolve(file_path, module or "", name)
+        resolved += new_file is not None
+        if (new_file, new_symbol) != (old_file, old_symbol and str(old_symbol)):
+            changed.append((import_id, new_file, new_symbol))
+
+    execute_values(cur, sql.SQL(UPDATE_IMPORTS).format(**tables), changed,
+                   template="(%s, %s::text, %s)", page_size=5000)
+    return resolved
+
 
-def resolve_import_links(project_id):
+def resolve_import_links(project_id, files=None):
     print("🔗 Resolving Imports...")
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            # Simple Logic: If I import 'x', connect it to the symbol 'x'
-            query = """
-            UPDATE imports i
-            SET resolved_symbol_id = s.id
-            FROM symbols s
-            WHERE i.name = s.name
-            AND i.project_id = s.project_id
-            AND s.project_id = %s
-            AND i.resolved_symbol_id IS NULL;
-            """
-            cur.execute(query, (project_id,))
+            resolved = link_imports(cur, project_id, files=files)
             conn.commit()
+            print(f"📦 Resolved {resolved} imports to project files.")
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
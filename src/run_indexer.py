@@ -6,7 +6,8 @@ from database import (
     ensure_project, 
     upsert_symbol, 
     upsert_import, 
-    upsert_call
+    upsert_call,
+    mark_indexed
 )
 
 # --- CRAWLER IMPORT ---
@@ -17,15 +18,8 @@ except ImportError:
     from src.crawler import crawl_directory
 
 # --- EXTRACTOR IMPORT ---
-# Using the file 'symbol_extractor.py' seen in your screenshot
-try:
-    from symbol_extractor import extract_symbols
-except ImportError:
-    try:
-        from src.symbol_extractor import extract_symbols
-    except ImportError:
-        # Fallback if Python path is tricky
-        from extractor import extract_symbols
+# extract_file picks the grammar from the file's language (extractors.py)
+from extractors import extract_file
 
 # --- RESOLVER IMPORT ---
 # Using the file 'resolve_calls.py' seen in your screenshot
@@ -34,7 +28,13 @@ try:
 except ImportError:
     from src.resolve_calls import resolve_call_links
 
-def main():
+from resolve_imports import resolve_import_links
+from modgraph import rebuild_module_edges
+from scc import rebuild_components
+from reachability import rebuild_reachability
+from cross_project import relink_cross_project
+
+def main(rebuild=False, include_tests=True, shards=0, workers=()):
     target_dir = os.getenv("TARGET_CODE_DIR", "/app/target_code")
     print(f"\n🌊 N3MO: Starting Analysis on {target_dir}...")
 
@@ -43,9 +43,12 @@ def main():
         return
 
     # Setup Project
-    project_name = os.path.basename(target_dir)
+    # Inside the container every repo is mounted at the same path, so the
+    # wrapper passes the host folder along to keep projects apart.
+    repo_url = os.getenv("N3MO_REPO_URL", target_dir)
+    project_name = os.path.basename(repo_url.rstrip("/")) or repo_url
     try:
-        project_id = ensure_project(project_name, repo_url=target_dir)
+        project_id = ensure_project(project_name, repo_url=repo_url)
         print(f"✅ Project ID: {project_id}")
     except Exception as e:
         print(f"❌ Database Connection Failed: {e}")
@@ -53,8 +56,13 @@ def main():
 
     # Crawl
     print("🕷️  Crawling files...")
-    files = crawl_directory(target_dir)
-    print(f"   Found {len(files)} Python files.")
+    files = crawl_directory(target_dir, include_tests)
+    print(f"   Found {len(files)} source files.")
+
+    if shards or workers:
+        return rebuild_index(project_id, target_dir, files, shards or len(workers), workers)
+    if rebuild:
+        return rebuild_index(project_id, target_dir, files)
 
     # Extract & Index
     print("🧠 Extracting symbols...")
@@ -64,7 +72,7 @@ def main():
     for file_path in files:
         rel_path = os.path.relpath(file_path, target_dir)
         try:
-            result = extract_symbols(file_path)
+            result = extract_file(file_path)
             
             # Unpack safely
             if isinstance(result, tuple) and len(result) == 3:
@@ -88,8 +96,16 @@ def main():
             pass
 
     # --- RUN THE LINKER (Using your existing resolve_calls.py) ---
+    # Imports first: the call linker scopes names through them
+    rel_paths = [os.path.relpath(f, target_dir) for f in files]
+    resolve_import_links(project_id, rel_paths)
     print("🔗 resolving calls...")
     resolve_call_links(project_id)
+    rebuild_module_edges(project_id)
+    rebuild_components(project_id)
+    rebuild_reachability(project_id)
+    mark_indexed(project_id)
+    relink_cross_project(project_id, rel_paths)
 
     print("-" * 30)
     print(f"✅ Indexing Complete!")
@@ -98,5 +114,45 @@ def main():
     print(f"📞 Calls:     {call_count}")
     print("-" * 30)
 
+def rebuild_index(project_id, target_dir, files, shards=0, workers=()):
+    """
+    Full rebuild: extract everything, bulk-load into staging tables and
+    swap the project's rows in one transaction (see bulk_loader.py).
+    With `shards`, workers extract and load the shards (shard_index.py).
+    """
+    from bulk_loader import ExtractionBatch, drop_stale_stage_tables, rebuild_project
+
+    rel_paths = [os.path.relpath(f, target_dir) for f in files]
+    drop_stale_stage_tables()
+    try:
+        if shards:
+            from shard_index import rebuild_sharded
+            authkey = os.getenv("N3MO_WORKER_KEY", "").encode() or None
+            if workers and not authkey:
+                print("❌ Set N3MO_WORKER_KEY (the same on the workers) to use remote workers.")
+                return
+            symbol_count, import_count, call_count, linked = rebuild_sharded(
+                project_id, target_dir, rel_paths, shards, workers, authkey)
+        else:
+            print("🧠 Extracting symbols (full rebuild)...")
+            rows = ExtractionBatch(project_id)
+            for file_path, rel_path in zip(files, rel_paths):
+                rows.extract_file(rel_path, file_path)
+
+            print("🚚 Bulk loading into staging and swapping...")
+            symbol_count, import_count, call_count, linked = rebuild_project(rows)
+    except Exception as e:
+        print(f"❌ Rebuild failed, live index left untouched: {e}")
+        return
+    relink_cross_project(project_id, rel_paths)
+
+    print("-" * 30)
+    print(f"✅ Rebuild Complete!")
+    print(f"📊 Processed: {len(files)} files")
+    print(f"📚 Symbols:   {symbol_count}")
+    print(f"📦 Imports:   {import_count}")
+    print(f"📞 Calls:     {call_count} ({linked} linked)")
+    print("-" * 30)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(rebuild="--rebuild" in sys.argv, include_tests="--no-tests" not in sys.argv)
\ No newline at end of file
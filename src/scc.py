@@ -0,0 +1,130 @@
+# ==========================================
+# ♻️ STRONGLY CONNECTED COMPONENTS (Condensed Call Graph)
+# ==========================================
+# Recursive and mutually recursive functions form cycles. Impact and deps
+# walks would otherwise go around them again at every depth. Collapsing
+# each strongly connected component into one node turns the resolved call
+# graph into a DAG:
+#
+#   symbol_components  symbol -> component
+#   component_edges    caller component -> callee component
+#
+# Component ids are positions in a topological order with callers first,
+# so every DAG edge goes from a lower id to a higher one: when a < b,
+# b can never reach a.
+
+EDGES_QUERY = """
+SELECT source_symbol_id, resolved_symbol_id
+FROM calls
+WHERE project_id = %s AND resolved_symbol_id IS NOT NULL;
+"""
+
+
+def strongly_connected_components(nodes, successors):
+    """
+    Iterative Tarjan (no recursion limit on deep call chains).
+    Returns a list of components (lists of nodes). A component is listed
+    after every component it has an edge to, i.e. in reverse topological
+    order.
+    """
+    index, low = {}, {}
+    stack, on_stack = [], set()
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def condense(nodes, successors):
+    """
+    Returns (component_of, members, dag_edges), where component ids follow
+    topological order (callers first) and dag_edges is a set of
+    (source_component, target_component) pairs with source < target.
+    """
+    members = strongly_connected_components(nodes, successors)
+    members.reverse()
+    component_of = {node: cid for cid, group in enumerate(members) for node in group}
+    dag_edges = set()
+    for node, children in successors.items():
+        source = component_of[node]
+        for child in children:
+            target = component_of[child]
+            if source != target:
+                dag_edges.add((source, target))
+    return component_of, members, dag_edges
+
+
+def refresh_components(cur, project_id):
+    """
+    Recomputes the project's condensation from the live calls table.
+    Caller commits. Returns (components, cyclic components).
+    """
+    from database import execute_values
+
+    cur.execute("SELECT id FROM symbols WHERE project_id = %s", (project_id,))
+    nodes = [str(row[0]) for row in cur]
+    successors = {}
+    cur.execute(EDGES_QUERY, (project_id,))
+    for source, target in cur:
+        successors.setdefault(str(source), []).append(str(target))
+
+    component_of, members, dag_edges = condense(nodes, successors)
+
+    cur.execute("DELETE FROM component_edges WHERE project_id = %s", (project_id,))
+    cur.execute("DELETE FROM symbol_components WHERE project_id = %s", (project_id,))
+    execute_values(cur, "INSERT INTO symbol_components (project_id, symbol_id, component_id) VALUES %s",
+                   [(project_id, node, cid) for node, cid in component_of.items()], page_size=5000)
+    execute_values(cur, "INSERT INTO component_edges (project_id, source_component, target_component) VALUES %s",
+                   [(project_id, s, t) for s, t in dag_edges], page_size=5000)
+    return len(members), sum(1 for group in members if len(group) > 1)
+
+
+def rebuild_components(project_id):
+    from database import get_connection
+
+    print("♻️  Condensing call cycles...")
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            total, cyclic = refresh_components(cur, project_id)
+            conn.commit()
+            print(f"♻️  {total} components ({cyclic} recursive groups).")
+    except Exception as e:
+        print(f"❌ Cycle condensation failed: {e}")
+    finally:
+        if conn: conn.close()
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from scc import condense, strongly_connected_components
+
+
+def reachable(successors, start):
+    seen, stack = {start}, [start]
+    while stack:
+        for child in successors.get(stack.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def random_graph(seed, nodes=40, edges=70):
+    rng = random.Random(seed)
+    successors = {n: [] for n in range(nodes)}
+    for _ in range(edges):
+        successors[rng.randrange(nodes)].append(rng.randrange(nodes))
+    return list(range(nodes)), successors
+
+
+def test_condense_cycles_and_self_loops():
+    # a -> b -> c -> a (cycle), c -> d, d -> d (self-loop), e alone
+    successors = {"a": ["b"], "b": ["c"], "c": ["a", "d"], "d": ["d"], "e": []}
+    component_of, members, dag_edges = condense(list("abcde"), successors)
+    assert component_of["a"] == component_of["b"] == component_of["c"]
+    assert sorted(map(sorted, members)) == [["a", "b", "c"], ["d"], ["e"]]
+    assert dag_edges == {(component_of["a"], component_of["d"])}
+
+
+def test_deep_chain_does_not_recurse():
+    n = 20000
+    successors = {i: [i + 1] for i in range(n)}
+    successors[n] = [0]
+    assert len(strongly_connected_components(list(range(n + 1)), successors)) == 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_condense_matches_mutual_reachability(seed):
+    nodes, successors = random_graph(seed)
+    component_of, members, dag_edges = condense(nodes, successors)
+    reach = {n: reachable(successors, n) for n in nodes}
+
+    assert sorted(n for group in members for n in group) == nodes
+    for a in nodes:
+        for b in nodes:
+            same = a in reach[b] and b in reach[a]
+            assert (component_of[a] == component_of[b]) == same
+    # Topological numbering: callers first
+    assert all(source < target for source, target in dag_edges)
@@ -0,0 +1,171 @@
+import pytest
+
+from database import get_connection
+from entry_points import fetch_entry_points
+from impact import find_project_id
+from run_indexer import main as run_indexer
+from test_selection import collapse, parse_diff, select_tests
+
+SAMPLE = {
+    "app/api.py": """from fastapi import FastAPI
+
+app = FastAPI()
+
+
+def leaf():
+    return 1
+
+
+def helper():
+    return leaf()
+
+
+def rec_a(n):
+    return helper() if n else rec_a(n - 1)
+
+
+@app.get("/items")
+def handler():
+    return rec_a(1)
+""",
+    "app/settings.py": """def config():
+    return {"debug": True}
+""",
+    "tests/conftest.py": """import pytest
+
+from app.settings import config
+
+
+@pytest.fixture
+def settings():
+    return config()
+""",
+    "tests/test_api.py": """from app.api import handler
+
+
+def test_handler():
+    assert handler()
+""",
+}
+
+
+def line_of(path, text):
+    return SAMPLE[path].splitlines().index(text) + 1
+
+
+@pytest.fixture(scope="module")
+def indexed(tmp_path_factory):
+    """(cursor, project_id) over SAMPLE indexed into a throwaway SQLite file."""
+    work_dir = tmp_path_factory.mktemp("selection")
+    for path, code in SAMPLE.items():
+        full_path = work_dir / "repo" / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(code)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("N3MO_DB", "sqlite")
+        mp.setenv("N3MO_SQLITE_PATH", str(work_dir / "n3mo.db"))
+        mp.setenv("TARGET_CODE_DIR", str(work_dir / "repo"))
+        mp.delenv("N3MO_REPO_URL", raising=False)
+        run_indexer(rebuild=True)
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                yield cur, find_project_id(cur)
+        finally:
+            conn.close()
+
+
+def changed(path, text):
+    line = line_of(path, text)
+    return {path: [(line, line)]}
+
+
+# --- select_tests against a real index ---
+
+@pytest.mark.parametrize("text", ["    return 1", "    return rec_a(1)"], ids=["leaf", "handler"])
+def test_selects_tests_through_route_handler(indexed, text):
+    cur, project_id = indexed
+    node_ids, seeds, _ = select_tests(cur, project_id, changed("app/api.py", text))
+    assert node_ids == ["tests/test_api.py::test_handler"]
+    assert seeds == 1
+
+
+def test_fixture_change_selects_its_conftest_directory(indexed):
+    cur, project_id = indexed
+    node_ids, _, _ = select_tests(cur, project_id, changed("app/settings.py", '    return {"debug": True}'))
+    assert node_ids == ["tests/"]
+
+
+def test_module_level_change_seeds_the_whole_file(indexed):
+    cur, project_id = indexed
+    node_ids, seeds, _ = select_tests(cur, project_id, changed("app/api.py", "app = FastAPI()"))
+    assert node_ids == ["tests/test_api.py::test_handler"]
+    assert seeds == 4
+
+
+def test_deleted_and_unindexed_files_become_notes(indexed):
+    cur, project_id = indexed
+    node_ids, _, notes = select_tests(cur, project_id, {"app/gone.py": None, "app/new.py": [(1, 3)]})
+    assert node_ids == []
+    assert notes == ["app/gone.py: deleted; its callers are selected through their own changes",
+                     "app/new.py: not in the index (re-run n3mo index)"]
+
+
+def test_entry_points_still_stop_at_the_route(indexed):
+    cur, project_id = indexed
+    _, rows = fetch_entry_points(cur, project_id, ["leaf"])
+    assert [(row[1], row[4]) for row in rows] == [("handler", "route")]
+
+
+# --- parse_diff / collapse ---
+
+DIFF = """diff --git a/app/api.py b/app/api.py
+index 1111111..2222222 100644
+--- a/app/api.py
++++ b/app/api.py
+@@ -7 +7 @@ def leaf():
+-    return 1
++    return 2
+@@ -12,0 +13,2 @@ def helper():
++    # --- not a header
++++ not a header either
+@@ -20,3 +21,0 @@ def handler():
+-    x = 1
+-    y = 2
+-    z = 3
+diff --git a/app/old.py b/app/old.py
+deleted file mode 100644
+--- a/app/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-def gone():
+-    pass
+diff --git a/app/new.py b/app/new.py
+new file mode 100644
+--- /dev/null
++++ b/app/new.py
+@@ -0,0 +1,3 @@
++def fresh():
++    pass
++
+"""
+
+
+def test_parse_diff():
+    assert parse_diff(DIFF) == {
+        "app/api.py": [(7, 7), (13, 14), (21, 21)],
+        "app/old.py": None,
+        "app/new.py": [(1, 3)],
+    }
+
+
+def test_parse_diff_deletion_at_top_of_file():
+    diff = "diff --git a/m.py b/m.py\n--- a/m.py\n+++ b/m.py\n@@ -1 +0,0 @@\n-import os\n"
+    assert parse_diff(diff) == {"m.py": [(1, 1)]}
+
+
+def test_collapse_drops_covered_node_ids():
+    assert collapse({"tests/", "tests/test_a.py::test_x", "lib/test_b.py", "lib/test_b.py::TestC::test_d",
+                     "lib/test_bb.py::test_e"}) == ["lib/test_b.py", "lib/test_bb.py::test_e", "tests/"]
+    assert collapse({".", "tests/test_a.py::test_x"}) == ["."]
@@ -0,0 +1,202 @@
+import heapq
+import os
+import queue
+import threading
+from collections import defaultdict
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+
+from bulk_loader import (ExtractionBatch, drop_shard_tables, load_shard, new_run_id, rebuild_from_shards,
+                         shard_stage_names)
+
+# ==========================================
+# 🧩 SHARDED REBUILD (coordinator + workers)
+# ==========================================
+# n3mo index --shards N [--workers host:port,...]
+#
+# 1. The coordinator partitions the crawl into shards of similar byte
+#    size, keeping each directory in one shard where it fits.
+# 2. Workers pull shards off a queue, extract them and COPY the rows into
+#    that shard's own staging tables (bulk_loader.load_shard). A symbol's
+#    de-duplication key starts with its file, so shards never overlap.
+# 3. The coordinator merges the shard tables, runs the usual global
+#    linking pass and swaps the project atomically
+#    (bulk_loader.rebuild_from_shards).
+#
+# Workers are local processes unless --workers names remote ones, started
+# with `n3mo worker --listen host:port` against the same database and a
+# checkout of the same tree (their TARGET_CODE_DIR). Both sides share
+# N3MO_WORKER_KEY. Jobs are pickled over multiprocessing.connection, so
+# only listen where nothing but the coordinator can connect.
+
+DEFAULT_PORT = 7431
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return (host, int(port)) if host else (text, DEFAULT_PORT)
+
+
+def partition(target_dir, rel_paths, shards):
+    """Splits files into at most `shards` lists of similar total size, directory by directory."""
+    by_dir = defaultdict(list)
+    for rel_path in sorted(rel_paths):
+        try:
+            size = os.path.getsize(os.path.join(target_dir, rel_path))
+        except OSError:
+            size = 0
+        by_dir[os.path.dirname(rel_path)].append((rel_path, size))
+
+    total = sum(size for entries in by_dir.values() for _, size in entries)
+    limit = max(1, -(-total // shards))
+    groups = []
+    for entries in by_dir.values():
+        group, group_size = [], 0
+        for rel_path, size in entries:
+            # A directory bigger than a shard is cut into shard-sized pieces
+            if group and group_size + size > limit:
+                groups.append((group_size, group))
+                group, group_size = [], 0
+            group.append(rel_path)
+            group_size += size
+        groups.append((group_size, group))
+
+    # Largest group first onto the lightest shard
+    heap = [(0, i, []) for i in range(shards)]
+    for size, group in sorted(groups, key=lambda g: -g[0]):
+        load, i, files = heapq.heappop(heap)
+        files.extend(group)
+        heapq.heappush(heap, (load + size, i, files))
+    return [files for _, _, files in sorted(heap, key=lambda s: s[1]) if files]
+
+
+# --- Worker ---
+
+def extract_shard(project_id, target_dir, rel_paths):
+    rows = ExtractionBatch(project_id)
+    for rel_path in rel_paths:
+        rows.extract_file(rel_path, os.path.join(target_dir, rel_path))
+    return rows
+
+
+def serve_connection(conn, target_dir=None):
+    """Worker loop on one coordinator connection: a shard in, its row counts out, until None."""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            rows = extract_shard(job["project_id"], target_dir or job["target_dir"], job["files"])
+            conn.send({"shard": job["shard"], "counts": load_shard(rows, job["stage"])})
+        except Exception as e:
+            conn.send({"shard": job["shard"], "error": f"{type(e).__name__}: {e}"})
+
+
+def _local_worker(conn):
+    try:
+        serve_connection(conn)
+    finally:
+        conn.close()
+
+
+def serve_worker(address, authkey):
+    """`n3mo worker`: serves coordinators one at a time until Ctrl+C."""
+    target_dir = os.getenv("TARGET_CODE_DIR")
+    with Listener(address, authkey=authkey) as listener:
+        print(f"🧩 Worker listening on {address[0]}:{address[1]} ({target_dir or 'coordinator paths'})")
+        while True:
+            with listener.accept() as conn:
+                print(f"   Coordinator connected from {listener.last_accepted[0]}")
+                serve_connection(conn, target_dir)
+
+
+# --- Coordinator ---
+
+def _open_workers(addresses, authkey, local_count):
+    """Connections to the remote workers, or to `local_count` freshly spawned processes."""
+    if addresses:
+        connections = []
+        for address in addresses:
+            try:
+                connections.append(Client(parse_address(address), authkey=authkey))
+            except OSError as e:
+                print(f"⚠️  Worker {address} unreachable, continuing without it: {e}")
+        if not connections:
+            raise RuntimeError("no worker reachable")
+        return connections, []
+    # spawn, not fork: children must not inherit the coordinator's database connections
+    ctx = get_context("spawn")
+    connections, processes = [], []
+    for _ in range(local_count):
+        parent, child = ctx.Pipe()
+        process = ctx.Process(target=_local_worker, args=(child,), daemon=True)
+        process.start()
+        child.close()
+        connections.append(parent)
+        processes.append(process)
+    return connections, processes
+
+
+def rebuild_sharded(project_id, target_dir, rel_paths, shards, workers=(), authkey=None):
+    """
+    Full rebuild through workers. Returns (symbols, imports, calls,
+    linked_calls) like bulk_loader.rebuild_project; raises if any shard
+    fails, leaving the live index untouched.
+    """
+    parts = partition(target_dir, rel_paths, shards)
+    run = new_run_id()
+    jobs = queue.Queue()
+    stages = []
+    for i, files in enumerate(parts):
+        stages.append(shard_stage_names(run, i))
+        jobs.put({"shard": i, "project_id": project_id, "target_dir": target_dir, "files": files, "stage": stages[i]})
+
+    connections, processes = _open_workers(workers, authkey, min(len(parts), os.cpu_count() or 1))
+    print(f"🧩 {len(parts)} shards on {len(connections)} {'remote' if workers else 'local'} workers")
+    counts, errors = {}, []
+
+    def drive(conn):
+        while not errors:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.send(job)
+                reply = conn.recv()
+            except (EOFError, OSError):
+                # Worker gone: hand its shard to the others
+                jobs.put(job)
+                return
+            if "error" in reply:
+                errors.append(f"shard {reply['shard']}: {reply['error']}")
+                return
+            counts[reply["shard"]] = reply["counts"]
+            print(f"   ✔ shard {reply['shard']}: {len(job['files'])} files, {reply['counts'][0]} symbols")
+
+    threads = [threading.Thread(target=drive, args=(conn,)) for conn in connections]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for conn in connections:
+            try:
+                conn.send(None)
+                conn.close()
+            except OSError:
+                pass
+        for process in processes:
+            process.join()
+
+    if errors or len(counts) < len(parts):
+        drop_shard_tables(stages)
+        raise RuntimeError("; ".join(errors) or "every worker disconnected before the shards were done")
+
+    print("🔗 Merging shards and linking...")
+    linked = rebuild_from_shards(project_id, rel_paths, stages)
+    return tuple(sum(c[k] for c in counts.values()) for k in range(3)) + (linked,)
@@ -0,0 +1,42 @@
+from shard_index import parse_address, partition
+
+
+def write_tree(root, sizes):
+    for rel_path, size in sizes.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+
+
+def test_every_file_lands_in_exactly_one_shard(tmp_path):
+    sizes = {f"pkg{d}/mod{i}.py": 100 * (i + 1) for d in range(5) for i in range(7)}
+    write_tree(tmp_path, sizes)
+    shards = partition(str(tmp_path), list(sizes), 4)
+    assert len(shards) == 4
+    assert sorted(f for shard in shards for f in shard) == sorted(sizes)
+
+
+def test_small_directories_stay_together(tmp_path):
+    sizes = {"a/x.py": 10, "a/y.py": 10, "b/x.py": 10, "b/y.py": 10, "c/x.py": 10, "c/y.py": 10}
+    write_tree(tmp_path, sizes)
+    for shard in partition(str(tmp_path), list(sizes), 3):
+        assert len({f.split("/")[0] for f in shard}) == 1
+
+
+def test_large_directory_is_split_and_balanced(tmp_path):
+    sizes = {f"big/mod{i}.py": 1000 for i in range(8)}
+    write_tree(tmp_path, sizes)
+    shards = partition(str(tmp_path), list(sizes), 4)
+    assert sorted(len(shard) for shard in shards) == [2, 2, 2, 2]
+
+
+def test_more_shards_than_files_and_missing_files(tmp_path):
+    write_tree(tmp_path, {"a.py": 50})
+    shards = partition(str(tmp_path), ["a.py", "gone.py"], 8)
+    assert all(shards)
+    assert sorted(f for shard in shards for f in shard) == ["a.py", "gone.py"]
+
+
+def test_parse_address():
+    assert parse_address("10.0.0.5:9000") == ("10.0.0.5", 9000)
+    assert parse_address("worker-1") == ("worker-1", 7431)
@@ -0,0 +1,93 @@
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+
+# ==========================================
+# 📄 SOURCE SNIPPET CACHE
+# ==========================================
+# Call-site previews need a few lines around an arbitrary line number.
+# Each file is mmap'ed once and gets a line-offset index (built lazily on
+# first access), so any line range afterwards is a single slice instead of
+# a re-open and a linear scan. Hot files stay in a small LRU; a changed
+# mtime/size invalidates the entry.
+
+DEFAULT_CAPACITY = 64
+NEWLINE = re.compile(rb"\n")
+
+
+class LineIndex:
+    def __init__(self, path):
+        self.path = path
+        stat = os.stat(path)
+        self.version = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        self._data = b""
+        if self.size:
+            with open(path, "rb") as f:
+                # The mapping stays valid after the file object is closed
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # offsets[i] is the byte offset where line i + 1 starts
+        self.offsets = array("Q", [0])
+        self.offsets.extend(m.end() for m in NEWLINE.finditer(self._data))
+        if len(self.offsets) > 1 and self.offsets[-1] == self.size:
+            self.offsets.pop()  # trailing newline does not start a new line
+        if not self.size:
+            self.offsets.pop()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def lines(self, start, end):
+        """[(line_number, text), ...] for start..end inclusive, clamped to the file."""
+        start, end = max(1, start), min(len(self.offsets), end)
+        if start > end:
+            return []
+        stop = self.offsets[end] if end < len(self.offsets) else self.size
+        chunk = self._data[self.offsets[start - 1]:stop].decode("utf-8", errors="replace")
+        return list(enumerate((line.rstrip() for line in chunk.split("\n")), start))[:end - start + 1]
+
+
+class SourceCache:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._files = OrderedDict()  # path -> LineIndex
+        self._lock = threading.Lock()
+
+    def index(self, path):
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached.version == version:
+                self._files.move_to_end(path)
+                return cached
+
+        # Build outside the lock; a racing duplicate build is harmless
+        line_index = LineIndex(path)
+        with self._lock:
+            self._files[path] = line_index
+            self._files.move_to_end(path)
+            while len(self._files) > self.capacity:
+                # Evicted maps are closed by GC once no reader holds them
+                self._files.popitem(last=False)
+        return line_index
+
+    def context(self, path, line_number, context=2):
+        try:
+            return self.index(path).lines(line_number - context, line_number + context)
+        except (OSError, ValueError):
+            return []
+
+
+_default_cache = SourceCache()
+
+
+def get_code_context(file_path, line_number, context=2):
+    """
+    Returns [(line_number, text), ...] around line_number, or [] when the
+    file is missing or unreadable.
+    """
+    return _default_cache.context(file_path, line_number, context)
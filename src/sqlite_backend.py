@@ -0,0 +1,322 @@
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+# ==========================================
+# 🪶 EMBEDDED BACKEND (SQLite, no server)
+# ==========================================
+# N3MO_DB=sqlite swaps PostgreSQL for one SQLite file (N3MO_SQLITE_PATH,
+# default ~/.n3mo/n3mo.db) behind the same psycopg2-style interface:
+# connect() / cursor() / execute / fetch* / commit, a pool for the
+# daemon, and execute_values (database.execute_values).
+#
+# The query modules stay written in PostgreSQL; each statement is
+# translated once (cached) into SQLite:
+#
+#   %(name)s, %s, %%          -> :name, ?, %
+#   x = ANY(%(ids)s::uuid[])  -> x IN (SELECT value FROM json_each(:ids))
+#   a && b, x ~ 're'          -> array_overlap(a, b), x REGEXP 're'
+#   name %% q, ILIKE          -> similarity(name, q) >= 0.3, lower() LIKE lower()
+#   GREATEST, NOW(), casts    -> MAX, CURRENT_TIMESTAMP, (dropped)
+#
+# Arrays are stored as JSON text (TEXT_ARRAY / INT_ARRAY columns in
+# db/schema_sqlite.sql) and come back as lists. Recursive CTEs and
+# UPDATE ... FROM run natively (SQLite >= 3.33).
+
+DEFAULT_PATH = os.path.join("~", ".n3mo", "n3mo.db")
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "schema_sqlite.sql")
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",          # readers never block the indexer
+    "PRAGMA synchronous = NORMAL",        # durable at checkpoints; safe with WAL
+    "PRAGMA foreign_keys = ON",           # ON DELETE CASCADE, as in Postgres
+    "PRAGMA temp_store = MEMORY",         # staging tables and sorts stay in RAM
+    "PRAGMA cache_size = -65536",         # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",       # 256 MB memory-mapped reads
+    "PRAGMA case_sensitive_like = ON",    # LIKE is case sensitive in Postgres
+)
+
+BUSY_TIMEOUT = 30    # seconds a writer waits for another one
+
+TRIGRAM_THRESHOLD = 0.3     # pg_trgm's default for `name % q`
+
+_PARAM = re.compile(r"%\((\w+)\)s|%s|%%")
+_VALUES_FROM = re.compile(r"\(VALUES %s\)\s+AS\s+(\w+)\s*\(([^)]*)\)")
+_CREATE_LIKE = re.compile(r"CREATE (UNLOGGED )?TABLE (\S+) \(LIKE (\S+) INCLUDING DEFAULTS\)")
+_REFERENCES = re.compile(r"\s+REFERENCES \w+\(\w+\)( ON DELETE CASCADE)?")
+
+# Applied in order; casts go first so the later patterns see bare operands
+REWRITES = [
+    (re.compile(r"::(?:uuid|text|int|integer|bigint)(?:\[\])?"), ""),
+    (re.compile(r"=\s*ANY\((%\(\w+\)s|%s)\)"), r"IN (SELECT value FROM json_each(\1))"),
+    (re.compile(r"([\w.]+|%\(\w+\)s) && ([\w.]+|%\(\w+\)s)"), r"array_overlap(\1, \2)"),
+    (re.compile(r"(\S+) ~ ('[^']*')"), r"\1 REGEXP \2"),
+    (re.compile(r"\bsubstring\((.+?) from ('[^']*')\)"), r"regexp_substr(\1, \2)"),
+    (re.compile(r"([\w.]+) %% (%\(\w+\)s)"), r"similarity(\1, \2) >= " + str(TRIGRAM_THRESHOLD)),
+    (re.compile(r"(\S+) ILIKE (%\(\w+\)s)"), r"lower(\1) LIKE lower(\2)"),
+    (re.compile(r"\bLIKE (lower\(%\(\w+\)s\)|%\(\w+\)s)"), r"LIKE \1 ESCAPE '\\'"),
+    (re.compile(r"\barray_agg\(([^()]+?)(?: ORDER BY [^()]+)?\)(?!\s+AS)"), r'array_agg(\1) AS "array_agg [TEXT_ARRAY]"'),
+    (re.compile(r"\bGREATEST\("), "MAX("),
+    (re.compile(r"\bNOW\(\)"), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\s+FOR UPDATE\b"), ""),
+    (re.compile(r"\bUPDATE (\S+) (?!SET\b)(\w+)\s+SET\b"), r"UPDATE \1 AS \2 SET"),
+    (re.compile(r"\bLIMIT (%\(\w+\)s)"), r"LIMIT COALESCE(\1, -1)"),
+    # UNIQUE NULLS NOT DISTINCT targets -> the COALESCE indexes in schema_sqlite.sql
+    (re.compile(r"ON CONFLICT \(project_id, file_path, parent_id, name\)"),
+     "ON CONFLICT (project_id, file_path, COALESCE(parent_id, ''), name)"),
+    (re.compile(r"ON CONFLICT \(project_id, file_path, module, name\)"),
+     "ON CONFLICT (project_id, file_path, module, COALESCE(name, ''))"),
+]
+
+_translated = {}
+_anchors = {}      # path -> connection held open for the process lifetime
+_schema_lock = threading.Lock()
+
+sqlite3.register_adapter(list, json.dumps)
+sqlite3.register_adapter(tuple, lambda value: json.dumps(list(value)))
+sqlite3.register_adapter(uuid.UUID, str)
+sqlite3.register_converter("TEXT_ARRAY", json.loads)
+sqlite3.register_converter("INT_ARRAY", json.loads)
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.datetime.fromisoformat(value.decode()))
+
+
+def database_path():
+    return os.path.expanduser(os.getenv("N3MO_SQLITE_PATH", DEFAULT_PATH))
+
+
+def render(query):
+    """str for a query given as text or as psycopg2.sql composition."""
+    if isinstance(query, str):
+        return query
+    from psycopg2 import sql
+
+    if isinstance(query, sql.Composed):
+        return "".join(render(part) for part in query.seq)
+    if isinstance(query, sql.SQL):
+        return query.string
+    if isinstance(query, sql.Identifier):
+        return ".".join('"' + name.replace('"', '""') + '"' for name in query.strings)
+    if isinstance(query, sql.Placeholder):
+        return f"%({query.name})s" if query.name else "%s"
+    raise TypeError(f"Cannot render {type(query).__name__} for SQLite")
+
+
+def translate(text, has_params=True):
+    """PostgreSQL statement -> SQLite statement (cached)."""
+    key = (text, has_params)
+    if key not in _translated:
+        out = text
+        for pattern, replacement in REWRITES:
+            out = pattern.sub(replacement, out)
+        if has_params:
+            # Like psycopg2, placeholders and %% only mean something when params are passed
+            out = _PARAM.sub(lambda m: ":" + m.group(1) if m.group(1) else ("?" if m.group(0) == "%s" else "%"), out)
+        _translated[key] = out
+    return _translated[key]
+
+
+# --- SQL functions Postgres has built in ---
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, value) is not None
+
+
+def _regexp_substr(value, pattern):
+    match = re.search(pattern, value) if value is not None else None
+    return match.group(0) if match else None
+
+
+def _regexp_replace(value, pattern, replacement):
+    return re.sub(pattern, replacement, value, count=1) if value is not None else None
+
+
+def _split_part(value, delimiter, index):
+    parts = value.split(delimiter) if value is not None else []
+    return parts[index - 1] if 0 < index <= len(parts) else ""
+
+
+def _array_overlap(a, b):
+    if a is None or b is None:
+        return None
+    return not set(json.loads(a)).isdisjoint(json.loads(b))
+
+
+def _trigrams(text):
+    grams = set()
+    for word in re.findall(r"[^\W_]+", text.lower()):
+        padded = "  " + word + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _similarity(a, b):
+    if a is None or b is None:
+        return 0.0
+    x, y = _trigrams(a), _trigrams(b)
+    return len(x & y) / len(x | y) if x | y else 0.0
+
+
+class _ArrayAgg:
+    """array_agg as a JSON array; values come out sorted (ORDER BY is dropped)."""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        self.values.append(value)
+
+    def finalize(self):
+        return json.dumps(sorted(self.values, key=lambda v: (v is None, v)))
+
+
+class Cursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self._cur = conn._db.cursor()
+        self._returned = None         # RETURNING rows, read eagerly (see execute)
+        self.itersize = 2000          # accepted for named (server-side) cursors; rows stream anyway
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return self._returned if self._returned is not None else iter(self._cur)
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def execute(self, query, params=None):
+        text = render(query)
+        like = _CREATE_LIKE.search(text)
+        if like:
+            return self._create_like(like.group(2), like.group(3), temp=bool(like.group(1)))
+        statement = translate(text, has_params=params is not None)
+        self._cur.execute(statement, () if params is None else params)
+        # An unfinished RETURNING statement blocks commit(); Postgres callers commit without reading it
+        self._returned = iter(self._cur.fetchall()) if "RETURNING" in statement else None
+
+    def executemany(self, query, rows):
+        self._returned = None
+        self._cur.executemany(translate(render(query)), rows)
+
+    def execute_values(self, query, rows, template=None, page_size=100):
+        """psycopg2.extras.execute_values: `VALUES %s` expands to every row."""
+        rows = list(rows)
+        if not rows:
+            return
+        text = render(query)
+        values_from = _VALUES_FROM.search(text)
+        if values_from is None:
+            placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+            self.executemany(text.replace("VALUES %s", "VALUES " + placeholders, 1), rows)
+            return
+        # UPDATE ... FROM (VALUES %s) AS v (cols): join against a temp table instead
+        alias, columns = values_from.groups()
+        self._cur.execute("DROP TABLE IF EXISTS temp.n3mo_values")
+        self._cur.execute(f"CREATE TEMP TABLE n3mo_values ({columns})")
+        self._cur.executemany(f"INSERT INTO temp.n3mo_values VALUES ({', '.join(['?'] * len(rows[0]))})", rows)
+        self.execute(text[:values_from.start()] + f"temp.n3mo_values AS {alias}" + text[values_from.end():], ())
+        count = self._cur.rowcount
+        self._cur.execute("DROP TABLE temp.n3mo_values")
+        return count
+
+    def _create_like(self, table, template, temp=True):
+        # CREATE TABLE (LIKE ...) keeps column types and drops foreign keys into the
+        # live tables. UNLOGGED staging lives in temp (no journal); plain copies
+        # (shards loaded by other processes) go in the main file
+        self._cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (template.strip('"'),))
+        ddl = self._cur.fetchone()[0]
+        columns = _REFERENCES.sub("", ddl[ddl.index("("):])
+        self._cur.execute(f"CREATE {'TEMP ' if temp else ''}TABLE {table} {columns}")
+
+    def fetchone(self):
+        if self._returned is not None:
+            return next(self._returned, None)
+        return self._cur.fetchone()
+
+    def fetchmany(self, size=None):
+        if self._returned is not None:
+            return [row for _, row in zip(range(size or self.itersize), self._returned)]
+        return self._cur.fetchmany(size or self.itersize)
+
+    def fetchall(self):
+        if self._returned is not None:
+            return list(self._returned)
+        return self._cur.fetchall()
+
+    def close(self):
+        self._cur.close()
+
+
+class Connection:
+    dialect = "sqlite"
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+        for pragma in PRAGMAS:
+            self._db.execute(pragma)
+        self._db.create_function("regexp", 2, _regexp, deterministic=True)
+        self._db.create_function("regexp_substr", 2, _regexp_substr, deterministic=True)
+        self._db.create_function("regexp_replace", 3, _regexp_replace, deterministic=True)
+        self._db.create_function("split_part", 3, _split_part, deterministic=True)
+        self._db.create_function("array_overlap", 2, _array_overlap, deterministic=True)
+        self._db.create_function("similarity", 2, _similarity, deterministic=True)
+        self._db.create_aggregate("array_agg", 1, _ArrayAgg)
+
+    def cursor(self, name=None):
+        # `name` asks Postgres for a server-side cursor; SQLite cursors already step lazily
+        return Cursor(self)
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def close(self):
+        self._db.close()
+
+
+def connect(path=None):
+    """Opens (and on first use creates) the embedded database."""
+    path = path or database_path()
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = Connection(path)
+    with _schema_lock:
+        if path not in _anchors or path == ":memory:":
+            with open(SCHEMA_FILE, encoding="utf-8") as f:
+                conn._db.executescript(f.read())
+            # Closing the last connection checkpoints and deletes the WAL; the
+            # per-row upserts open and close one each, so keep one open for good
+            _anchors[path] = Connection(path)
+    return conn
+
+
+class Pool:
+    """getconn/putconn like psycopg2's pool; SQLite connections are cheap to open."""
+
+    def __init__(self, path=None):
+        self.path = path or database_path()
+
+    def getconn(self):
+        return connect(self.path)
+
+    def putconn(self, conn):
+        conn.close()
+
+    def closeall(self):
+        pass
@@ -1,9 +1,5 @@
-import tree_sitter_python as tspython
-from tree_sitter import Language, Parser
-import uuid
-
-PY_LANGUAGE = Language(tspython.language())
-parser = Parser(PY_LANGUAGE)
+from entry_points import classify_entry_point
+from extractors import FileRows, get_parser
 
 # --- ADAPTER (Connects your logic to the runner) ---
 def extract_symbols(file_path):
@@ -24,22 +20,25 @@ def extract_symbols_imports_calls(code_bytes, file_path="unknown"):
     """
     Returns: (symbols, imports, calls)
     """
-    tree = parser.parse(code_bytes)
+    rows = FileRows(file_path)
+    extract_into(code_bytes, file_path, rows)
+    return rows.symbols, rows.imports, rows.calls
+
+def extract_into(code_bytes, file_path, sink):
+    """
+    Same walk, streamed into `sink` (extractors.FileRows or
+    bulk_loader.ExtractionBatch) instead of per-row dicts.
+    """
+    tree = get_parser("python").parse(code_bytes)
     root_node = tree.root_node
-    
-    symbols = []
-    imports = []
-    calls = []
-    
+
     # 1. Definitions AND Calls
-    _visit_definitions_and_calls(root_node, None, symbols, calls, file_path)
-    
+    _visit_definitions_and_calls(root_node, None, sink, file_path)
+
     # 2. Imports
-    _visit_imports(root_node, imports, file_path)
-    
-    return symbols, imports, calls
+    _visit_imports(root_node, sink)
 
-def _visit_definitions_and_calls(node, current_scope_id, symbols, calls, file_path):
+def _visit_definitions_and_calls(node, current_scope_id, sink, file_path):
     node_type = node.type
     new_scope_id = current_scope_id 
     
@@ -53,73 +52,81 @@ def _visit_definitions_and_calls(node, current_scope_id, symbols, calls, file_pa
     if kind:
         name_node = node.child_by_field_name("name")
         name = name_node.text.decode("utf8") if name_node else "anon"
-        symbol_id = str(uuid.uuid4())
-        
-        symbol_data = {
-            "id": symbol_id,
-            "parent_id": current_scope_id,
-            "name": name,
-            "kind": kind,
-            "file_path": file_path,
-            "start_line": node.start_point[0] + 1, # Tree-sitter is 0-indexed
-            "end_line": node.end_point[0] + 1,
-            "signature": f"{kind.lower()} {name}..."
-        }
-        symbols.append(symbol_data)
-        new_scope_id = symbol_id
+        decorators = _decorators(node)
+        new_scope_id = sink.add_symbol(
+            current_scope_id, name, kind,
+            node.start_point[0] + 1, # Tree-sitter is 0-indexed
+            node.end_point[0] + 1,
+            decorators,
+            classify_entry_point(name, kind, decorators, file_path),
+            _bases(node) if kind == "CLASS" else [],
+        )
 
     # --- B. DETECT CALLS ---
     elif node_type == "call": 
         func_node = node.child_by_field_name("function")
         if func_node:
-            call_text = func_node.text.decode("utf8")
-            
             # We only record calls if we are inside a function/class
-            if current_scope_id:
-                calls.append({
-                    "id": str(uuid.uuid4()),
-                    "source_symbol_id": current_scope_id,
-                    "call_name": call_text,
-                    "line_number": node.start_point[0] + 1
-                })
+            if current_scope_id is not None:
+                sink.add_call(current_scope_id, func_node.text.decode("utf8"), node.start_point[0] + 1)
 
     # Recurse
     for child in node.children:
-        _visit_definitions_and_calls(child, new_scope_id, symbols, calls, file_path)
+        _visit_definitions_and_calls(child, new_scope_id, sink, file_path)
+
+def _decorators(node):
+    """
+    Decorator expressions without the '@', e.g. ['app.get("/users")'].
+    Tree-sitter wraps decorated defs in a decorated_definition node.
+    """
+    parent = node.parent
+    if parent is None or parent.type != "decorated_definition":
+        return []
+    return [" ".join(child.text.decode("utf8").lstrip("@").split())[:200]
+            for child in parent.children if child.type == "decorator"]
 
-def _visit_imports(node, imports_list, file_path):
+def _bases(node):
+    """
+    Base class expressions of a class_definition, e.g. ['Base', 'mixins.Json'].
+    Generic[T] keeps 'Generic'; metaclass=... and other keywords are skipped.
+    """
+    arguments = node.child_by_field_name("superclasses")
+    if arguments is None:
+        return []
+    bases = []
+    for child in arguments.named_children:
+        if child.type == "subscript":
+            child = child.child_by_field_name("value")
+        if child is not None and child.type in ("identifier", "attribute"):
+            bases.append(child.text.decode("utf8"))
+    return bases
+
+def _visit_imports(node, sink):
     if node.type == "import_statement":
         for child in node.children:
             if child.type == "dotted_name":
-                _add_import(imports_list, file_path, module=child.text.decode("utf8"))
+                sink.add_import(child.text.decode("utf8"))
             elif child.type == "aliased_import":
                 name_node = child.child_by_field_name("name")
                 alias_node = child.child_by_field_name("alias")
                 mod = name_node.text.decode("utf8") if name_node else ""
                 alias = alias_node.text.decode("utf8") if alias_node else None
-                _add_import(imports_list, file_path, module=mod, alias=alias)
+                sink.add_import(mod, alias=alias)
     
     elif node.type == "import_from_statement":
         module_node = node.child_by_field_name("module_name")
         module_name = module_node.text.decode("utf8") if module_node else "."
         for child in node.children:
              if child.type == "dotted_name" and child != module_node:
-                 _add_import(imports_list, file_path, module=module_name, name=child.text.decode("utf8"))
+                 sink.add_import(module_name, name=child.text.decode("utf8"))
+             elif child.type == "wildcard_import":
+                 sink.add_import(module_name, name="*")
              elif child.type == "aliased_import":
                  name_node = child.child_by_field_name("name")
                  alias_node = child.child_by_field_name("alias")
                  imported = name_node.text.decode("utf8")
                  alias = alias_node.text.decode("utf8")
-                 _add_import(imports_list, file_path, module=module_name, name=imported, alias=alias)
+                 sink.add_import(module_name, name=imported, alias=alias)
     
     for child in node.children:
-        _visit_imports(child, imports_list, file_path)
-
-def _add_import(imports_list, file_path, module, name=None, alias=None):
-    imports_list.append({
-        "id": str(uuid.uuid4()),
-        "file_path": file_path,
-        "module": module,
-        "name": name,
-        "alias": alias
-    })
\ No newline at end of file
+        _visit_imports(child, sink)
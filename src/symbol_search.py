@@ -0,0 +1,80 @@
+from database import get_connection
+from impact import find_project_id
+
+# ==========================================
+# 🔎 SYMBOL SEARCH (Prefix + Fuzzy)
+# ==========================================
+# Scoped to the calling project. Both modes are answered from
+# project-leading indexes declared in db/schema.sql:
+#   - prefix: btree on (project_id, lower(name) text_pattern_ops) (autocomplete)
+#   - fuzzy:  btree_gin + pg_trgm GIN on (project_id, name) (typos, substrings)
+#
+# A dotted pattern ("Base.proc") is matched as owner.member: the member
+# part goes through the name index, the owner must match the parent.
+
+DEFAULT_LIMIT = 20
+
+QUALIFIED_NAME = "COALESCE(p.name || '.', '') || s.name"
+
+PREFIX_QUERY = f"""
+SELECT s.name, {QUALIFIED_NAME} AS qualified_name, s.kind, s.file_path, s.start_line, 1.0 AS score
+FROM symbols s
+LEFT JOIN symbols p ON p.id = s.parent_id
+WHERE s.project_id = %(project_id)s
+  AND lower(s.name) LIKE %(prefix)s
+  AND (%(owner)s IS NULL OR lower(p.name) = %(owner)s)
+ORDER BY length(s.name), s.name, s.file_path
+LIMIT %(limit)s;
+"""
+
+FUZZY_QUERY = f"""
+SELECT s.name, {QUALIFIED_NAME} AS qualified_name, s.kind, s.file_path, s.start_line,
+       similarity(s.name, %(member)s) AS score
+FROM symbols s
+LEFT JOIN symbols p ON p.id = s.parent_id
+WHERE s.project_id = %(project_id)s
+  AND (s.name %% %(member)s OR s.name ILIKE %(contains)s)
+  AND (%(owner)s IS NULL OR p.name %% %(owner)s OR p.name ILIKE %(owner_contains)s)
+ORDER BY
+    (lower(s.name) = lower(%(member)s) AND (%(owner)s IS NULL OR lower(p.name) = %(owner)s)) DESC,  -- exact hit first
+    (lower(s.name) LIKE %(prefix)s) DESC,    -- then prefix hits
+    score DESC,                              -- then trigram similarity
+    length(s.name), s.name, s.file_path
+LIMIT %(limit)s;
+"""
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_symbols(pattern, limit=DEFAULT_LIMIT, mode="fuzzy", conn=None, repo_url=None):
+    """
+    Returns ranked (name, qualified_name, kind, file_path, start_line, score)
+    rows from the project indexed for `repo_url` (default: this folder).
+    Raises LookupError if that folder has not been indexed.
+    """
+    owner, _, member = pattern.rpartition(".")
+    owner = owner.rpartition(".")[2]      # qualified names are parent.name
+    params = {
+        "member": member,
+        "prefix": _escape_like(member.lower()) + "%",
+        "contains": "%" + _escape_like(member) + "%",
+        "owner": owner.lower() or None,
+        "owner_contains": "%" + _escape_like(owner) + "%",
+        "limit": limit,
+    }
+    query = PREFIX_QUERY if mode == "prefix" else FUZZY_QUERY
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            params["project_id"] = find_project_id(cur, repo_url)
+            if not params["project_id"]:
+                raise LookupError("this folder has not been indexed yet (run n3mo index)")
+            cur.execute(query, params)
+            return cur.fetchall()
+    finally:
+        if own_conn and conn: conn.close()
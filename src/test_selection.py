@@ -0,0 +1,178 @@
+import os
+import posixpath
+import re
+import subprocess
+
+from entry_points import TEST_KINDS, walk_entry_points
+
+# ==========================================
+# 🧪 TEST IMPACT SELECTION (n3mo tests-for)
+# ==========================================
+# diff -> changed line ranges -> innermost enclosing symbols -> reverse BFS
+# to the first test (or fixture) on every call path -> pytest node ids.
+# Routes, CLI commands and jobs are walked through, not stopped at: tests
+# usually reach application code by calling a handler.
+#
+# Line numbers are taken from the new side of the diff, so the index has
+# to describe the working tree the diff ends at (run `n3mo index` first).
+# Changes that the call graph cannot see (module-level code, deleted
+# files, fixtures injected by name) widen the selection to the enclosing
+# file or directory instead of silently dropping tests.
+
+HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+FILE_SYMBOLS_QUERY = """
+SELECT id, name, parent_id, kind, start_line, end_line, entry_kind, file_path
+FROM symbols
+WHERE project_id = %(project_id)s AND file_path = ANY(%(files)s);
+"""
+
+
+def git_diff(diff_range, cwd):
+    """Unified diff with no context lines, so hunks cover changed lines only."""
+    try:
+        result = subprocess.run(["git", "diff", "--unified=0", "--no-color", "--no-ext-diff", diff_range],
+                                cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise LookupError("git is not available here; pipe the diff in instead: git diff ... | n3mo tests-for --diff -")
+    if result.returncode != 0:
+        raise LookupError(result.stderr.strip() or f"git diff {diff_range} failed")
+    return result.stdout
+
+
+def parse_diff(text):
+    """
+    {path: [(start, end), ...]} on the new side of a unified diff. A pure
+    deletion counts as a change to the line just before it. Deleted files
+    map to None.
+    """
+    changes = {}
+    old_path = path = None
+    in_header = True   # ---/+++ inside a hunk are removed/added lines, not headers
+    for line in text.splitlines():
+        if line.startswith("diff "):
+            in_header, path = True, None
+        elif in_header and line.startswith("--- "):
+            old_path = _diff_path(line, "a/")
+        elif in_header and line.startswith("+++ "):
+            path = _diff_path(line, "b/")
+            if path is None:
+                if old_path is not None:
+                    changes[old_path] = None
+            else:
+                changes.setdefault(path, [])
+        elif line.startswith("@@"):
+            in_header = False
+            match = HUNK.match(line)
+            if match and path is not None:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                changes[path].append((start, start + count - 1) if count else (max(start, 1), max(start, 1)))
+    return changes
+
+
+def _diff_path(header, prefix):
+    target = header[4:].split("\t", 1)[0]
+    if target == "/dev/null":
+        return None
+    return target[len(prefix):] if target.startswith(prefix) else target
+
+
+def changed_symbols(symbols, ranges):
+    """
+    symbols: FILE_SYMBOLS_QUERY rows of one file. Returns (ids of the
+    innermost symbols enclosing a changed line, whether any changed line
+    sits outside every symbol).
+    """
+    hit, module_level = set(), False
+    for start, end in ranges:
+        for line in range(start, end + 1):
+            enclosing = [s for s in symbols if s[4] <= line <= s[5]]
+            if enclosing:
+                hit.add(max(enclosing, key=lambda s: s[4])[0])
+            else:
+                module_level = True
+    return hit, module_level
+
+
+def node_id(file_path, symbol_id, symbols_by_id):
+    """pytest node id: path::Class::test_name (parent classes only)."""
+    parts = []
+    current = symbols_by_id.get(symbol_id)
+    while current:
+        parts.append(current[1])
+        parent = symbols_by_id.get(current[2])
+        current = parent if parent and parent[3] == "CLASS" else None
+    return "::".join([file_path] + parts[::-1])
+
+
+def directory_scope(conftest_path):
+    """'tests/api/conftest.py' -> 'tests/api/', the root conftest -> '.'"""
+    directory = posixpath.dirname(conftest_path)
+    return directory + "/" if directory else "."
+
+
+def fixture_scope(file_path, symbol_id, symbols_by_id):
+    """Tests that can request a fixture: its conftest directory, or its module/class."""
+    if posixpath.basename(file_path) == "conftest.py":
+        return directory_scope(file_path)
+    parent = symbols_by_id.get(symbols_by_id[symbol_id][2])
+    return node_id(file_path, parent[0], symbols_by_id) if parent and parent[3] == "CLASS" else file_path
+
+
+def select_tests(cur, project_id, changes):
+    """
+    Returns (node_ids, seeds, notes): the sorted pytest selection, the
+    number of changed symbols, and warnings for changes outside the graph.
+    """
+    by_file = {}
+    cur.execute(FILE_SYMBOLS_QUERY, {"project_id": project_id, "files": [p for p in changes if changes[p]]})
+    for row in cur.fetchall():
+        by_file.setdefault(row[7], []).append(row)
+
+    seeds, tags, selected, notes = {}, {}, set(), []
+    for path, ranges in sorted(changes.items()):
+        if ranges is None:
+            notes.append(f"{path}: deleted; its callers are selected through their own changes")
+            continue
+        symbols = by_file.get(path)
+        if not symbols:
+            if path.endswith(".py"):
+                notes.append(f"{path}: not in the index (re-run n3mo index)")
+            continue
+        hit, module_level = changed_symbols(symbols, ranges)
+        if module_level:
+            # Imports, constants, decorators at module scope: anything in the file may observe them
+            hit.update(s[0] for s in symbols)
+            if posixpath.basename(path) == "conftest.py":
+                selected.add(directory_scope(path))
+        for symbol in symbols:
+            if symbol[0] in hit:
+                seeds[symbol[0]], tags[symbol[0]] = symbol[1], symbol[6]
+
+    hits = walk_entry_points(cur, project_id, seeds, tags, stop_kinds=TEST_KINDS)
+    if hits:
+        files = sorted({row[2] for row in hits})
+        cur.execute(FILE_SYMBOLS_QUERY, {"project_id": project_id, "files": files})
+        symbols_by_id = {row[0]: row for row in cur.fetchall()}
+        for symbol_id, _, file_path, _, kind, _, _, _ in hits:
+            if kind == "test":
+                selected.add(node_id(file_path, symbol_id, symbols_by_id))
+            else:
+                selected.add(fixture_scope(file_path, symbol_id, symbols_by_id))
+    return collapse(selected), len(seeds), notes
+
+
+def collapse(node_ids):
+    """Drops node ids already covered by a selected directory, file or class."""
+    if "." in node_ids:
+        return ["."]
+    kept = []
+    for node in sorted(node_ids, key=lambda n: (len(n), n)):
+        if not any(node.startswith(prefix) and (prefix.endswith("/") or node[len(prefix):].startswith("::"))
+                   for prefix in kept):
+            kept.append(node)
+    return sorted(kept)
+
+
+def repo_root():
+    return os.getenv("TARGET_CODE_DIR", os.getcwd())
@@ -0,0 +1,193 @@
+import math
+from collections import defaultdict
+
+# ==========================================
+# 📐 GRAPH LAYOUT + LEVEL OF DETAIL (Server-Side)
+# ==========================================
+# The page itself is static (static/impact.html, served by graph_server.py);
+# this module shapes the data it fetches.
+#
+# Browsers cannot run a force simulation over 50k nodes, so positions are
+# computed here once: one ring per depth, callers ordered next to what they
+# call (barycenter) and grouped by file. Rings that are too crowded start
+# collapsed into one node per file, and rings deeper than INITIAL_DEPTH are
+# only added when the user asks for them.
+
+RING_GAP = 260          # px between depth rings
+MIN_SPACING = 36        # px between neighbours on a ring
+MAX_RING_NODES = 120    # larger rings start collapsed by file
+INITIAL_DEPTH = 2       # rings drawn on first paint
+SMALL_GRAPH = 400       # below this, draw everything up front
+
+
+def build_impact_graph(results, target):
+    """
+    Collapses walk rows (id, qualified_name, file_path, line, depth, via_id)
+    into nodes keyed by symbol id (keeping each symbol's shallowest depth
+    and call site) and caller -> callee edges between those ids.
+    """
+    target_id, target_name, target_file = target
+    target_id = str(target_id)
+    nodes = {target_id: {"id": target_id, "label": target_name, "depth": 0, "file": target_file, "line": None}}
+    edges = set()
+    for symbol_id, name, path, line, depth, via_id in results:
+        symbol_id, via_id = str(symbol_id), str(via_id)
+        node = nodes.get(symbol_id)
+        if node is None or depth < node["depth"]:
+            nodes[symbol_id] = {"id": symbol_id, "label": name, "depth": depth, "file": path, "line": line}
+        edges.add((symbol_id, via_id))
+    for node in nodes.values():
+        node["group"] = min(node["depth"], 2)
+    return nodes, edges
+
+
+def _circular_mean(angles):
+    if not angles:
+        return None
+    return math.atan2(sum(map(math.sin, angles)), sum(map(math.cos, angles)))
+
+
+def compute_layout(nodes, edges):
+    """
+    Assigns x/y to every node and returns the file clusters:
+    [{"id", "file", "depth", "count", "x", "y", "collapsed"}, ...]
+    """
+    rings = defaultdict(list)
+    for node in nodes.values():
+        rings[node["depth"]].append(node)
+
+    callees = defaultdict(list)
+    for source, target in edges:
+        callees[source].append(target)
+
+    angle = {}
+    clusters = []
+    for depth in sorted(rings):
+        ring = rings[depth]
+        if depth == 0:
+            for node in ring:
+                node["x"], node["y"] = 0, 0
+            continue
+
+        # Barycenter: sit near the (already placed) symbols this one calls
+        for node in ring:
+            placed = [angle[t] for t in callees[node["id"]] if t in angle]
+            node["_bary"] = _circular_mean(placed)
+
+        by_file = defaultdict(list)
+        for node in ring:
+            by_file[node["file"] or ""].append(node)
+        groups = []
+        for file_path, members in by_file.items():
+            members.sort(key=lambda n: (n["_bary"] if n["_bary"] is not None else 0, n["label"]))
+            bary = _circular_mean([n["_bary"] for n in members if n["_bary"] is not None])
+            groups.append((bary if bary is not None else 0, file_path, members))
+        groups.sort(key=lambda g: (g[0], g[1]))
+
+        ordered = [n for _, _, members in groups for n in members]
+        radius = max(depth * RING_GAP, len(ordered) * MIN_SPACING / (2 * math.pi))
+        for i, node in enumerate(ordered):
+            theta = 2 * math.pi * i / len(ordered)
+            angle[node["id"]] = theta
+            node["x"], node["y"] = round(radius * math.cos(theta), 1), round(radius * math.sin(theta), 1)
+            del node["_bary"]
+
+        collapse = len(ordered) > MAX_RING_NODES
+        for _, file_path, members in groups:
+            if len(members) < 2:
+                continue
+            cluster_id = f"cluster:{depth}:{file_path}"
+            theta = _circular_mean([angle[n["id"]] for n in members])
+            clusters.append({
+                "id": cluster_id, "file": file_path, "depth": depth, "count": len(members),
+                "x": round(radius * math.cos(theta), 1), "y": round(radius * math.sin(theta), 1),
+                "collapsed": collapse,
+            })
+            for n in members:
+                n["cluster"] = cluster_id
+    return clusters
+
+
+def impact_chunks(results, target):
+    """
+    Yields the compact /impact payload: a header, then one chunk per depth
+    ring so the browser can draw the first rings before the rest arrives.
+
+    Qualified names and file paths go into a string table that grows chunk
+    by chunk ("strings" holds only the new entries), and nodes, clusters
+    and edges are column arrays of integers, plus each node's symbol id.
+    Nodes are numbered in emission order and
+    edges are flat [caller, callee, caller, callee, ...] pairs of those
+    numbers, so nothing in a chunk refers to a node that is yet to come.
+    """
+    target_id, target_name, target_file = target
+    nodes, edges = build_impact_graph(results, target)
+    clusters = compute_layout(nodes, edges)
+
+    rings = defaultdict(list)
+    for node in nodes.values():
+        rings[node["depth"]].append(node)
+    ring_clusters = defaultdict(list)
+    for cluster in clusters:
+        ring_clusters[cluster["depth"]].append(cluster)
+    ring_edges = defaultdict(list)
+    for source, callee in edges:
+        ring_edges[max(nodes[source]["depth"], nodes[callee]["depth"])].append((source, callee))
+
+    deepest = max(rings)
+    yield {
+        "target": {"id": str(target_id), "name": target_name, "file": target_file},
+        "view": {"initialDepth": deepest if len(nodes) <= SMALL_GRAPH else min(INITIAL_DEPTH, deepest),
+                 "maxDepth": deepest},
+        "counts": {"nodes": len(nodes), "edges": len(edges)},
+    }
+
+    strings, node_index, cluster_index = {}, {}, {}
+    for depth in sorted(rings):
+        new_strings = []
+
+        def intern(text):
+            if text is None:
+                return -1
+            idx = strings.get(text)
+            if idx is None:
+                idx = strings[text] = len(strings)
+                new_strings.append(text)
+            return idx
+
+        chunk_clusters = {"file": [], "count": [], "x": [], "y": [], "collapsed": []}
+        for cluster in ring_clusters[depth]:
+            cluster_index[cluster["id"]] = len(cluster_index)
+            chunk_clusters["file"].append(intern(cluster["file"]))
+            chunk_clusters["count"].append(cluster["count"])
+            chunk_clusters["x"].append(round(cluster["x"]))
+            chunk_clusters["y"].append(round(cluster["y"]))
+            chunk_clusters["collapsed"].append(int(cluster["collapsed"]))
+
+        chunk_nodes = {"id": [], "name": [], "file": [], "line": [], "x": [], "y": [], "cluster": []}
+        for node in rings[depth]:
+            node_index[node["id"]] = len(node_index)
+            chunk_nodes["id"].append(node["id"])
+            chunk_nodes["name"].append(intern(node["label"]))
+            chunk_nodes["file"].append(intern(node["file"]))
+            chunk_nodes["line"].append(node["line"] or 0)
+            chunk_nodes["x"].append(round(node["x"]))
+            chunk_nodes["y"].append(round(node["y"]))
+            chunk_nodes["cluster"].append(cluster_index.get(node.get("cluster"), -1))
+
+        chunk_edges = []
+        for source, callee in ring_edges[depth]:
+            chunk_edges.extend((node_index[source], node_index[callee]))
+
+        yield {"depth": depth, "strings": new_strings, "nodes": chunk_nodes,
+               "clusters": chunk_clusters, "edges": chunk_edges}
+
+
+def impact_payload(results, target):
+    """
+    JSON body for GET /impact: the impact_chunks header plus all chunks.
+    """
+    chunks = impact_chunks(results, target)
+    payload = next(chunks)
+    payload["chunks"] = list(chunks)
+    return payload
@@ -1,35 +1,102 @@
 import os
 import sys
-import subprocess
+import json
+import socket
+
+# Read-only queries the daemon (n3mo serve) can answer without a container
+DAEMON_COMMANDS = {"impact", "deps", "reaches", "search"}
+
+def query_daemon(socket_path, argv, repo_url):
+    """
+    Sends the command to a running `n3mo serve` and streams its output.
+    Returns False when there is no daemon (or it declines the command),
+    so the caller can fall back to docker-compose.
+    """
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    except OSError:
+        return False
+
+    with sock:
+        request = {"argv": argv, "repo_url": repo_url}
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        stream = sock.makefile("rb")
+        header = stream.readline()
+        if not header or json.loads(header).get("status") != "ok":
+            return False
+        out = sys.stdout.buffer
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            out.write(chunk)
+            out.flush()
+    return True
+
+def run_embedded(package_dir, user_cwd, argv):
+    """
+    N3MO_DB=sqlite: no containers. The engine runs in this interpreter
+    against the local database file (needs requirements.txt installed).
+    """
+    import subprocess
+    env = os.environ.copy()
+    env["TARGET_CODE_DIR"] = user_cwd
+    env["N3MO_REPO_URL"] = user_cwd
+    try:
+        subprocess.run([sys.executable, os.path.join(package_dir, "src", "cli.py")] + argv, env=env, check=False)
+    except KeyboardInterrupt:
+        print("\n👋 N3MO: Stopped by user.")
 
 def main():
     # 1. Locate the docker-compose file inside the installed package
     package_dir = os.path.dirname(os.path.abspath(__file__))
     compose_file = os.path.join(package_dir, 'docker-compose.yml')
-    
+
     # 2. Get the user's current folder (Target for analysis)
     user_cwd = os.getcwd()
 
+    # 3. Fast path: a warm daemon answers queries in milliseconds
+    socket_dir = os.getenv("N3MO_SOCKET_DIR", "/tmp/n3mo")
+    argv = sys.argv[1:]
+    if argv and argv[0] in DAEMON_COMMANDS:
+        try:
+            if query_daemon(os.path.join(socket_dir, "n3mo.sock"), argv, user_cwd):
+                return
+        except KeyboardInterrupt:
+            print("\n👋 N3MO: Stopped by user.")
+            return
+
+    if os.getenv("N3MO_DB", "postgres").lower() == "sqlite":
+        return run_embedded(package_dir, user_cwd, argv)
+
     if not os.path.exists(compose_file):
         print(f"❌ Error: Cannot find {compose_file}")
         sys.exit(1)
 
-    # 3. Pass the user's folder to Docker via environment variable
+    # 4. Pass the user's folder to Docker via environment variable
     # We copy the existing environment so we don't lose system paths
     env = os.environ.copy()
     env["TARGET_CODE_DIR"] = user_cwd
+    # The daemon's socket lives here (bind-mounted into the container)
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    env["N3MO_SOCKET_DIR"] = socket_dir
 
-    # 4. Construct the Docker Command
+    # 5. Construct the Docker Command
     # We point to /app/src/cli.py because that is where we mounted the engine
     cmd = [
-        "docker-compose", 
-        "-f", compose_file, 
-        "run", "--rm", 
-        "indexer", 
-        "python", "/app/src/cli.py" 
-    ] + sys.argv[1:]  # Append any arguments the user typed (e.g., impact "login")
-
-    # 5. Execute
+        "docker-compose",
+        "-f", compose_file,
+        "run", "--rm",
+        "-e", f"N3MO_REPO_URL={user_cwd}",
+        "indexer",
+        "python", "/app/src/cli.py"
+    ] + argv  # Append any arguments the user typed (e.g., impact "login")
+    if argv and argv[0] == "lsp":
+        # The editor speaks JSON-RPC over stdin/stdout: no TTY in between
+        cmd[cmd.index("run") + 1:cmd.index("run") + 1] = ["-T"]
+
+    # 6. Execute
+    import subprocess  # only the container path needs it
     try:
         # We must pass 'env' here so docker-compose sees TARGET_CODE_DIR
         subprocess.run(cmd, env=env, check=False)
@@ -40,4 +107,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()